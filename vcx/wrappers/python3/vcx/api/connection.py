@@ -7,7 +7,7 @@ TODO: document attributes
 """
 from typing import Optional
 from ctypes import *
-from vcx.common import do_call, create_cb
+from vcx.common import do_call, create_cb, buffer_to_bytes
 from vcx.api.vcx_stateful import VcxStateful
 
 import json
@@ -153,7 +153,7 @@ class Connection(VcxStateful):
         """
 
         def transform_cb(arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-            return bytes(arr_ptr[:arr_len]),
+            return buffer_to_bytes(arr_ptr, arr_len),
 
         if not hasattr(Connection.sign_data, "cb"):
             self.logger.debug("vcx_connection_sign_data: Creating callback")
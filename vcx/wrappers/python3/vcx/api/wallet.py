@@ -1,5 +1,5 @@
 from ctypes import *
-from vcx.common import do_call, do_call_sync, create_cb
+from vcx.common import do_call, do_call_sync, create_cb, buffer_to_bytes
 import json
 
 import logging
@@ -538,7 +538,7 @@ class Wallet:
         logger = logging.getLogger(__name__)
 
         def transform_cb(arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-            return bytes(arr_ptr[:arr_len]),
+            return buffer_to_bytes(arr_ptr, arr_len),
 
         if not hasattr(Wallet.sign_with_address, "cb"):
             logger.debug("vcx_wallet_sign_with_address: Creating callback")
@@ -3,50 +3,60 @@ from ctypes import *
 import asyncio
 import itertools
 import logging
+from . import metrics
 from .error import VcxError, ErrorCode, get_error_details
 from vcx.cdll import _cdll
 
+# Looked up once: `Logger.isEnabledFor` caches its answer until the logging configuration changes,
+# so hot paths below check it first and skip building debug arguments when DEBUG is off.
+logger = logging.getLogger(__name__)
+
 _futures = {}
 _futures_counter = itertools.count()
 
 
 def do_call(name: str, *args):
-    logger = logging.getLogger(__name__)
-    logger.debug("do_call: >>> name: %s, args: %s", name, args)
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("do_call: >>> name: %s, args: %s", name, args)
 
     event_loop = asyncio.get_event_loop()
     future = event_loop.create_future()
     command_handle = next(_futures_counter)
 
-    _futures[command_handle] = (event_loop, future)
+    _futures[command_handle] = (event_loop, future, name, metrics.dispatched(name))
 
     err = getattr(_cdll(), name)(command_handle,
                                  *args)
 
-    logger.debug("do_call: Function %s returned err: %i", name, err)
+    if debug:
+        logger.debug("do_call: Function %s returned err: %i", name, err)
 
     if err != ErrorCode.Success:
         logger.warning("_do_call: Function %s returned error %i", name, err)
+        (_, _, _, started) = _futures.pop(command_handle)
+        metrics.completed(name, started, True)
         error_details = get_error_details()
         future.set_exception(VcxError(ErrorCode(err), error_details))
 
-    logger.debug("do_call: <<< %s", future)
+    if debug:
+        logger.debug("do_call: <<< %s", future)
     return future
 
 
 def do_call_sync(name: str, *args):
-    logger = logging.getLogger(__name__)
-    logger.debug("do_call_sync: >>> name: %s, args: %s", name, args)
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("do_call_sync: >>> name: %s, args: %s", name, args)
 
     err = getattr(_cdll(), name)(*args)
 
-    logger.debug("do_call_sync: <<< %s", err)
+    if debug:
+        logger.debug("do_call_sync: <<< %s", err)
     return err
 
 
 def release(name, handle):
-    logger = logging.getLogger(__name__)
-
     err = do_call_sync(name, handle)
 
     logger.debug("release: Function %s returned err: %i", name, err)
@@ -58,8 +68,6 @@ def release(name, handle):
 
 
 def get_version() -> str:
-    logger = logging.getLogger(__name__)
-
     name = 'vcx_version'
     c_version = do_call_sync(name)
 
@@ -70,8 +78,6 @@ def get_version() -> str:
 
 
 def update_institution_info(institution_name: str, logo_url: str) -> None:
-    logger = logging.getLogger(__name__)
-
     name = 'vcx_update_institution_info'
     c_name = c_char_p(institution_name.encode('utf-8'))
     c_logo_url = c_char_p(logo_url.encode('utf-8'))
@@ -95,6 +101,15 @@ def mint_tokens():
     do_call_sync(name, None, None)
 
 
+def buffer_to_bytes(arr_ptr, arr_len: int) -> bytes:
+    """
+    Copies byte buffer passed by libvcx to callback into `bytes` with a single memory copy.
+    The buffer is owned by libvcx and valid only while the callback runs.
+    """
+
+    return string_at(arr_ptr, arr_len) if arr_len else b''
+
+
 def create_cb(cb_type: CFUNCTYPE, transform_fn=None):
 
     def _cb(command_handle: int, err: int, *args):
@@ -110,13 +125,14 @@ def create_cb(cb_type: CFUNCTYPE, transform_fn=None):
 
 
 def _cxs_callback(command_handle: int, err: VcxError, *args):
-    (event_loop, future) = _futures[command_handle]
+    (event_loop, future, _, _) = _futures[command_handle]
     event_loop.call_soon_threadsafe(_cxs_loop_callback, command_handle, err, *args)
 
 
 def _cxs_loop_callback(command_handle: int, err: VcxError, *args):
 
-    (event_loop, future) = _futures.pop(command_handle)
+    (event_loop, future, name, started) = _futures.pop(command_handle)
+    metrics.completed(name, started, err.error_code != ErrorCode.Success)
 
     if future.cancelled():
         print("_indy_loop_callback: Future was cancelled earlier")
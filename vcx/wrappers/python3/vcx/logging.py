@@ -1,10 +1,45 @@
 from ctypes import *
 
+import atexit
 import logging
 from logging import ERROR, WARNING, INFO, DEBUG, CRITICAL
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
 
 TRACE = 5
 
+_native_loggers = {}
+
+
+class _NativeLogHandler(QueueHandler):
+    """
+    Queues native log records as they are, so libvcx threads only pay for an enqueue
+    and never wait on the handlers configured by the application.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _NativeLogForwarder(logging.Handler):
+    """
+    Passes native log records from the listener thread on to the handlers of the wrapper logger.
+
+    libvcx never consults enabled_cb: the Rust `log` macros only check the max level, which is set to
+    trace, so every native record reaches log_cb and is filtered there by the level of its logger.
+    """
+
+    def emit(self, record):
+        logging.getLogger(__name__).handle(record)
+
+
+def _get_native_logger(target: bytes) -> logging.Logger:
+    native_logger = _native_loggers.get(target)
+    if native_logger is None:
+        native_logger = logging.getLogger(__name__).getChild('native.' + target.decode().replace('::', '.'))
+        _native_loggers[target] = native_logger
+    return native_logger
+
 
 def set_logger(cdll):
     logger = logging.getLogger(__name__)
@@ -13,19 +48,43 @@ def set_logger(cdll):
 
     logger.debug("set_logger: >>>")
 
+    level_mapping = {1: ERROR, 2: WARNING, 3: INFO, 4: DEBUG, 5: TRACE, }
+
+    def _enabled(context, level, target):
+        return _get_native_logger(target).isEnabledFor(level_mapping[level])
+
     def _log(context, level, target, message, module_path, file, line):
-        libvcx_logger = logger.getChild('native.' + target.decode().replace('::', '.'))
+        libvcx_logger = _get_native_logger(target)
+        level = level_mapping[level]
 
-        level_mapping = {1: ERROR, 2: WARNING, 3: INFO, 4: DEBUG, 5: TRACE, }
+        if not libvcx_logger.isEnabledFor(level):
+            return
 
-        libvcx_logger.log(level_mapping[level],
+        libvcx_logger.log(level,
                           "\t%s:%d | %s",
-                          file.decode(),
+                          file.decode() if file else None,
                           line,
                           message.decode())
 
+    records = SimpleQueue()
+    native_logger = logger.getChild('native')
+    native_logger.propagate = False
+
+    # Replaces the listener of a previous call, so records are neither duplicated nor left to a stale thread
+    if hasattr(set_logger, 'listener'):
+        set_logger.listener.stop()
+        atexit.unregister(set_logger.listener.stop)
+        native_logger.removeHandler(set_logger.handler)
+
+    set_logger.handler = _NativeLogHandler(records)
+    native_logger.addHandler(set_logger.handler)
+
+    set_logger.listener = QueueListener(records, _NativeLogForwarder())
+    set_logger.listener.start()
+    atexit.register(set_logger.listener.stop)
+
     set_logger.callbacks = {
-        'enabled_cb': None,
+        'enabled_cb': CFUNCTYPE(c_bool, c_void_p, c_int, c_char_p)(_enabled),
         'log_cb': CFUNCTYPE(None, c_void_p, c_int, c_char_p, c_char_p, c_char_p, c_char_p, c_int)(_log),
         'flush_cb': None
     }
@@ -0,0 +1,86 @@
+"""
+Measures returning native byte buffers from callbacks at 1 KB, 100 KB and 10 MB payloads.
+
+The conversion itself (list slice of the pointer versus `buffer_to_bytes`) is always measured.
+If libindy can be loaded, `crypto_sign`, `auth_crypt`, `anon_crypt` and `pack_message` are measured
+end-to-end as well, against a temporary wallet:
+
+    python -m benchmarks.buffer_return --repeat 5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import timeit
+import uuid
+from ctypes import POINTER, c_uint8, cast, create_string_buffer
+
+from indy import crypto, did, libindy, wallet
+
+SIZES = (('1 KB', 1024), ('100 KB', 100 * 1024), ('10 MB', 10 * 1024 * 1024))
+
+
+def _bench_conversion(repeat: int):
+    for (label, size) in SIZES:
+        buffer = create_string_buffer(b'\x01' * size, size)
+        arr_ptr = cast(buffer, POINTER(c_uint8))
+
+        sliced = min(timeit.repeat(lambda: bytes(arr_ptr[:size]), number=1, repeat=repeat))
+        copied = min(timeit.repeat(lambda: libindy.buffer_to_bytes(arr_ptr, size), number=1, repeat=repeat))
+
+        print("{:<14} {:>7} slice {:>10.1f} us   buffer_to_bytes {:>10.1f} us".format(
+            'conversion', label, sliced * 1e6, copied * 1e6))
+
+
+async def _bench_functions(repeat: int):
+    config = json.dumps({'id': 'benchmark_{}'.format(uuid.uuid4().hex)})
+    credentials = json.dumps({'key': '8dvfYSt5d1taSd6yJdpjq4emkwsPDDLYxkNFysFD2cZY', 'key_derivation_method': 'RAW'})
+
+    await wallet.create_wallet(config, credentials)
+    wallet_handle = await wallet.open_wallet(config, credentials)
+
+    try:
+        (_, sender_vk) = await did.create_and_store_my_did(wallet_handle, '{}')
+        (_, recipient_vk) = await did.create_and_store_my_did(wallet_handle, '{}')
+
+        functions = (
+            ('crypto_sign', lambda msg: crypto.crypto_sign(wallet_handle, sender_vk, msg)),
+            ('auth_crypt', lambda msg: crypto.auth_crypt(wallet_handle, sender_vk, recipient_vk, msg)),
+            ('anon_crypt', lambda msg: crypto.anon_crypt(recipient_vk, msg)),
+            ('pack_message', lambda msg: crypto.pack_message(wallet_handle, msg.decode(), [recipient_vk], sender_vk)),
+        )
+
+        for (name, call) in functions:
+            for (label, size) in SIZES:
+                msg = b'a' * size
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    await call(msg)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                print("{:<14} {:>7} {:>10.1f} us".format(name, label, best * 1e6))
+    finally:
+        await wallet.close_wallet(wallet_handle)
+        await wallet.delete_wallet(config, credentials)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='repetitions per payload size, best one is reported')
+    args = parser.parse_args()
+
+    _bench_conversion(args.repeat)
+
+    try:
+        libindy._cdll()
+    except OSError as e:
+        print("libindy is not available, end-to-end functions skipped: {}".format(e))
+        return
+
+    asyncio.get_event_loop().run_until_complete(_bench_functions(args.repeat))
+
+
+if __name__ == '__main__':
+    main()
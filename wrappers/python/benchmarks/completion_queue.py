@@ -0,0 +1,74 @@
+"""
+Compares completions/sec of the batched per-loop completion queue with the previous
+one `call_soon_threadsafe` per completion path.
+
+Native completions are simulated by plain threads calling `_indy_callback`, so the
+benchmark does not need libindy to be installed:
+
+    python -m benchmarks.completion_queue --threads 4 --calls 20000
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+
+from indy import libindy, metrics
+
+
+def _legacy_callback(command_handle: int, err, *args):
+    registry = libindy._futures[command_handle]
+    registry._event_loop().call_soon_threadsafe(libindy._indy_loop_callback, command_handle, err, *args)
+
+
+async def _run(callback, threads: int, calls: int) -> float:
+    event_loop = asyncio.get_event_loop()
+    registry = libindy._get_registry(event_loop)
+    success = None
+
+    handles = []
+    futures = []
+    for _ in range(threads * calls):
+        command_handle = next(libindy._futures_counter)
+        future = event_loop.create_future()
+        registry.register(command_handle, 'indy_benchmark', future, None, metrics.dispatched('indy_benchmark'))
+        handles.append(command_handle)
+        futures.append(future)
+
+    def _native_thread(chunk):
+        for command_handle in chunk:
+            callback(command_handle, success, b'result')
+
+    workers = [threading.Thread(target=_native_thread, args=(handles[i::threads],)) for i in range(threads)]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    await asyncio.gather(*futures)
+    elapsed = time.perf_counter() - start
+
+    for worker in workers:
+        worker.join()
+
+    return len(futures) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=4, help='number of simulated native threads')
+    parser.add_argument('--calls', type=int, default=20000, help='completions per thread')
+    args = parser.parse_args()
+
+    event_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(event_loop)
+
+    for (name, callback) in (('call_soon_threadsafe', _legacy_callback),
+                             ('completion queue', libindy._indy_callback)):
+        rate = event_loop.run_until_complete(_run(callback, args.threads, args.calls))
+        print("{:<22} {:>12.0f} completions/sec".format(name, rate))
+
+    event_loop.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Measures verifications/sec of `crypto.verify_many` at several chunk sizes and concurrency levels,
+compared with awaiting `crypto.crypto_verify` one by one and gathering all of its futures at once:
+
+    python -m benchmarks.crypto_verify --signatures 20000 --duplicates 0.1 --chunk-size 64 256 --concurrency 1 4 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+
+from indy import crypto, libindy, wallet
+
+CREDENTIALS = json.dumps({'key': '8dvfYSt5d1taSd6yJdpjq4emkwsPDDLYxkNFysFD2cZY', 'key_derivation_method': 'RAW'})
+
+
+async def _items(wallet_handle: int, args) -> list:
+    verkeys = [await crypto.create_key(wallet_handle, "{}") for _ in range(args.signers)]
+
+    items = []
+    for i in range(args.signatures):
+        if items and random.random() < args.duplicates:
+            items.append(random.choice(items))
+            continue
+
+        verkey = verkeys[i % len(verkeys)]
+        msg = os.urandom(args.message_size)
+        signature = await crypto.crypto_sign(wallet_handle, verkey, msg)
+        if random.random() < args.invalid:
+            signature = bytes(64)
+        items.append((verkey, msg, signature))
+
+    return items
+
+
+def _report(name: str, count: int, elapsed: float):
+    print("{:<32} {:>10.1f} verifications/sec".format(name, count / elapsed if elapsed > 0 else 0.0))
+
+
+async def _run(args):
+    config = json.dumps({'id': 'benchmark_{}'.format(uuid.uuid4().hex)})
+
+    await wallet.create_wallet(config, CREDENTIALS)
+    wallet_handle = await wallet.open_wallet(config, CREDENTIALS)
+
+    try:
+        items = await _items(wallet_handle, args)
+    finally:
+        await wallet.close_wallet(wallet_handle)
+        await wallet.delete_wallet(config, CREDENTIALS)
+
+    start = time.perf_counter()
+    for (verkey, msg, signature) in items:
+        await crypto.crypto_verify(verkey, msg, signature)
+    _report('crypto_verify one by one', len(items), time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(crypto.crypto_verify(verkey, msg, signature) for (verkey, msg, signature) in items))
+    _report('crypto_verify gathered', len(items), time.perf_counter() - start)
+
+    for chunk_size in args.chunk_size:
+        for concurrency in args.concurrency:
+            start = time.perf_counter()
+            await crypto.verify_many(items, chunk_size=chunk_size, concurrency=concurrency)
+            _report('verify_many chunk {} x {}'.format(chunk_size, concurrency), len(items),
+                    time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--signatures', type=int, default=20000, help='signatures verified per measurement')
+    parser.add_argument('--signers', type=int, default=100, help='count of distinct verkeys')
+    parser.add_argument('--message-size', type=int, default=512, help='size of signed messages in bytes')
+    parser.add_argument('--duplicates', type=float, default=0.1, help='share of repeated (verkey, msg, signature)')
+    parser.add_argument('--invalid', type=float, default=0.0, help='share of invalid signatures')
+    parser.add_argument('--chunk-size', type=int, nargs='+', default=[64, 256, 1024], help='verify_many chunk sizes')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8], help='verify_many chunks at once')
+    args = parser.parse_args()
+
+    try:
+        libindy._cdll()
+    except OSError as e:
+        print("libindy is not available: {}".format(e))
+        return
+
+    asyncio.get_event_loop().run_until_complete(_run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Measures DIDs/sec of `did.create_and_store_my_dids` at several in-flight windows,
+with and without attaching metadata, against a temporary wallet:
+
+    python -m benchmarks.did_provisioning --dids 2000 --window 1 8 32 128
+"""
+
+import argparse
+import asyncio
+import json
+import uuid
+
+from indy import did, libindy, wallet
+
+CREDENTIALS = json.dumps({'key': '8dvfYSt5d1taSd6yJdpjq4emkwsPDDLYxkNFysFD2cZY', 'key_derivation_method': 'RAW'})
+
+
+async def _run(args):
+    config = json.dumps({'id': 'benchmark_{}'.format(uuid.uuid4().hex)})
+
+    await wallet.create_wallet(config, CREDENTIALS)
+    wallet_handle = await wallet.open_wallet(config, CREDENTIALS)
+
+    try:
+        for with_metadata in (False, True):
+            for window in args.window:
+                did_jsons = [("{}", '{"label": "benchmark"}') if with_metadata else "{}" for _ in range(args.dids)]
+                (_, stats) = await did.create_and_store_my_dids(wallet_handle, did_jsons, window=window)
+                print("{:<14} window {:>4} {:>10.1f} DIDs/sec errors {}".format(
+                    'with metadata' if with_metadata else 'dids only', window, stats['dids_per_sec'], stats['errors']))
+    finally:
+        await wallet.close_wallet(wallet_handle)
+        await wallet.delete_wallet(config, CREDENTIALS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--dids', type=int, default=2000, help='DIDs created per measurement')
+    parser.add_argument('--window', type=int, nargs='+', default=[1, 8, 32, 128], help='DIDs in flight')
+    args = parser.parse_args()
+
+    try:
+        libindy._cdll()
+    except OSError as e:
+        print("libindy is not available: {}".format(e))
+        return
+
+    asyncio.get_event_loop().run_until_complete(_run(args))
+
+
+if __name__ == '__main__':
+    main()
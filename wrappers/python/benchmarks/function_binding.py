@@ -0,0 +1,36 @@
+"""
+Measures Python overhead of dispatching a native call by name: resolving the symbol with
+`getattr(_cdll(), name)` on each call versus the cached binding used by `do_call`.
+
+The C runtime library plays the role of a stub libindy, so libindy is not required:
+
+    python -m benchmarks.function_binding --calls 1000000
+"""
+
+import argparse
+import timeit
+from ctypes import CDLL, c_int32
+
+from indy import libindy
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--calls', type=int, default=1000000, help='number of native calls per variant')
+    args = parser.parse_args()
+
+    libindy._cdll.cdll = CDLL(None)
+    c_value = c_int32(-1)
+
+    variants = (
+        ('getattr per call', lambda: getattr(libindy._cdll(), 'abs')(c_value)),
+        ('cached binding', lambda: libindy._get_function('abs')(c_value)),
+    )
+
+    for (name, call) in variants:
+        elapsed = timeit.timeit(call, number=args.calls)
+        print("{:<18} {:>8.0f} ns/call".format(name, elapsed / args.calls * 1e9))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Measures exporting and importing a fleet of SQLite wallets serially and with a bounded pool.
+
+Every wallet is filled with `--records` non-secret records, then all wallets are exported with
+`wallet_backup.export_wallets` and imported back with `import_wallets` at each concurrency level:
+
+    python -m benchmarks.wallet_backup --wallets 32 --records 200 --concurrency 1 4 8
+"""
+
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+import uuid
+
+from indy import libindy, non_secrets, wallet
+from indy.wallet_backup import export_wallets, import_wallets
+
+CREDENTIALS = json.dumps({'key': '8dvfYSt5d1taSd6yJdpjq4emkwsPDDLYxkNFysFD2cZY', 'key_derivation_method': 'RAW'})
+EXPORT_KEY = json.dumps({'key': '8dvfYSt5d1taSd6yJdpjq4emkwsPDDLYxkNFysFD2cZY', 'key_derivation_method': 'RAW'})
+
+
+async def _create_fleet(count: int, records: int) -> list:
+    prefix = uuid.uuid4().hex
+    configs = [json.dumps({'id': 'benchmark_{}_{}'.format(prefix, i)}) for i in range(count)]
+
+    for config in configs:
+        await wallet.create_wallet(config, CREDENTIALS)
+        wallet_handle = await wallet.open_wallet(config, CREDENTIALS)
+        await non_secrets.bulk_wallet_record_ops(
+            wallet_handle, (('add', 'record', str(i), 'v' * 256, '{"tag": "value"}') for i in range(records)))
+        await wallet.close_wallet(wallet_handle)
+
+    return configs
+
+
+async def _delete_fleet(configs: list):
+    for config in configs:
+        await wallet.delete_wallet(config, CREDENTIALS)
+
+
+async def _bench(configs: list, concurrency: int):
+    directory = tempfile.mkdtemp(prefix='indy_backup_')
+    wallets = [(config, CREDENTIALS, EXPORT_KEY) for config in configs]
+
+    try:
+        exported = await export_wallets(wallets, directory, concurrency=concurrency)
+        await _delete_fleet(configs)
+        imported = await import_wallets(wallets, directory, concurrency=concurrency)
+    finally:
+        shutil.rmtree(directory)
+
+    for (name, stats) in (('export', exported), ('import', imported)):
+        print("{:<7} concurrency {:>3} {:>8.2f} s {:>8.1f} wallets/sec {:>12.0f} bytes/sec failed {}".format(
+            name, concurrency, stats['elapsed'], stats['total'] / stats['elapsed'], stats['bytes_per_sec'],
+            stats['failed']))
+
+
+async def _run(args):
+    configs = await _create_fleet(args.wallets, args.records)
+
+    try:
+        for concurrency in args.concurrency:
+            await _bench(configs, concurrency)
+    finally:
+        await _delete_fleet(configs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--wallets', type=int, default=32, help='number of wallets in the fleet')
+    parser.add_argument('--records', type=int, default=200, help='records per wallet')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8], help='pool sizes to measure')
+    args = parser.parse_args()
+
+    try:
+        libindy._cdll()
+    except OSError as e:
+        print("libindy is not available: {}".format(e))
+        return
+
+    asyncio.get_event_loop().run_until_complete(_run(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+"""
+Measures wallet storage throughput of the default SQLite storage and the postgres_storage plugin.
+
+For every backend, wallet size and tag cardinality a wallet is filled with records through
+`non_secrets.bulk_wallet_record_ops` (measured as `add`). Then `get`, `update`, `search` (equality on
+an encrypted tag with the given number of distinct values, first page of 10 records) and `delete` are
+measured at every concurrency level. Results are written as JSON so runs can be compared over time:
+
+    python -m benchmarks.wallet_storage --sizes 1000 100000 --cardinality 10 1000 --output sqlite.json
+
+Postgres scenarios need a local Postgres instance and the plugin library built from
+experimental/plugins/postgres_storage:
+
+    python -m benchmarks.wallet_storage --backend postgres \\
+        --postgres-plugin ../../experimental/plugins/postgres_storage/target/release/libindystrgpostgres.so
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+import uuid
+from ctypes import cdll
+
+from indy import libindy, non_secrets, wallet
+
+KEY = '8dvfYSt5d1taSd6yJdpjq4emkwsPDDLYxkNFysFD2cZY'
+TYPE = 'benchmark'
+VALUE = 'v' * 256
+
+
+async def _measure(operation, args_list: list, concurrency: int) -> dict:
+    latencies = []
+
+    async def _timed(*args):
+        start = time.perf_counter()
+        await operation(*args)
+        latencies.append(time.perf_counter() - start)
+
+    (results, stats) = await libindy.run_windowed(_timed, args_list, concurrency)
+    for result in results:
+        if isinstance(result, Exception):
+            raise result
+
+    latencies.sort()
+    return {
+        'ops': stats['count'],
+        'elapsed': stats['elapsed'],
+        'ops_per_sec': stats['ops_per_sec'],
+        'latency_ms': {
+            'p50': latencies[len(latencies) // 2] * 1000 if latencies else None,
+            'p99': latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000 if latencies else None,
+        },
+    }
+
+
+def _tags(i: int, cardinality: int) -> str:
+    return json.dumps({'cat': str(i % cardinality), '~num': str(i)})
+
+
+async def _search(wallet_handle: int, query_json: str):
+    search_handle = await non_secrets.open_wallet_search(wallet_handle, TYPE, query_json, '{}')
+    try:
+        await non_secrets.fetch_wallet_search_next_records_raw(wallet_handle, search_handle, 10)
+    finally:
+        await non_secrets.close_wallet_search(search_handle)
+
+
+async def _scenario(backend: dict, size: int, cardinality: int, args) -> list:
+    config = dict(backend['config'], id='benchmark_{}'.format(uuid.uuid4().hex))
+    config = json.dumps(config)
+    credentials = json.dumps(dict(backend['credentials'], key=KEY, key_derivation_method='RAW'))
+
+    await wallet.create_wallet(config, credentials)
+    wallet_handle = await wallet.open_wallet(config, credentials)
+    results = []
+
+    def _result(operation: str, concurrency: int, measured: dict):
+        result = dict(backend=backend['name'], size=size, cardinality=cardinality, concurrency=concurrency,
+                      operation=operation, **measured)
+        results.append(result)
+        print("{backend:<9} {size:>8} records {cardinality:>6} values {operation:<7} concurrency {concurrency:>3} "
+              "{ops_per_sec:>10.1f} ops/sec".format(**result), file=sys.stderr)
+
+    try:
+        populate = max(args.concurrency)
+        (_, stats) = await non_secrets.bulk_wallet_record_ops(
+            wallet_handle,
+            (('add', TYPE, str(i), VALUE, _tags(i, cardinality)) for i in range(size)),
+            window=populate)
+        _result('add', populate, {'ops': stats['count'], 'elapsed': stats['elapsed'],
+                                  'ops_per_sec': stats['ops_per_sec'], 'latency_ms': None})
+
+        # Every concurrency level deletes its own slice of records, the rest is read and updated
+        ops = min(args.ops, size // (len(args.concurrency) + 1))
+        shuffled = list(range(size))
+        random.shuffle(shuffled)
+        (deletable, kept) = (shuffled[:ops * len(args.concurrency)], shuffled[ops * len(args.concurrency):])
+
+        for (level, concurrency) in enumerate(args.concurrency):
+            ids = [str(random.choice(kept)) for _ in range(ops)]
+
+            _result('get', concurrency, await _measure(
+                non_secrets.get_wallet_record_raw,
+                [(wallet_handle, TYPE, id_, b'{}') for id_ in ids], concurrency))
+            _result('update', concurrency, await _measure(
+                non_secrets.update_wallet_record_value,
+                [(wallet_handle, TYPE, id_, VALUE) for id_ in ids], concurrency))
+            _result('search', concurrency, await _measure(
+                _search,
+                [(wallet_handle, json.dumps({'cat': str(random.randrange(cardinality))}))
+                 for _ in range(max(1, ops // 10))], concurrency))
+            _result('delete', concurrency, await _measure(
+                non_secrets.delete_wallet_record,
+                [(wallet_handle, TYPE, str(i)) for i in deletable[level * ops:(level + 1) * ops]], concurrency))
+    finally:
+        await wallet.close_wallet(wallet_handle)
+        await wallet.delete_wallet(config, credentials)
+
+    return results
+
+
+async def _run(backends: list, args) -> list:
+    results = []
+    for backend in backends:
+        for size in args.sizes:
+            for cardinality in args.cardinality:
+                results.extend(await _scenario(backend, size, cardinality, args))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--backend', nargs='+', choices=('sqlite', 'postgres'), default=['sqlite'],
+                        help='storages to measure')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                        help='records per wallet')
+    parser.add_argument('--cardinality', type=int, nargs='+', default=[10, 1000],
+                        help='distinct values of the searched tag')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8, 32], help='operations in flight')
+    parser.add_argument('--ops', type=int, default=1000, help='measured operations per scenario')
+    parser.add_argument('--output', help='file to write JSON results to, stdout if omitted')
+    parser.add_argument('--postgres-plugin', default='libindystrgpostgres.so', help='postgres_storage library')
+    parser.add_argument('--postgres-config', default='{"url": "localhost:5432"}', help='postgres storage_config')
+    parser.add_argument('--postgres-credentials',
+                        default='{"account": "postgres", "password": "mysecretpassword", '
+                                '"admin_account": "postgres", "admin_password": "mysecretpassword"}',
+                        help='postgres storage_credentials')
+    args = parser.parse_args()
+
+    try:
+        libindy._cdll()
+    except OSError as e:
+        print("libindy is not available: {}".format(e), file=sys.stderr)
+        return
+
+    backends = []
+    if 'sqlite' in args.backend:
+        backends.append({'name': 'sqlite', 'config': {}, 'credentials': {}})
+    if 'postgres' in args.backend:
+        result = cdll.LoadLibrary(args.postgres_plugin).postgresstorage_init()
+        if result != 0:
+            print("Failed to initialize postgres_storage plugin: {}".format(result), file=sys.stderr)
+            return
+        backends.append({'name': 'postgres',
+                         'config': {'storage_type': 'postgres_storage',
+                                    'storage_config': json.loads(args.postgres_config)},
+                         'credentials': {'storage_credentials': json.loads(args.postgres_credentials)}})
+
+    results = asyncio.get_event_loop().run_until_complete(_run(backends, args))
+
+    report = json.dumps({
+        'meta': {
+            'timestamp': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'args': vars(args),
+        },
+        'results': results,
+    }, indent=2)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,11 +5,18 @@ from indy import crypto
 from indy import did
 from indy import ledger
 from indy import libindy
+from indy import metrics
 from indy import non_secrets
 from indy import pairwise
 from indy import payment
 from indy import pool
+from indy import sync
+from indy import unpack_pipeline
 from indy import wallet
+from indy import wallet_backup
+from indy import wallet_keys
+from indy import wallet_manager
+from indy import wql
 
 __all__ = [
     'anoncreds',
@@ -18,9 +25,16 @@ __all__ = [
     'did',
     'ledger',
     'libindy',
+    'metrics',
     'non_secrets',
     'pairwise',
     'payment',
     'pool',
-    'wallet'
+    'sync',
+    'unpack_pipeline',
+    'wallet',
+    'wallet_backup',
+    'wallet_keys',
+    'wallet_manager',
+    'wql'
 ]
@@ -0,0 +1,31 @@
+"""
+Helpers shared by the pure Python identifier functions of did and anoncreds.
+
+Identifier formats follow libindy (libindy/src/utils/qualifier.rs), `\\Z` matches like `$` of Rust regex.
+"""
+
+from .error import ErrorCode, IndyError, errorcode_to_exception
+
+from typing import Optional
+
+import re
+
+QUALIFIED_ENTITY = re.compile('[a-z0-9]+:([a-z0-9]+):(.*)\\Z')
+
+
+def to_unqualified(entity: str) -> str:
+    match = QUALIFIED_ENTITY.match(entity)
+    return match.group(2) if match is not None else entity
+
+
+def get_method(entity: str) -> Optional[str]:
+    match = QUALIFIED_ENTITY.match(entity)
+    return match.group(1) if match is not None else None
+
+
+def indy_error(error_code: ErrorCode, message: str) -> IndyError:
+    """
+    Builds the exception libindy raises for error_code with the given message.
+    """
+
+    return errorcode_to_exception(error_code)(error_code, {'message': message})
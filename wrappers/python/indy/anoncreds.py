@@ -1,9 +1,12 @@
 from .libindy import do_call, create_cb
+from ._qualifier import get_method, indy_error, to_unqualified
+from .error import ErrorCode
 
-from typing import Optional
+from typing import Iterable, List, Optional
 from ctypes import *
 
 import logging
+import re
 
 
 """
@@ -14,6 +17,10 @@ And is documented in this HIPE:
 https://github.com/hyperledger/indy-hipe/blob/c761c583b1e01c1e9d3ceda2b03b35336fdc8cc1/text/anoncreds-protocol/README.md
 """
 
+# Revocation registry id format of libindy (libindy/src/domain/anoncreds/revocation_registry_definition.rs)
+_REV_REG_ID = re.compile('(^revreg:(?P<method>[a-z0-9]+):)?(?P<did>.+):4:(?P<cred_def_id>.+):'
+                         '(?P<rev_reg_type>.+):(?P<tag>.+)\\Z')
+
 
 async def issuer_create_schema(issuer_did: str,
                                name: str,
@@ -926,6 +933,37 @@ async def prover_get_credential(wallet_handle: int,
     return res
 
 
+async def prover_get_credential_raw(wallet_handle: int,
+                                    cred_id: str) -> bytes:
+    """
+    Same as prover_get_credential, but returns credential json as bytes without decoding.
+
+    :param wallet_handle: wallet handle (created by open_wallet).
+    :param cred_id: Identifier by which requested credential is stored in the wallet
+    :return: credential json bytes
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("prover_get_credential_raw: >>> wallet_handle: %r, cred_id: %r",
+                 wallet_handle,
+                 cred_id)
+
+    if not hasattr(prover_get_credential_raw, "cb"):
+        logger.debug("prover_get_credential_raw: Creating callback")
+        prover_get_credential_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_wallet_handle = c_int32(wallet_handle)
+    c_cred_id = c_char_p(cred_id.encode('utf-8'))
+
+    res = await do_call('indy_prover_get_credential',
+                        c_wallet_handle,
+                        c_cred_id,
+                        prover_get_credential_raw.cb)
+
+    logger.debug("prover_get_credential_raw: <<< res: %r", res)
+    return res
+
+
 async def prover_delete_credential(wallet_handle: int,
                                    cred_id: str) -> None:
     """
@@ -1088,6 +1126,37 @@ async def prover_fetch_credentials(search_handle: int,
     return res
 
 
+async def prover_fetch_credentials_raw(search_handle: int,
+                                       count: int) -> bytes:
+    """
+    Same as prover_fetch_credentials, but returns credentials json as bytes without decoding.
+
+    :param search_handle: Search handle (created by prover_open_credentials_search)
+    :param count: Count of records to fetch
+    :return: credentials_json bytes
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("prover_fetch_credentials_raw: >>> search_handle: %r, count: %r",
+                 search_handle,
+                 count)
+
+    if not hasattr(prover_fetch_credentials_raw, "cb"):
+        logger.debug("prover_fetch_credentials_raw: Creating callback")
+        prover_fetch_credentials_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_search_handle = c_int32(search_handle)
+    c_count = c_uint(count)
+
+    res = await do_call('indy_prover_fetch_credentials',
+                        c_search_handle,
+                        c_count,
+                        prover_fetch_credentials_raw.cb)
+
+    logger.debug("prover_fetch_credentials_raw: <<< res: %r", res)
+    return res
+
+
 async def prover_close_credentials_search(search_handle: int) -> None:
     """
     Close credentials search (make search handle invalid)
@@ -1899,3 +1968,109 @@ async def to_unqualified(entity: str) -> str:
     res = res.decode()
     logger.debug("to_unqualified: <<< res: %r", res)
     return res
+
+
+def to_unqualified_ids(entities: Iterable[str]) -> List[str]:
+    """
+    Pure Python counterpart of to_unqualified for identifiers. Runs synchronously without calling libindy
+    and returns the same results and raises the same errors.
+
+    Credential definition ids are built in the format of ledger protocol version 2 (the default),
+    with tag even if pool.set_protocol_version(1) was called.
+
+    :param entities: iterable of entities to disqualify. Each can be one of:
+                Did
+                SchemaId
+                CredentialDefinitionId
+                RevocationRegistryId
+        Json objects (Schema, CredentialOffer, ProofRequest ...) are rejected with CommonInvalidStructure,
+        they are disqualified by to_unqualified only.
+
+    :return: list of entities either in unqualified form or original if casting isn't possible
+    """
+
+    return [_to_unqualified_id(entity) for entity in entities]
+
+
+def _to_unqualified_id(entity: str) -> str:
+    if not entity:
+        raise indy_error(ErrorCode.CommonInvalidParam2, "Empty string has been passed")
+
+    # Prefixes are checked in the order of libindy
+    if entity.startswith('did'):
+        return to_unqualified(entity)
+    if entity.startswith('schema'):
+        return _schema_id_to_unqualified(entity)
+    if entity.startswith('creddef'):
+        return _cred_def_id_to_unqualified(entity)
+    if entity.startswith('revreg'):
+        return _rev_reg_id_to_unqualified(entity)
+    if entity.lstrip(' \t\n\r').startswith('{'):
+        raise indy_error(ErrorCode.CommonInvalidStructure, "Json objects can be disqualified by to_unqualified only")
+
+    return entity
+
+
+def _split_id(id_: str) -> List[str]:
+    # Rust str::split_terminator: a trailing empty part is dropped
+    parts = id_.split(':')
+    if parts[-1] == '':
+        parts.pop()
+    return parts
+
+
+def _qualify_id(id_: str, prefix: str, did: str) -> str:
+    method = get_method(did)
+    return '{}:{}:{}'.format(prefix, method, id_) if method is not None else id_
+
+
+def _schema_id_to_unqualified(schema_id: str) -> str:
+    parts = _split_id(schema_id)
+
+    if len(parts) == 4:
+        # NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0
+        (did, name, version) = (parts[0], parts[2], parts[3])
+    elif len(parts) == 8:
+        # schema:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0
+        (did, name, version) = (':'.join(parts[2:5]), parts[6], parts[7])
+    else:
+        return schema_id
+
+    did = to_unqualified(did)
+    return _qualify_id('{}:2:{}:{}'.format(did, name, version), 'schema', did)
+
+
+def _cred_def_id_to_unqualified(cred_def_id: str) -> str:
+    parts = _split_id(cred_def_id)
+
+    if len(parts) in (4, 5):
+        # Th7MpTaRZVRYnPiabds81Y:3:CL:1[:tag]
+        (did, signature_type, schema_id, tag) = (parts[0], parts[2], parts[3], ''.join(parts[4:]))
+    elif len(parts) in (7, 8):
+        # NcYxiDXkpYi6ov5FcYDi1e:3:CL:NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0[:tag]
+        (did, signature_type, schema_id, tag) = (parts[0], parts[2], ':'.join(parts[3:7]), ''.join(parts[7:]))
+    elif len(parts) == 9:
+        # creddef:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:3:CL:3:tag
+        (did, signature_type, schema_id, tag) = (':'.join(parts[2:5]), parts[6], parts[7], parts[8])
+    elif len(parts) == 16:
+        # creddef:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:3:CL:schema:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0:tag
+        (did, signature_type, schema_id, tag) = (':'.join(parts[2:5]), parts[6], ':'.join(parts[7:15]), parts[15])
+    else:
+        return cred_def_id
+
+    did = to_unqualified(did)
+    id_ = '{}:3:{}:{}'.format(did, signature_type, _schema_id_to_unqualified(schema_id))
+    if tag:
+        id_ += ':' + tag
+    return _qualify_id(id_, 'creddef', did)
+
+
+def _rev_reg_id_to_unqualified(rev_reg_id: str) -> str:
+    match = _REV_REG_ID.search(rev_reg_id)
+    if match is None:
+        return rev_reg_id
+
+    did = to_unqualified(match.group('did'))
+    id_ = '{}:4:{}:{}:{}'.format(did, _cred_def_id_to_unqualified(match.group('cred_def_id')),
+                                 match.group('rev_reg_type'), match.group('tag'))
+    return _qualify_id(id_, 'revreg', did)
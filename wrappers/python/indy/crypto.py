@@ -1,8 +1,10 @@
-from .libindy import do_call, create_cb
+from .libindy import do_call, create_cb, buffer_to_bytes, requires_event_loop, run_windowed
+from .error import ErrorCode, IndyError
 
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 from ctypes import *
 
+import asyncio
 import logging
 import json
 
@@ -135,7 +137,7 @@ async def crypto_sign(wallet_handle: int,
                  msg)
 
     def transform_cb(arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-        return bytes(arr_ptr[:arr_len]),
+        return buffer_to_bytes(arr_ptr, arr_len),
 
     if not hasattr(crypto_sign, "cb"):
         logger.debug("crypto_sign: Creating callback")
@@ -196,6 +198,77 @@ async def crypto_verify(signer_vk: str,
     return res
 
 
+# Errors of crypto_verify caused by a malformed or empty verkey or signature
+_MALFORMED_SIGNATURE_ERRORS = frozenset((ErrorCode.CommonInvalidStructure,
+                                         ErrorCode.CommonInvalidParam2,
+                                         ErrorCode.CommonInvalidParam5,
+                                         ErrorCode.CommonInvalidParam6))
+
+
+@requires_event_loop
+async def verify_many(items: Iterable[Tuple[str, bytes, bytes]],
+                      chunk_size: int = 256,
+                      concurrency: int = 4) -> List[bool]:
+    """
+    Verifies many signatures like crypto_verify.
+
+    Identical (verkey, message, signature) triples are verified once. The rest is split into chunks of
+    `chunk_size` triples; all verifications of a chunk are sent to libindy at once and up to `concurrency`
+    chunks are in flight at once.
+
+    Triples with a malformed verkey or signature are reported as not verified. Other errors
+    (unknown crypto type of a verkey, empty message, ...) are raised.
+
+    :param items: iterable of (signer_vk, msg, signature) tuples (see crypto_verify)
+    :param chunk_size: count of triples sent to libindy at once
+    :param concurrency: maximum count of chunks in flight at once
+    :return: list of booleans in order of items: true - if signature is valid, false - otherwise
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("verify_many: >>> chunk_size: %r, concurrency: %r", chunk_size, concurrency)
+
+    unique = {}  # (signer_vk, msg, signature) -> index in triples
+    triples = []
+    positions = []
+
+    for (signer_vk, msg, signature) in items:
+        triple = (signer_vk, bytes(msg), bytes(signature))
+        index = unique.get(triple)
+        if index is None:
+            index = unique[triple] = len(triples)
+            triples.append(triple)
+        positions.append(index)
+
+    async def _verify_chunk(chunk: list) -> list:
+        results = await asyncio.gather(*(crypto_verify(signer_vk, msg, signature)
+                                         for (signer_vk, msg, signature) in chunk),
+                                       return_exceptions=True)
+
+        for (i, result) in enumerate(results):
+            if isinstance(result, IndyError) and result.error_code in _MALFORMED_SIGNATURE_ERRORS:
+                results[i] = False
+            elif isinstance(result, BaseException):
+                raise result
+        return results
+
+    (chunks, _) = await run_windowed(
+        _verify_chunk,
+        ((triples[start:start + chunk_size],) for start in range(0, len(triples), chunk_size)),
+        concurrency)
+
+    verified = []
+    for chunk in chunks:
+        if isinstance(chunk, Exception):
+            raise chunk
+        verified.extend(chunk)
+
+    res = [verified[index] for index in positions]
+
+    logger.debug("verify_many: <<< verified: %r of %r, unique: %r", sum(res), len(res), len(triples))
+    return res
+
+
 async def auth_crypt(wallet_handle: int,
                      sender_vk: str,
                      recipient_vk: str,
@@ -230,7 +303,7 @@ async def auth_crypt(wallet_handle: int,
                  msg)
 
     def transform_cb(arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-        return bytes(arr_ptr[:arr_len]),
+        return buffer_to_bytes(arr_ptr, arr_len),
 
     if not hasattr(auth_crypt, "cb"):
         logger.debug("auth_crypt: Creating callback")
@@ -283,7 +356,7 @@ async def auth_decrypt(wallet_handle: int,
                  encrypted_msg)
 
     def transform_cb(key: c_char_p, arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-        return key, bytes(arr_ptr[:arr_len]),
+        return key, buffer_to_bytes(arr_ptr, arr_len),
 
     if not hasattr(auth_decrypt, "cb"):
         logger.debug("crypto_box_open: Creating callback")
@@ -333,7 +406,7 @@ async def anon_crypt(recipient_vk: str,
                  msg)
 
     def transform_cb(arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-        return bytes(arr_ptr[:arr_len]),
+        return buffer_to_bytes(arr_ptr, arr_len),
 
     if not hasattr(anon_crypt, "cb"):
         logger.debug("anon_crypt: Creating callback")
@@ -380,7 +453,7 @@ async def anon_decrypt(wallet_handle: int,
                  encrypted_msg)
 
     def transform_cb(arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-        return bytes(arr_ptr[:arr_len]),
+        return buffer_to_bytes(arr_ptr, arr_len),
 
     if not hasattr(anon_decrypt, "cb"):
         logger.debug("anon_decrypt: Creating callback")
@@ -428,7 +501,7 @@ async def pack_message(wallet_handle: int,
                  sender_verkey)
 
     def transform_cb(arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-        return bytes(arr_ptr[:arr_len]),
+        return buffer_to_bytes(arr_ptr, arr_len),
 
     if not hasattr(pack_message, "cb"):
         logger.debug("pack_message: Creating callback")
@@ -483,7 +556,7 @@ async def unpack_message(wallet_handle: int,
                  jwe)
 
     def transform_cb(arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-        return bytes(arr_ptr[:arr_len]),
+        return buffer_to_bytes(arr_ptr, arr_len),
 
     if not hasattr(unpack_message, "cb"):
         logger.debug("unpack_message: Creating callback")
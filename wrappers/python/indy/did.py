@@ -1,10 +1,27 @@
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 
-from .libindy import do_call, create_cb
+from .libindy import do_call, create_cb, iter_json_array, requires_event_loop, run_windowed
+from .error import ErrorCode, WalletItemNotFound
+from ._qualifier import QUALIFIED_ENTITY, get_method, indy_error, to_unqualified
 
+from collections import OrderedDict
 from ctypes import *
 
+import asyncio
+import base58
+import json
 import logging
+import re
+import time
+import weakref
+
+# Resolvers to notify when keys of a DID change through this module
+_verkey_resolvers = weakref.WeakSet()
+
+# Identifier formats of libindy (libindy/src/utils/qualifier.rs), `\Z` matches like `$` of Rust regex
+_METHOD_NAME = re.compile('[a-z0-9]+\\Z')
+_BASE58 = re.compile('[1-9A-HJ-NP-Za-km-z]*\\Z')
+_CRYPTO_TYPES = ('ed25519',)
 
 
 async def create_and_store_my_did(wallet_handle: int,
@@ -46,17 +63,94 @@ async def create_and_store_my_did(wallet_handle: int,
     c_wallet_handle = c_int32(wallet_handle)
     c_did_json = c_char_p(did_json.encode('utf-8'))
 
-    did, verkey = await do_call('indy_create_and_store_my_did',
-                                c_wallet_handle,
-                                c_did_json,
-                                create_and_store_my_did.cb)
+    try:
+        did, verkey = await do_call('indy_create_and_store_my_did',
+                                    c_wallet_handle,
+                                    c_did_json,
+                                    create_and_store_my_did.cb)
+    except (asyncio.CancelledError, asyncio.TimeoutError):
+        # libindy may still create the DID, which isn't known here unless it is in did_json
+        _invalidate_verkey(wallet_handle, _did_of(did_json))
+        raise
 
     res = (did.decode(), verkey.decode())
+    # Drops "not found" entries cached before the DID existed
+    _invalidate_verkey(wallet_handle, res[0])
 
     logger.debug("create_and_store_my_did: <<< res: %r", res)
     return res
 
 
+class CreatedDid:
+    """
+    Result of creating a single DID with create_and_store_my_dids.
+
+    `did` and `verkey` are set once the DID is created, even if setting its metadata failed afterwards.
+    `error` is the raised exception, None on success.
+    """
+
+    __slots__ = ('did', 'verkey', 'error')
+
+    def __init__(self, did: Optional[str] = None, verkey: Optional[str] = None, error: Optional[Exception] = None):
+        self.did = did
+        self.verkey = verkey
+        self.error = error
+
+    def __repr__(self):
+        return "CreatedDid(did={!r}, verkey={!r}, error={!r})".format(self.did, self.verkey, self.error)
+
+
+@requires_event_loop
+async def create_and_store_my_dids(wallet_handle: int,
+                                   did_jsons,
+                                   window: int = 32) -> (list, dict):
+    """
+    Creates many DIDs like create_and_store_my_did keeping up to `window` of them in flight.
+
+    Failure of one DID (for example DidAlreadyExistsError) doesn't abort the batch:
+    its exception is returned in the `error` of its result.
+
+    :param wallet_handle: wallet handler (created by open_wallet).
+    :param did_jsons: iterable of Identity information jsons (see create_and_store_my_did) or of
+        (did_json, metadata) tuples to also set metadata of created DID with set_did_metadata.
+    :param window: maximum count of DIDs in flight
+    :return: Results and stats:
+        results: list of CreatedDid in order of did_jsons. If only set_did_metadata failed, the DID
+            is created and its did and verkey are set together with the error.
+        stats: {
+            count: int - count of DIDs,
+            errors: int - count of failed DIDs,
+            elapsed: float - duration in seconds,
+            dids_per_sec: float - throughput
+        }
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("create_and_store_my_dids: >>> wallet_handle: %r, window: %r",
+                 wallet_handle,
+                 window)
+
+    async def _create(did_json, metadata: Optional[str]) -> CreatedDid:
+        result = CreatedDid()
+        try:
+            (result.did, result.verkey) = await create_and_store_my_did(wallet_handle, did_json)
+            if metadata is not None:
+                await set_did_metadata(wallet_handle, result.did, metadata)
+        except Exception as e:
+            result.error = e
+        return result
+
+    (results, stats) = await run_windowed(
+        _create,
+        (item if isinstance(item, tuple) else (item, None) for item in did_jsons),
+        window,
+        'dids_per_sec')
+    stats['errors'] = sum(1 for result in results if result.error is not None)
+
+    logger.debug("create_and_store_my_dids: <<< stats: %r", stats)
+    return results, stats
+
+
 async def replace_keys_start(wallet_handle: int,
                              did: str,
                              identity_json: str) -> str:
@@ -124,10 +218,13 @@ async def replace_keys_apply(wallet_handle: int,
     c_wallet_handle = c_int32(wallet_handle)
     c_did = c_char_p(did.encode('utf-8'))
 
-    await do_call('indy_replace_keys_apply',
-                  c_wallet_handle,
-                  c_did,
-                  replace_keys_apply.cb)
+    try:
+        await do_call('indy_replace_keys_apply',
+                      c_wallet_handle,
+                      c_did,
+                      replace_keys_apply.cb)
+    finally:
+        _invalidate_verkey(wallet_handle, did)
 
     logger.debug("replace_keys_apply: <<<")
 
@@ -161,10 +258,13 @@ async def store_their_did(wallet_handle: int,
     c_wallet_handle = c_int32(wallet_handle)
     c_identity_json = c_char_p(identity_json.encode('utf-8'))
 
-    res = await do_call('indy_store_their_did',
-                        c_wallet_handle,
-                        c_identity_json,
-                        store_their_did.cb)
+    try:
+        res = await do_call('indy_store_their_did',
+                            c_wallet_handle,
+                            c_identity_json,
+                            store_their_did.cb)
+    finally:
+        _invalidate_verkey(wallet_handle, _did_of(identity_json))
 
     logger.debug("store_their_did: <<< res: %r", res)
     return res
@@ -367,6 +467,183 @@ async def key_for_local_did(wallet_handle: int,
     return res
 
 
+class VerkeyResolver:
+    """
+    In-process cache in front of key_for_did and key_for_local_did of one wallet.
+
+    Resolved verkeys are kept for `ttl` seconds and DIDs that are not found for `negative_ttl` seconds.
+    Concurrent lookups of the same DID share one libindy call. Entries of a DID are dropped when
+    create_and_store_my_did, replace_keys_apply or store_their_did of this module run for it on the same wallet,
+    and all entries are dropped when wallet.close_wallet closes the wallet, as its handle may be reused.
+    Usable from event loop code only.
+
+        resolver = VerkeyResolver(pool_handle, wallet_handle)
+        verkey = await resolver.key_for_did(their_did)
+    """
+
+    def __init__(self,
+                 pool_handle: Optional[int],
+                 wallet_handle: int,
+                 ttl: float = 300.0,
+                 negative_ttl: float = 30.0,
+                 max_entries: int = 10000):
+        """
+        :param pool_handle: Pool handle (created by open_pool) used by key_for_did,
+            key_for_did falls back to key_for_local_did if None.
+        :param wallet_handle: Wallet handle (created by open_wallet).
+        :param ttl: seconds to keep resolved verkey
+        :param negative_ttl: seconds to remember that DID was not found
+        :param max_entries: maximum count of cached DIDs, least recently used are dropped
+        """
+
+        self.pool_handle = pool_handle
+        self.wallet_handle = wallet_handle
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (local, did) -> (verkey or WalletItemNotFound, expires_at)
+        self._inflight = {}  # (local, did) -> future of pending lookup
+        self._generation = 0
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+        _verkey_resolvers.add(self)
+
+    async def key_for_did(self, did: str) -> str:
+        """
+        Cached key_for_did.
+
+        :param did: The DID to resolve key.
+        :return: key: The DIDs ver key (key id).
+        """
+
+        if self.pool_handle is None:
+            return await self.key_for_local_did(did)
+
+        return await self._resolve(False, did)
+
+    async def key_for_local_did(self, did: str) -> str:
+        """
+        Cached key_for_local_did.
+
+        :param did: The DID to resolve key.
+        :return: key: The DIDs ver key (key id).
+        """
+
+        return await self._resolve(True, did)
+
+    def invalidate(self, did: Optional[str] = None) -> None:
+        """
+        Drops cached entries of DID or all entries if DID is None.
+
+        :param did: (optional) The DID to drop entries of.
+        :return: None
+        """
+
+        self._generation += 1
+
+        if did is None:
+            self._entries.clear()
+        else:
+            self._entries.pop((False, did), None)
+            self._entries.pop((True, did), None)
+
+    def stats(self) -> dict:
+        """
+        Returns counters of the resolver.
+
+        :return: {
+            entries: int - count of cached DIDs,
+            hits: int - count of lookups served with cached verkey,
+            negative_hits: int - count of lookups served with cached not found error,
+            misses: int - count of lookups passed to libindy,
+            coalesced: int - count of lookups that waited for a lookup of the same DID in progress
+          }
+        """
+
+        return {
+            'entries': len(self._entries),
+            'hits': self._hits,
+            'negative_hits': self._negative_hits,
+            'misses': self._misses,
+            'coalesced': self._coalesced,
+        }
+
+    async def _resolve(self, local: bool, did: str) -> str:
+        key = (local, did)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                if isinstance(entry[0], WalletItemNotFound):
+                    self._negative_hits += 1
+                    # Fresh exception, so tracebacks don't pile up on the cached one
+                    raise WalletItemNotFound(entry[0].error_code, entry[0].error_details)
+                self._hits += 1
+                return entry[0]
+            del self._entries[key]
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._coalesced += 1
+            return await asyncio.shield(inflight)
+
+        self._misses += 1
+        # Lookup runs in its own task, so cancelling the lookup that started it doesn't cancel coalesced ones
+        inflight = self._inflight[key] = asyncio.ensure_future(self._lookup(key, self._generation))
+        inflight.add_done_callback(_retrieve_exception)
+        return await asyncio.shield(inflight)
+
+    async def _lookup(self, key: tuple, generation: int) -> str:
+        (local, did) = key
+
+        try:
+            if local:
+                res = await key_for_local_did(self.wallet_handle, did)
+            else:
+                res = await key_for_did(self.pool_handle, self.wallet_handle, did)
+        except WalletItemNotFound as e:
+            self._store(key, e, self.negative_ttl, generation)
+            raise
+        else:
+            self._store(key, res, self.ttl, generation)
+            return res
+        finally:
+            del self._inflight[key]
+
+    def _store(self, key: tuple, value, ttl: float, generation: int):
+        # Lookup raced with invalidation, its result may be stale
+        if generation != self._generation:
+            return
+
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _retrieve_exception(task: asyncio.Future):
+    # Retrieve exception so the task doesn't log it if no lookup waits for it anymore
+    if not task.cancelled():
+        task.exception()
+
+
+def _invalidate_verkey(wallet_handle: int, did: Optional[str]):
+    for resolver in list(_verkey_resolvers):
+        if resolver.wallet_handle == wallet_handle:
+            resolver.invalidate(did)
+
+
+def _did_of(identity_json: str) -> Optional[str]:
+    try:
+        return json.loads(identity_json).get('did')
+    except (ValueError, AttributeError):
+        return None
+
+
 async def set_endpoint_for_did(wallet_handle: int,
                                did: str,
                                address: str,
@@ -575,6 +852,47 @@ async def list_my_dids_with_meta(wallet_handle: int) -> str:
     return res
 
 
+async def iter_my_dids_with_meta(wallet_handle: int, page_size: int = 100):
+    """
+    Iterates DIDs and metadata stored in the wallet, decoding them one by one.
+
+    libindy returns all DIDs at once, but only one decoded DID is kept alive at a time and
+    control is returned to the event loop after every `page_size` DIDs.
+
+    :param wallet_handle: wallet handler (created by open_wallet).
+    :param page_size: count of DIDs decoded between yielding control to the event loop
+    :return: Async iterator of dicts:
+     {
+       "did": string - DID,
+       "verkey": string - verkey of the DID,
+       "tempVerkey": string - temporary verkey of the DID (if rotation is in progress),
+       "metadata": string - metadata of the DID
+     }
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("iter_my_dids_with_meta: >>> wallet_handle: %r, page_size: %r",
+                 wallet_handle,
+                 page_size)
+
+    if not hasattr(iter_my_dids_with_meta, "cb"):
+        logger.debug("iter_my_dids_with_meta: Creating callback")
+        iter_my_dids_with_meta.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_wallet_handle = c_int32(wallet_handle)
+
+    dids_with_meta = iter_json_array(await do_call('indy_list_my_dids_with_meta',
+                                                   c_wallet_handle,
+                                                   iter_my_dids_with_meta.cb))
+
+    for (i, did_with_meta) in enumerate(dids_with_meta, 1):
+        yield did_with_meta
+        if i % page_size == 0:
+            await asyncio.sleep(0)
+
+    logger.debug("iter_my_dids_with_meta: <<<")
+
+
 async def abbreviate_verkey(did: str,
                             full_verkey: str) -> str:
     """
@@ -645,3 +963,93 @@ async def qualify_did(wallet_handle: int,
 
     logger.debug("qualify_did: <<< res: %r", res)
     return res
+
+
+def abbreviate_verkeys(dids_with_verkeys: Iterable[Tuple[str, str]]) -> List[str]:
+    """
+    Pure Python counterpart of abbreviate_verkey for many DIDs at once.
+    Runs synchronously without calling libindy and returns the same results and raises the same errors.
+
+    :param dids_with_verkeys: iterable of (did, full_verkey) tuples (see abbreviate_verkey)
+    :return: list of either abbreviated or full verkeys in order of dids_with_verkeys
+    """
+
+    return [_abbreviate_verkey(did, full_verkey) for (did, full_verkey) in dids_with_verkeys]
+
+
+def to_qualified_dids(dids: Iterable[str], method: str) -> List[str]:
+    """
+    Formats DIDs as fully qualified DIDs with method like qualify_did does, without touching the wallet.
+    Already qualified DIDs get the new method.
+
+    :param dids: iterable of DIDs
+    :param method: method to apply to the DIDs.
+    :return: list of fully qualified DIDs in order of dids
+    """
+
+    if not method:
+        raise indy_error(ErrorCode.CommonInvalidParam4, "Empty string has been passed")
+    if _METHOD_NAME.match(method) is None:
+        raise indy_error(ErrorCode.CommonInvalidStructure,
+                         "Invalid default name: {}. It does not match the DID method name format.".format(method))
+
+    res = []
+    for did in dids:
+        _validate_did(did, ErrorCode.CommonInvalidParam3)
+        res.append("did:{}:{}".format(method, to_unqualified(did)))
+    return res
+
+
+def _abbreviate_verkey(did: str, full_verkey: str) -> str:
+    _validate_did(did, ErrorCode.CommonInvalidParam3)
+    if not full_verkey:
+        raise indy_error(ErrorCode.CommonInvalidParam4, "Empty string has been passed")
+
+    # Key validation of libindy CryptoService: verkey may have `:<crypto type>` suffix
+    (verkey, _, crypto_type) = full_verkey.partition(':')
+    if crypto_type and crypto_type not in _CRYPTO_TYPES:
+        raise indy_error(ErrorCode.UnknownCryptoTypeError,
+                         "Trying to use key with unknown crypto: {}".format(crypto_type))
+    if verkey.startswith('~'):
+        _b58decode(verkey[1:])
+    elif len(_b58decode(verkey)) != 32:
+        raise indy_error(ErrorCode.CommonInvalidStructure, "Invalid bytes for \"PublicKey\"")
+
+    method = get_method(did)
+    if method is not None and not method.startswith('sov'):
+        raise indy_error(ErrorCode.CommonInvalidState, "You can abbreviate fully-qualified did only with `sov` method")
+
+    decoded_did = _b58decode(to_unqualified(did))
+    decoded_verkey = _b58decode(full_verkey)
+
+    if decoded_verkey[:16] == decoded_did:
+        return '~' + _b58encode(decoded_verkey[16:])
+    return full_verkey
+
+
+def _validate_did(did: str, empty_error_code: ErrorCode):
+    if not did:
+        raise indy_error(empty_error_code, "Empty string has been passed")
+
+    if did.startswith('did') and QUALIFIED_ENTITY.match(did) is not None:
+        return
+
+    length = len(_b58decode(did))
+    if length not in (16, 32):
+        raise indy_error(ErrorCode.CommonInvalidStructure,
+                         "Trying to use DID with unexpected length: {}. "
+                         "The 16- or 32-byte number upon which a DID is based should be 22/23 or 44/45 bytes "
+                         "when encoded as base58.".format(length))
+
+
+def _b58decode(value: str) -> bytes:
+    # base58 package strips whitespace that libindy rejects, so the alphabet is checked first
+    if _BASE58.match(value) is None:
+        raise indy_error(ErrorCode.CommonInvalidStructure,
+                         "The base58 input contained a character not part of the base58 alphabet")
+    return base58.b58decode(value)
+
+
+def _b58encode(value: bytes) -> str:
+    res = base58.b58encode(value)
+    return res.decode() if isinstance(res, bytes) else res
@@ -1,5 +1,7 @@
 from enum import IntEnum
-from typing import Optional
+from typing import Optional, Union
+
+import json
 
 
 class ErrorCode(IntEnum):
@@ -184,12 +186,25 @@ class IndyError(Exception):
     #             1) setting environment variable `RUST_BACKTRACE=1`
     #             2) calling `set_runtime_config` function with `collect_backtrace: true`
 
-    def __init__(self, error_code: ErrorCode, error_details: Optional[dict] = None):
+    def __init__(self, error_code: ErrorCode, error_details: Union[dict, bytes, None] = None):
         super().__init__()
         self.error_code = error_code
-        if error_details:
-            self.message = error_details.get('message')
-            self.indy_backtrace = error_details.get('backtrace')
+        # Details can be passed as raw json captured from libindy, it is parsed on first access only
+        self._error_details = error_details
+
+    @property
+    def error_details(self) -> Optional[dict]:
+        if isinstance(self._error_details, bytes):
+            self._error_details = json.loads(self._error_details.decode())
+        return self._error_details
+
+    @property
+    def message(self) -> Optional[str]:
+        return self.error_details.get('message') if self.error_details else None
+
+    @property
+    def indy_backtrace(self) -> Optional[str]:
+        return self.error_details.get('backtrace') if self.error_details else None
 
 
 class CommonInvalidParam1(IndyError):
@@ -364,66 +379,70 @@ class PaymentExtraFundsError(IndyError):
     """ Extra funds on inputs """
 
 
+# Built once: errors are on the hot path of "probe then create" patterns
+_EXCEPTION_CLASSES = {
+    # Common Errors
+    ErrorCode.CommonInvalidParam1: CommonInvalidParam1,
+    ErrorCode.CommonInvalidParam2: CommonInvalidParam2,
+    ErrorCode.CommonInvalidParam3: CommonInvalidParam3,
+    ErrorCode.CommonInvalidParam4: CommonInvalidParam4,
+    ErrorCode.CommonInvalidParam5: CommonInvalidParam5,
+    ErrorCode.CommonInvalidParam6: CommonInvalidParam6,
+    ErrorCode.CommonInvalidParam7: CommonInvalidParam7,
+    ErrorCode.CommonInvalidParam8: CommonInvalidParam8,
+    ErrorCode.CommonInvalidParam9: CommonInvalidParam9,
+    ErrorCode.CommonInvalidParam10: CommonInvalidParam10,
+    ErrorCode.CommonInvalidParam11: CommonInvalidParam11,
+    ErrorCode.CommonInvalidParam12: CommonInvalidParam12,
+    ErrorCode.CommonInvalidState: CommonInvalidState,
+    ErrorCode.CommonInvalidStructure: CommonInvalidStructure,
+    ErrorCode.CommonIOError: CommonIOError,
+    # Wallet Errors
+    ErrorCode.WalletInvalidHandle: WalletInvalidHandle,
+    ErrorCode.WalletUnknownTypeError: WalletUnknownTypeError,
+    ErrorCode.WalletTypeAlreadyRegisteredError: WalletTypeAlreadyRegisteredError,
+    ErrorCode.WalletAlreadyExistsError: WalletAlreadyExistsError,
+    ErrorCode.WalletNotFoundError: WalletNotFoundError,
+    ErrorCode.WalletIncompatiblePoolError: WalletIncompatiblePoolError,
+    ErrorCode.WalletAlreadyOpenedError: WalletAlreadyOpenedError,
+    ErrorCode.WalletAccessFailed: WalletAccessFailed,
+    ErrorCode.WalletInputError: WalletInputError,
+    ErrorCode.WalletDecodingError: WalletDecodingError,
+    ErrorCode.WalletStorageError: WalletStorageError,
+    ErrorCode.WalletEncryptionError: WalletEncryptionError,
+    ErrorCode.WalletItemNotFound: WalletItemNotFound,
+    ErrorCode.WalletItemAlreadyExists: WalletItemAlreadyExists,
+    ErrorCode.WalletQueryError: WalletQueryError,
+    # Pool Errors
+    ErrorCode.PoolLedgerNotCreatedError: PoolLedgerNotCreatedError,
+    ErrorCode.PoolLedgerInvalidPoolHandle: PoolLedgerInvalidPoolHandle,
+    ErrorCode.PoolLedgerTerminated: PoolLedgerTerminated,
+    ErrorCode.LedgerNoConsensusError: LedgerNoConsensusError,
+    ErrorCode.LedgerInvalidTransaction: LedgerInvalidTransaction,
+    ErrorCode.LedgerSecurityError: LedgerSecurityError,
+    ErrorCode.PoolLedgerConfigAlreadyExistsError: PoolLedgerConfigAlreadyExistsError,
+    ErrorCode.PoolLedgerTimeout: PoolLedgerTimeout,
+    ErrorCode.PoolIncompatibleProtocolVersion: PoolIncompatibleProtocolVersion,
+    ErrorCode.LedgerNotFound: LedgerNotFound,
+    # Anoncreds Errors
+    ErrorCode.AnoncredsRevocationRegistryFullError: AnoncredsRevocationRegistryFullError,
+    ErrorCode.AnoncredsInvalidUserRevocId: AnoncredsInvalidUserRevocId,
+    ErrorCode.AnoncredsMasterSecretDuplicateNameError: AnoncredsMasterSecretDuplicateNameError,
+    ErrorCode.AnoncredsProofRejected: AnoncredsProofRejected,
+    ErrorCode.AnoncredsCredentialRevoked: AnoncredsCredentialRevoked,
+    ErrorCode.AnoncredsCredDefAlreadyExistsError: AnoncredsCredDefAlreadyExistsError,
+    # Crypto Errors
+    ErrorCode.UnknownCryptoTypeError: UnknownCryptoTypeError,
+    ErrorCode.DidAlreadyExistsError: DidAlreadyExistsError,
+    ErrorCode.PaymentUnknownMethodError: PaymentUnknownMethodError,
+    ErrorCode.PaymentIncompatibleMethodsError: PaymentIncompatibleMethodsError,
+    ErrorCode.PaymentInsufficientFundsError: PaymentInsufficientFundsError,
+    ErrorCode.PaymentSourceDoesNotExistError: PaymentSourceDoesNotExistError,
+    ErrorCode.PaymentOperationNotSupportedError: PaymentOperationNotSupportedError,
+    ErrorCode.PaymentExtraFundsError: PaymentExtraFundsError,
+}
+
+
 def errorcode_to_exception(errorcode):
     """ Map ErrorCode to an exception class. """
-    return {
-        # Common Errors
-        ErrorCode.CommonInvalidParam1: CommonInvalidParam1,
-        ErrorCode.CommonInvalidParam2: CommonInvalidParam2,
-        ErrorCode.CommonInvalidParam3: CommonInvalidParam3,
-        ErrorCode.CommonInvalidParam4: CommonInvalidParam4,
-        ErrorCode.CommonInvalidParam5: CommonInvalidParam5,
-        ErrorCode.CommonInvalidParam6: CommonInvalidParam6,
-        ErrorCode.CommonInvalidParam7: CommonInvalidParam7,
-        ErrorCode.CommonInvalidParam8: CommonInvalidParam8,
-        ErrorCode.CommonInvalidParam9: CommonInvalidParam9,
-        ErrorCode.CommonInvalidParam10: CommonInvalidParam10,
-        ErrorCode.CommonInvalidParam11: CommonInvalidParam11,
-        ErrorCode.CommonInvalidParam12: CommonInvalidParam12,
-        ErrorCode.CommonInvalidState: CommonInvalidState,
-        ErrorCode.CommonInvalidStructure: CommonInvalidStructure,
-        ErrorCode.CommonIOError: CommonIOError,
-        # Wallet Errors
-        ErrorCode.WalletInvalidHandle: WalletInvalidHandle,
-        ErrorCode.WalletUnknownTypeError: WalletUnknownTypeError,
-        ErrorCode.WalletTypeAlreadyRegisteredError: WalletTypeAlreadyRegisteredError,
-        ErrorCode.WalletAlreadyExistsError: WalletAlreadyExistsError,
-        ErrorCode.WalletNotFoundError: WalletNotFoundError,
-        ErrorCode.WalletIncompatiblePoolError: WalletIncompatiblePoolError,
-        ErrorCode.WalletAlreadyOpenedError: WalletAlreadyOpenedError,
-        ErrorCode.WalletAccessFailed: WalletAccessFailed,
-        ErrorCode.WalletInputError: WalletInputError,
-        ErrorCode.WalletDecodingError: WalletDecodingError,
-        ErrorCode.WalletStorageError: WalletStorageError,
-        ErrorCode.WalletEncryptionError: WalletEncryptionError,
-        ErrorCode.WalletItemNotFound: WalletItemNotFound,
-        ErrorCode.WalletItemAlreadyExists: WalletItemAlreadyExists,
-        ErrorCode.WalletQueryError: WalletQueryError,
-        # Pool Errors
-        ErrorCode.PoolLedgerNotCreatedError: PoolLedgerNotCreatedError,
-        ErrorCode.PoolLedgerInvalidPoolHandle: PoolLedgerInvalidPoolHandle,
-        ErrorCode.PoolLedgerTerminated: PoolLedgerTerminated,
-        ErrorCode.LedgerNoConsensusError: LedgerNoConsensusError,
-        ErrorCode.LedgerInvalidTransaction: LedgerInvalidTransaction,
-        ErrorCode.LedgerSecurityError: LedgerSecurityError,
-        ErrorCode.PoolLedgerConfigAlreadyExistsError: PoolLedgerConfigAlreadyExistsError,
-        ErrorCode.PoolLedgerTimeout: PoolLedgerTimeout,
-        ErrorCode.PoolIncompatibleProtocolVersion: PoolIncompatibleProtocolVersion,
-        ErrorCode.LedgerNotFound: LedgerNotFound,
-        # Anoncreds Errors
-        ErrorCode.AnoncredsRevocationRegistryFullError: AnoncredsRevocationRegistryFullError,
-        ErrorCode.AnoncredsInvalidUserRevocId: AnoncredsInvalidUserRevocId,
-        ErrorCode.AnoncredsMasterSecretDuplicateNameError: AnoncredsMasterSecretDuplicateNameError,
-        ErrorCode.AnoncredsProofRejected: AnoncredsProofRejected,
-        ErrorCode.AnoncredsCredentialRevoked: AnoncredsCredentialRevoked,
-        ErrorCode.AnoncredsCredDefAlreadyExistsError: AnoncredsCredDefAlreadyExistsError,
-        # Crypto Errors
-        ErrorCode.UnknownCryptoTypeError: UnknownCryptoTypeError,
-        ErrorCode.DidAlreadyExistsError: DidAlreadyExistsError,
-        ErrorCode.PaymentUnknownMethodError: PaymentUnknownMethodError,
-        ErrorCode.PaymentIncompatibleMethodsError: PaymentIncompatibleMethodsError,
-        ErrorCode.PaymentInsufficientFundsError: PaymentInsufficientFundsError,
-        ErrorCode.PaymentSourceDoesNotExistError: PaymentSourceDoesNotExistError,
-        ErrorCode.PaymentOperationNotSupportedError: PaymentOperationNotSupportedError,
-        ErrorCode.PaymentExtraFundsError: PaymentExtraFundsError,
-    }.get(errorcode, None)
+    return _EXCEPTION_CLASSES.get(errorcode)
@@ -1,4 +1,4 @@
-from .libindy import do_call, create_cb
+from .libindy import do_call, create_cb, to_c_char_p
 
 from typing import Optional
 from ctypes import *
@@ -52,6 +52,48 @@ async def sign_and_submit_request(pool_handle: int,
     return res
 
 
+async def sign_and_submit_request_raw(pool_handle: int,
+                                      wallet_handle: int,
+                                      submitter_did: str,
+                                      request_json) -> bytes:
+    """
+    Same as sign_and_submit_request, but takes request json as str or bytes-like object
+    and returns request result json as bytes without decoding.
+
+    :param pool_handle: pool handle (created by open_pool_ledger).
+    :param wallet_handle: wallet handle (created by open_wallet).
+    :param submitter_did: Id of Identity stored in secured Wallet.
+    :param request_json: Request data json as str, bytes, bytearray or memoryview.
+    :return: Request result as json bytes.
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("sign_and_submit_request_raw: >>> pool_handle: %r, wallet_handle: %r, submitter_did: %r, request_json: %r",
+                 pool_handle,
+                 wallet_handle,
+                 submitter_did,
+                 request_json)
+
+    if not hasattr(sign_and_submit_request_raw, "cb"):
+        logger.debug("sign_and_submit_request_raw: Creating callback")
+        sign_and_submit_request_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_pool_handle = c_int32(pool_handle)
+    c_wallet_handle = c_int32(wallet_handle)
+    c_submitter_did = c_char_p(submitter_did.encode('utf-8'))
+    c_request_json = to_c_char_p(request_json)
+
+    res = await do_call('indy_sign_and_submit_request',
+                        c_pool_handle,
+                        c_wallet_handle,
+                        c_submitter_did,
+                        c_request_json,
+                        sign_and_submit_request_raw.cb)
+
+    logger.debug("sign_and_submit_request_raw: <<< res: %r", res)
+    return res
+
+
 async def submit_request(pool_handle: int,
                          request_json: str) -> str:
     """
@@ -85,6 +127,38 @@ async def submit_request(pool_handle: int,
     return res
 
 
+async def submit_request_raw(pool_handle: int,
+                             request_json) -> bytes:
+    """
+    Same as submit_request, but takes request json as str or bytes-like object
+    and returns request result json as bytes without decoding.
+
+    :param pool_handle: pool handle (created by open_pool_ledger).
+    :param request_json: Request data json as str, bytes, bytearray or memoryview.
+    :return: Request result as json bytes.
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("submit_request_raw: >>> pool_handle: %r, request_json: %r",
+                 pool_handle,
+                 request_json)
+
+    if not hasattr(submit_request_raw, "cb"):
+        logger.debug("submit_request_raw: Creating callback")
+        submit_request_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_pool_handle = c_int32(pool_handle)
+    c_request_json = to_c_char_p(request_json)
+
+    res = await do_call('indy_submit_request',
+                        c_pool_handle,
+                        c_request_json,
+                        submit_request_raw.cb)
+
+    logger.debug("submit_request_raw: <<< res: %r", res)
+    return res
+
+
 async def submit_action(pool_handle: int,
                         request_json: str,
                         nodes: Optional[str],
@@ -428,6 +502,37 @@ async def build_get_nym_request(submitter_did: Optional[str],
     return res
 
 
+async def build_get_nym_request_raw(submitter_did: Optional[str],
+                                    target_did: str) -> bytes:
+    """
+    Same as build_get_nym_request, but returns request json as bytes without decoding.
+
+    :param submitter_did: (Optional) DID of the read request sender (if not provided then default Libindy DID will be used).
+    :param target_did: Target DID as base58-encoded string for 16 or 32 bit DID value.
+    :return: Request result as json bytes.
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("build_get_nym_request_raw: >>> submitter_did: %r, target_did: %r",
+                 submitter_did,
+                 target_did)
+
+    if not hasattr(build_get_nym_request_raw, "cb"):
+        logger.debug("build_get_nym_request_raw: Creating callback")
+        build_get_nym_request_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_submitter_did = c_char_p(submitter_did.encode('utf-8')) if submitter_did is not None else None
+    c_target_did = c_char_p(target_did.encode('utf-8'))
+
+    res = await do_call('indy_build_get_nym_request',
+                        c_submitter_did,
+                        c_target_did,
+                        build_get_nym_request_raw.cb)
+
+    logger.debug("build_get_nym_request_raw: <<< res: %r", res)
+    return res
+
+
 async def parse_get_nym_response(response: str) -> str:
     """
     Parse a GET_NYM response to get NYM data.
@@ -466,6 +571,33 @@ async def parse_get_nym_response(response: str) -> str:
     return res
 
 
+async def parse_get_nym_response_raw(response) -> bytes:
+    """
+    Same as parse_get_nym_response, but takes response as str or bytes-like object
+    and returns NYM data json as bytes without decoding.
+
+    :param response: response on GET_NYM request as str, bytes, bytearray or memoryview.
+    :return: NYM data json bytes.
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("parse_get_nym_response_raw: >>> response: %r",
+                 response)
+
+    if not hasattr(parse_get_nym_response_raw, "cb"):
+        logger.debug("parse_get_nym_response_raw: Creating callback")
+        parse_get_nym_response_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_response = to_c_char_p(response)
+
+    res = await do_call('indy_parse_get_nym_response',
+                        c_response,
+                        parse_get_nym_response_raw.cb)
+
+    logger.debug("parse_get_nym_response_raw: <<< res: %r", res)
+    return res
+
+
 async def build_schema_request(submitter_did: str,
                                data: str) -> str:
     """
@@ -538,6 +670,37 @@ async def build_get_schema_request(submitter_did: Optional[str],
     return res
 
 
+async def build_get_schema_request_raw(submitter_did: Optional[str],
+                                       id_: str) -> bytes:
+    """
+    Same as build_get_schema_request, but returns request json as bytes without decoding.
+
+    :param submitter_did: (Optional) DID of the read request sender (if not provided then default Libindy DID will be used).
+    :param id_: Schema Id in ledger
+    :return: Request result as json bytes.
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("build_get_schema_request_raw: >>> submitter_did: %r, id: %r",
+                 submitter_did,
+                 id_)
+
+    if not hasattr(build_get_schema_request_raw, "cb"):
+        logger.debug("build_get_schema_request_raw: Creating callback")
+        build_get_schema_request_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_submitter_did = c_char_p(submitter_did.encode('utf-8')) if submitter_did is not None else None
+    c_id = c_char_p(id_.encode('utf-8'))
+
+    res = await do_call('indy_build_get_schema_request',
+                        c_submitter_did,
+                        c_id,
+                        build_get_schema_request_raw.cb)
+
+    logger.debug("build_get_schema_request_raw: <<< res: %r", res)
+    return res
+
+
 async def parse_get_schema_response(get_schema_response: str) -> (str, str):
     """
     Parse a GET_SCHEMA response to get Schema in the format compatible with Anoncreds API
@@ -571,6 +734,33 @@ async def parse_get_schema_response(get_schema_response: str) -> (str, str):
     return res
 
 
+async def parse_get_schema_response_raw(get_schema_response) -> (str, bytes):
+    """
+    Same as parse_get_schema_response, but takes response as str or bytes-like object
+    and returns Schema json as bytes without decoding.
+
+    :param get_schema_response: response of GET_SCHEMA request as str, bytes, bytearray or memoryview.
+    :return: Schema Id and Schema json bytes.
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("parse_get_schema_response_raw: >>> get_schema_response: %r", get_schema_response)
+
+    if not hasattr(parse_get_schema_response_raw, "cb"):
+        logger.debug("parse_get_schema_response_raw: Creating callback")
+        parse_get_schema_response_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p, c_char_p))
+
+    c_get_schema_response = to_c_char_p(get_schema_response)
+
+    (schema_id, schema_json) = await do_call('indy_parse_get_schema_response',
+                                             c_get_schema_response,
+                                             parse_get_schema_response_raw.cb)
+
+    res = (schema_id.decode(), schema_json)
+    logger.debug("parse_get_schema_response_raw: <<< res: %r", res)
+    return res
+
+
 async def build_cred_def_request(submitter_did: str,
                                  data: str) -> str:
     """
@@ -649,6 +839,37 @@ async def build_get_cred_def_request(submitter_did: Optional[str],
     return res
 
 
+async def build_get_cred_def_request_raw(submitter_did: Optional[str],
+                                         id_: str) -> bytes:
+    """
+    Same as build_get_cred_def_request, but returns request json as bytes without decoding.
+
+    :param submitter_did: (Optional) DID of the read request sender (if not provided then default Libindy DID will be used).
+    :param id_: Credential Definition Id in ledger.
+    :return: Request result as json bytes.
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("build_get_cred_def_request_raw: >>> submitter_did: %r, id: %r",
+                 submitter_did,
+                 id_)
+
+    if not hasattr(build_get_cred_def_request_raw, "cb"):
+        logger.debug("build_get_cred_def_request_raw: Creating callback")
+        build_get_cred_def_request_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_submitter_did = c_char_p(submitter_did.encode('utf-8')) if submitter_did is not None else None
+    c_id = c_char_p(id_.encode('utf-8'))
+
+    res = await do_call('indy_build_get_cred_def_request',
+                        c_submitter_did,
+                        c_id,
+                        build_get_cred_def_request_raw.cb)
+
+    logger.debug("build_get_cred_def_request_raw: <<< res: %r", res)
+    return res
+
+
 async def parse_get_cred_def_response(get_cred_def_response: str) -> (str, str):
     """
     Parse a GET_CRED_DEF response to get Credential Definition in the format compatible with Anoncreds API.
@@ -686,6 +907,33 @@ async def parse_get_cred_def_response(get_cred_def_response: str) -> (str, str):
     return res
 
 
+async def parse_get_cred_def_response_raw(get_cred_def_response) -> (str, bytes):
+    """
+    Same as parse_get_cred_def_response, but takes response as str or bytes-like object
+    and returns Credential Definition json as bytes without decoding.
+
+    :param get_cred_def_response: response of GET_CRED_DEF request as str, bytes, bytearray or memoryview.
+    :return: Credential Definition Id and Credential Definition json bytes.
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("parse_get_cred_def_response_raw: >>> get_cred_def_response: %r", get_cred_def_response)
+
+    if not hasattr(parse_get_cred_def_response_raw, "cb"):
+        logger.debug("parse_get_cred_def_response_raw: Creating callback")
+        parse_get_cred_def_response_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p, c_char_p))
+
+    c_get_cred_def_response = to_c_char_p(get_cred_def_response)
+
+    (cred_def_id, cred_def_json) = await do_call('indy_parse_get_cred_def_response',
+                                                 c_get_cred_def_response,
+                                                 parse_get_cred_def_response_raw.cb)
+
+    res = (cred_def_id.decode(), cred_def_json)
+    logger.debug("parse_get_cred_def_response_raw: <<< res: %r", res)
+    return res
+
+
 async def build_node_request(submitter_did: str,
                              target_did: str,
                              data: str) -> str:
@@ -1,11 +1,22 @@
 from logging import ERROR, WARNING, INFO, DEBUG, CRITICAL
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from contextlib import contextmanager
 import logging
-from typing import Optional
+from typing import Callable, Optional
 import asyncio
+import atexit
+import contextvars
+import functools
 import itertools
 import json
+import re
 import sys
+import threading
+import time
+import weakref
 
+from . import metrics
 from .error import ErrorCode, IndyError, errorcode_to_exception
 
 from ctypes import *
@@ -13,54 +24,148 @@ from ctypes import *
 
 TRACE = 5
 
+# Looked up once: `Logger.isEnabledFor` caches its answer until the logging configuration changes,
+# so hot paths below check it first and skip building debug arguments when DEBUG is off.
+logger = logging.getLogger(__name__)
+
+# Seconds a cancelled or timed out command stays registered waiting for its native completion
+STALE_COMMAND_TTL = 600
+
+# Routes native completions to the registry of the event loop that issued the command
 _futures = {}
 _futures_counter = itertools.count()
+_registries = weakref.WeakKeyDictionary()
+_command_timeout = None
+_scoped_command_timeout = contextvars.ContextVar('indy_command_timeout')
+_callbacks = []
+_functions = {}
+_native_loggers = {}
+
 
+def do_call(name: str, *args, timeout: Optional[float] = None):
+    debug = logger.isEnabledFor(DEBUG)
+    if debug:
+        logger.debug("do_call: >>> name: %s, args: %s", name, args)
 
-def do_call(name: str, *args):
-    logger = logging.getLogger(__name__)
-    logger.debug("do_call: >>> name: %s, args: %s", name, args)
+    if timeout is None:
+        timeout = _scoped_command_timeout.get(_command_timeout)
+
+    if _blocking_calls.active:
+        return _do_blocking_call(name, args, timeout)
 
     event_loop = asyncio.get_event_loop()
     future = event_loop.create_future()
     command_handle = next(_futures_counter)
 
-    _futures[command_handle] = (event_loop, future)
-
-    err = getattr(_cdll(), name)(command_handle,
-                                 *args)
+    started = metrics.dispatched(name)
+    registry = _get_registry(event_loop)
+    registry.register(command_handle, name, future, timeout, started)
 
-    logger.debug("do_call: Function %s returned err: %i", name, err)
+    try:
+        err = _get_function(name)(command_handle,
+                                  *args)
+    except BaseException:
+        # Native function was not called (missing symbol, bad argument), so no completion will come
+        registry.discard(command_handle)
+        metrics.completed(name, started, True)
+        future.cancel()
+        raise
+
+    if debug:
+        logger.debug("do_call: Function %s returned err: %i", name, err)
     if err != ErrorCode.Success:
         logger.warning("_do_call: Function %s returned error %i", name, err)
+        registry.discard(command_handle)
+        metrics.completed(name, started, True)
         error = _get_indy_error(err)
         future.set_exception(error)
 
-    logger.debug("do_call: <<< %s", future)
+    if debug:
+        logger.debug("do_call: <<< %s", future)
     return future
 
 
 def do_call_sync(name: str, *args):
-    logger = logging.getLogger(__name__)
-    logger.debug("do_call_sync: >>> name: %s, args: %s", name, args)
+    debug = logger.isEnabledFor(DEBUG)
+    if debug:
+        logger.debug("do_call_sync: >>> name: %s, args: %s", name, args)
 
-    err = getattr(_cdll(), name)(*args)
+    err = _get_function(name)(*args)
 
-    logger.debug("do_call_sync: <<< %s", err)
+    if debug:
+        logger.debug("do_call_sync: <<< %s", err)
     return err
 
 
+def to_c_char_p(value) -> Optional[c_char_p]:
+    """
+    Converts `str` or bytes-like value to C string. `bytes` are passed as is without copying.
+    """
+
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    elif not isinstance(value, bytes):
+        value = bytes(value)
+    return c_char_p(value)
+
+
+def buffer_to_bytes(arr_ptr, arr_len: int) -> bytes:
+    """
+    Copies byte buffer passed by libindy to callback into `bytes` with a single memory copy.
+    The buffer is owned by libindy and valid only while the callback runs.
+    """
+
+    return string_at(arr_ptr, arr_len) if arr_len else b''
+
+
+_json_decoder = json.JSONDecoder()
+_json_whitespace = re.compile(r'[ \t\n\r]*')
+
+
+def iter_json_array(data: bytes):
+    """
+    Decodes json array returned by libindy element by element, so only one decoded element is alive at a time.
+    """
+
+    text = data.decode()
+    del data
+
+    idx = _json_whitespace.match(text, 0).end()
+    if text[idx:idx + 1] != '[':
+        raise ValueError("Expected json array at {}".format(idx))
+    idx = _json_whitespace.match(text, idx + 1).end()
+
+    if text[idx:idx + 1] == ']':
+        return
+
+    while True:
+        (value, idx) = _json_decoder.raw_decode(text, idx)
+        yield value
+
+        idx = _json_whitespace.match(text, idx).end()
+        separator = text[idx:idx + 1]
+        if separator == ']':
+            return
+        if separator != ',':
+            raise ValueError("Expected ',' or ']' at {}".format(idx))
+        idx = _json_whitespace.match(text, idx + 1).end()
+
+
 def create_cb(cb_type: CFUNCTYPE, transform_fn=None):
-    logger = logging.getLogger(__name__)
     logger.debug("create_cb: >>> cb_type: %s", cb_type)
 
     def _cb(command_handle: int, err: int, *args):
         if transform_fn:
             args = transform_fn(*args)
-        error = _get_indy_error(err)
+        # Error details are thread local in libindy, so they are captured here on the native thread
+        error = _get_indy_error(err) if err != ErrorCode.Success else None
         _indy_callback(command_handle, error, *args)
 
     res = cb_type(_cb)
+    # Keeps callback alive even if the caller replaces it while libindy may still call it
+    _callbacks.append(res)
 
     logger.debug("create_cb: <<< res: %s", res)
     return res
@@ -68,50 +173,64 @@ def create_cb(cb_type: CFUNCTYPE, transform_fn=None):
 
 def _get_indy_error(err: int) -> IndyError:
     errorcode = ErrorCode(err)
-    if errorcode == ErrorCode.Success:
-        return IndyError(errorcode)
+    error_class = errorcode_to_exception(errorcode) or IndyError
+    return error_class(errorcode, _get_error_details())
 
-    error_details = _get_error_details()
-    error_class = errorcode_to_exception(errorcode)
-    if error_class:
-        error = error_class(errorcode, error_details)
-    else:
-        error = IndyError(errorcode, error_details)
-    return error
 
+def _get_error_details() -> Optional[bytes]:
+    """
+    Returns error details json of the last libindy error in the current thread.
+    It is kept as raw json and parsed by `IndyError` on first access.
+    """
 
-def _get_error_details() -> Optional[dict]:
-    logger = logging.getLogger(__name__)
     logger.debug("_get_error_details: >>>")
 
     error_c = c_char_p()
     getattr(_cdll(), 'indy_get_current_error')(byref(error_c))
-    error_details = json.loads(error_c.value.decode()) if error_c.value else None
+    error_details = error_c.value
 
     logger.debug("_get_error_details: <<< error_details: %s", error_details)
     return error_details
 
 
-def _indy_callback(command_handle: int, err: IndyError, *args):
-    logger = logging.getLogger(__name__)
-    logger.debug("_indy_callback: >>> command_handle: %i, err %s, args: %s", command_handle, err, args)
+def _indy_callback(command_handle: int, err: Optional[IndyError], *args):
+    debug = logger.isEnabledFor(DEBUG)
+    if debug:
+        logger.debug("_indy_callback: >>> command_handle: %i, err %s, args: %s", command_handle, err, args)
 
-    (event_loop, future) = _futures[command_handle]
-    event_loop.call_soon_threadsafe(_indy_loop_callback, command_handle, err, *args)
+    registry = _futures.get(command_handle)
+    if registry is None:
+        logger.warning("_indy_callback: Completion for unknown or expired command %i dropped", command_handle)
+    else:
+        registry.put(command_handle, err, args)
 
-    logger.debug("_indy_callback: <<<")
+    if debug:
+        logger.debug("_indy_callback: <<<")
 
 
 def _indy_loop_callback(command_handle: int, err, *args):
-    logger = logging.getLogger(__name__)
-    logger.debug("_indy_loop_callback: >>> command_handle: %i, err %s, args: %s", command_handle, err, args)
-
-    (event_loop, future) = _futures.pop(command_handle)
-
-    if future.cancelled():
-        logger.debug("_indy_loop_callback: Future was cancelled earlier")
+    debug = logger.isEnabledFor(DEBUG)
+    if debug:
+        logger.debug("_indy_loop_callback: >>> command_handle: %i, err %s, args: %s", command_handle, err, args)
+
+    registry = _futures.pop(command_handle, None)
+    command = registry.resolve(command_handle) if registry is not None else None
+    if command is None:
+        if debug:
+            logger.debug("_indy_loop_callback: <<< Command is unknown")
+        return
+
+    (name, future, started) = command
+    metrics.completed(name, started, err is not None)
+
+    if future is None:
+        if debug:
+            logger.debug("_indy_loop_callback: Future was cancelled or timed out earlier")
+    elif future.cancelled():
+        if debug:
+            logger.debug("_indy_loop_callback: Future was cancelled earlier")
     else:
-        if err.error_code != ErrorCode.Success:
+        if err is not None:
             logger.warning("_indy_loop_callback: Function returned error %s", err)
             future.set_exception(err)
         else:
@@ -122,10 +241,376 @@ def _indy_loop_callback(command_handle: int, err, *args):
             else:
                 res = args
 
-            logger.debug("_indy_loop_callback: Function returned %s", res)
+            if debug:
+                logger.debug("_indy_loop_callback: Function returned %s", res)
             future.set_result(res)
 
-    logger.debug("_indy_loop_callback <<<")
+    if debug:
+        logger.debug("_indy_loop_callback <<<")
+
+
+class _CommandRegistry:
+    """
+    Pending libindy commands issued from one event loop.
+
+    Native threads push completions with `put`; the loop is woken up only when the queue
+    goes from empty to non-empty and then resolves all pending futures in one callback.
+
+    A command whose future is cancelled or times out becomes stale: it is kept until
+    its native completion arrives and is absorbed, or until `STALE_COMMAND_TTL` passes.
+    """
+
+    def __init__(self, event_loop):
+        # Weak reference, so the registry stored in `_registries` does not keep its loop alive
+        self._event_loop = weakref.ref(event_loop)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._commands = {}
+        self._stale = {}
+
+    def register(self, command_handle: int, name: str, future, timeout: Optional[float], started: float):
+        self._commands[command_handle] = (name, future, started)
+        _futures[command_handle] = self
+
+        if timeout is not None:
+            timer = self._event_loop().call_later(timeout, self._expire, command_handle, timeout)
+            future.add_done_callback(lambda _: timer.cancel())
+
+        future.add_done_callback(functools.partial(self._on_done, command_handle))
+
+    def discard(self, command_handle: int):
+        self._commands.pop(command_handle, None)
+        _futures.pop(command_handle, None)
+
+    def resolve(self, command_handle: int) -> Optional[tuple]:
+        """
+        Unregisters command on native completion.
+
+        :return: (name, future, started) of the command, future is None for stale command.
+        """
+
+        stale = self._stale.pop(command_handle, None)
+        if stale is not None:
+            (name, started, timer) = stale
+            timer.cancel()
+            return name, None, started
+
+        return self._commands.pop(command_handle, None)
+
+    def put(self, command_handle: int, err, args: tuple):
+        with self._lock:
+            self._pending.append((command_handle, err, args))
+            schedule = len(self._pending) == 1
+
+        if schedule:
+            # Runs on the native callback thread, the loop may be already closed or collected
+            event_loop = self._event_loop()
+            try:
+                if event_loop is None:
+                    raise RuntimeError("Event loop is collected")
+                event_loop.call_soon_threadsafe(self._drain)
+            except RuntimeError as e:
+                logger.warning("put: Completion of command %i dropped: %s", command_handle, e)
+                with self._lock:
+                    self._pending = []
+
+    def stats(self) -> dict:
+        now = time.perf_counter()
+        return {
+            'in_flight': len(self._commands),
+            'stale': len(self._stale),
+            'oldest_in_flight': max((now - started for (_, _, started) in self._commands.values()), default=0.0),
+        }
+
+    def _drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+
+        for (command_handle, err, args) in pending:
+            try:
+                _indy_loop_callback(command_handle, err, *args)
+            except Exception as e:
+                self._event_loop().call_exception_handler({
+                    'message': 'Exception in libindy completion callback',
+                    'exception': e,
+                })
+
+    def _expire(self, command_handle: int, timeout: float):
+        command = self._commands.get(command_handle)
+        if command is not None and not command[1].done():
+            (name, future, _) = command
+            logger.warning("_expire: Function %s did not complete in %s seconds", name, timeout)
+            future.set_exception(asyncio.TimeoutError(
+                "{} did not complete in {} seconds".format(name, timeout)))
+
+    def _on_done(self, command_handle: int, future):
+        # Still registered means the future was cancelled or timed out before native completion
+        command = self._commands.pop(command_handle, None)
+        if command is not None:
+            (name, _, started) = command
+            timer = self._event_loop().call_later(STALE_COMMAND_TTL, self._forget, command_handle)
+            self._stale[command_handle] = (name, started, timer)
+
+    def _forget(self, command_handle: int):
+        stale = self._stale.pop(command_handle, None)
+        if stale is not None:
+            (name, started, _) = stale
+            _futures.pop(command_handle, None)
+            metrics.completed(name, started, True)
+            logger.warning("_forget: Function %s was not completed by libindy in time", name)
+
+
+def _get_registry(event_loop) -> _CommandRegistry:
+    registry = _registries.get(event_loop)
+    if registry is None:
+        registry = _CommandRegistry(event_loop)
+        _registries[event_loop] = registry
+    return registry
+
+
+def get_command_stats(event_loop=None) -> dict:
+    """
+    Returns statistics of libindy commands issued from the given (or current) event loop.
+
+    :param event_loop: event loop to inspect. Current event loop is used if not set.
+    :return: {
+        "in_flight": int - count of commands waiting for libindy completion,
+        "stale": int - count of cancelled or timed out commands which libindy has not completed yet,
+        "oldest_in_flight": float - age in seconds of the oldest in-flight command,
+      }
+    """
+
+    registry = _registries.get(event_loop or asyncio.get_event_loop())
+    return registry.stats() if registry is not None else {'in_flight': 0, 'stale': 0, 'oldest_in_flight': 0.0}
+
+
+def set_command_timeout(timeout: Optional[float]):
+    """
+    Sets default deadline for libindy commands.
+
+    After the deadline the awaiting caller gets `asyncio.TimeoutError`, while late completion
+    from libindy is absorbed silently.
+
+    :param timeout: deadline in seconds, None to wait for libindy without limit (default).
+    """
+
+    global _command_timeout
+
+    logger.debug("set_command_timeout: >>> timeout: %r", timeout)
+    _command_timeout = timeout
+    logger.debug("set_command_timeout: <<<")
+
+
+@contextmanager
+def command_timeout(timeout: Optional[float]):
+    """
+    Sets deadline for libindy commands issued inside the block, overriding set_command_timeout.
+
+    Applies to the current task (or thread in indy.sync) only:
+
+        with command_timeout(5):
+            response = await ledger.submit_request(pool_handle, request_json)
+
+    :param timeout: deadline in seconds, None to wait for libindy without limit.
+    """
+
+    token = _scoped_command_timeout.set(timeout)
+    try:
+        yield
+    finally:
+        _scoped_command_timeout.reset(token)
+
+
+class _BlockingCalls(threading.local):
+    active = False
+
+
+_blocking_calls = _BlockingCalls()
+
+
+class _BlockingFuture:
+    """
+    Completion primitive of a blocking call, signalled directly from the native callback thread.
+
+    Awaiting it hands it over to `run_blocking`, which waits for the completion outside of any event loop.
+    """
+
+    __slots__ = ('_event', '_result', '_exception', '_timeout', '_name', '_started')
+
+    def __init__(self, name: str, timeout: Optional[float]):
+        self._event = threading.Event()
+        self._result = None
+        self._exception = None
+        self._timeout = timeout
+        self._name = name
+        self._started = metrics.dispatched(name)
+
+    def put(self, command_handle: int, err, args: tuple):
+        _futures.pop(command_handle, None)
+        metrics.completed(self._name, self._started, err is not None)
+
+        if err is not None:
+            self._exception = err
+        elif len(args) == 1:
+            (self._result,) = args
+        elif len(args) > 1:
+            self._result = args
+
+        self._event.set()
+
+    def set_exception(self, exception: Exception):
+        metrics.completed(self._name, self._started, True)
+        self._exception = exception
+        self._event.set()
+
+    def wait(self):
+        if not self._event.wait(self._timeout):
+            self._exception = TimeoutError("libindy command did not complete in {} seconds".format(self._timeout))
+
+    def __await__(self):
+        yield self
+
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+
+def _do_blocking_call(name: str, args: tuple, timeout: Optional[float]) -> _BlockingFuture:
+    future = _BlockingFuture(name, timeout)
+    command_handle = next(_futures_counter)
+
+    _futures[command_handle] = future
+
+    try:
+        err = _get_function(name)(command_handle,
+                                  *args)
+    except BaseException:
+        _futures.pop(command_handle, None)
+        raise
+
+    if err != ErrorCode.Success:
+        logger.warning("_do_blocking_call: Function %s returned error %i", name, err)
+        _futures.pop(command_handle, None)
+        future.set_exception(_get_indy_error(err))
+
+    return future
+
+
+def run_blocking(coro):
+    """
+    Runs wrapper coroutine in the current thread without an event loop.
+
+    Every libindy call of the coroutine blocks the current thread until libindy completes it,
+    so it is safe to call from many threads at once.
+
+    :param coro: coroutine returned by one of the indy wrapper functions.
+    :return: result of the coroutine.
+    """
+
+    active = _blocking_calls.active
+    _blocking_calls.active = True
+    try:
+        while True:
+            try:
+                future = coro.send(None)
+            except StopIteration as e:
+                return e.value
+
+            if not isinstance(future, _BlockingFuture):
+                coro.close()
+                raise RuntimeError("Coroutine awaits {!r}, which requires an event loop".format(future))
+
+            future.wait()
+    finally:
+        _blocking_calls.active = active
+
+
+def requires_event_loop(coroutine_function):
+    """
+    Marks wrapper coroutine that schedules tasks of its own and thus can't be run by run_blocking.
+    indy.sync doesn't mirror marked coroutines.
+    """
+
+    coroutine_function.requires_event_loop = True
+    return coroutine_function
+
+
+async def run_windowed(job: Callable, jobs_args, window: int, rate_name: str = 'ops_per_sec') -> (list, dict):
+    """
+    Awaits `job(*args)` for every args tuple of jobs_args keeping up to `window` of them in flight.
+
+    Failure of one job doesn't abort the others: its exception is returned in its result slot.
+    Requires an event loop, so wrappers built on it are marked with requires_event_loop.
+
+    :param job: coroutine function
+    :param jobs_args: iterable or async iterable of args tuples
+    :param window: maximum count of jobs in flight
+    :param rate_name: stats key of the throughput
+    :return: Results and stats:
+        results: list in order of jobs_args: value returned by job or raised exception
+        stats: {
+            count: int - count of jobs,
+            errors: int - count of failed jobs,
+            elapsed: float - duration in seconds,
+            <rate_name>: float - throughput in jobs per second
+        }
+    """
+
+    results = []
+    pending = set()
+
+    async def _run(index: int, args: tuple):
+        try:
+            results[index] = await job(*args)
+        except Exception as e:
+            results[index] = e
+
+    async def _submit(args: tuple):
+        if len(pending) >= window:
+            (_, still_pending) = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.intersection_update(still_pending)
+
+        results.append(None)
+        pending.add(asyncio.ensure_future(_run(len(results) - 1, args)))
+
+    started = time.perf_counter()
+
+    try:
+        if hasattr(jobs_args, '__aiter__'):
+            async for args in jobs_args:
+                await _submit(args)
+        else:
+            for args in jobs_args:
+                await _submit(args)
+
+        if pending:
+            await asyncio.wait(pending)
+    finally:
+        for task in pending:
+            task.cancel()
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        'count': len(results),
+        'errors': sum(1 for result in results if isinstance(result, Exception)),
+        'elapsed': elapsed,
+        rate_name: len(results) / elapsed if elapsed > 0 else 0.0,
+    }
+
+    return results, stats
+
+
+def _get_function(name: str):
+    """
+    Resolves libindy function only once. All `indy_*` functions return an `indy_error_t` code.
+    """
+
+    function = _functions.get(name)
+    if function is None:
+        function = getattr(_cdll(), name)
+        function.restype = c_int32
+        _functions[name] = function
+    return function
 
 
 def _cdll() -> CDLL:
@@ -137,7 +622,6 @@ def _cdll() -> CDLL:
 
 
 def _load_cdll() -> CDLL:
-    logger = logging.getLogger(__name__)
     logger.debug("_load_cdll: >>>")
 
     libindy_prefix_mapping = {"darwin": "lib", "linux": "lib", "linux2": "lib", "win32": ""}
@@ -165,26 +649,71 @@ def _load_cdll() -> CDLL:
         raise e
 
 
+class _NativeLogHandler(QueueHandler):
+    """
+    Queues native log records as they are, so libindy threads only pay for an enqueue
+    and never wait on the handlers configured by the application.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _NativeLogForwarder(logging.Handler):
+    """
+    Passes native log records from the listener thread on to the handlers of the wrapper logger.
+
+    libindy never consults enabled_cb: the Rust `log` macros only check the max level, which is set to
+    trace, so every native record reaches log_cb and is filtered there by the level of its logger.
+    """
+
+    def emit(self, record):
+        logger.handle(record)
+
+
+def _get_native_logger(target: bytes) -> logging.Logger:
+    native_logger = _native_loggers.get(target)
+    if native_logger is None:
+        native_logger = logger.getChild('native.' + target.decode().replace('::', '.'))
+        _native_loggers[target] = native_logger
+    return native_logger
+
+
 def _set_logger():
-    logger = logging.getLogger(__name__)
     logging.addLevelName(TRACE, "TRACE")
     logging.basicConfig(level=CRITICAL)
 
     logger.debug("set_logger: >>>")
 
+    level_mapping = {1: ERROR, 2: WARNING, 3: INFO, 4: DEBUG, 5: TRACE, }
+
+    def _enabled(context, level, target):
+        return _get_native_logger(target).isEnabledFor(level_mapping[level])
+
     def _log(context, level, target, message, module_path, file, line):
-        libindy_logger = logger.getChild('native.' + target.decode().replace('::', '.'))
+        libindy_logger = _get_native_logger(target)
+        level = level_mapping[level]
 
-        level_mapping = {1: ERROR, 2: WARNING, 3: INFO, 4: DEBUG, 5: TRACE, }
+        if not libindy_logger.isEnabledFor(level):
+            return
 
-        libindy_logger.log(level_mapping[level],
+        libindy_logger.log(level,
                            "\t%s:%d | %s",
-                           file.decode(),
+                           file.decode() if file else None,
                            line,
                            message.decode())
 
+    records = SimpleQueue()
+    native_logger = logger.getChild('native')
+    native_logger.propagate = False
+    native_logger.addHandler(_NativeLogHandler(records))
+
+    _set_logger.listener = QueueListener(records, _NativeLogForwarder())
+    _set_logger.listener.start()
+    atexit.register(_set_logger.listener.stop)
+
     _set_logger.callbacks = {
-        'enabled_cb': None,
+        'enabled_cb': CFUNCTYPE(c_bool, c_void_p, c_int, c_char_p)(_enabled),
         'log_cb': CFUNCTYPE(None, c_void_p, c_int, c_char_p, c_char_p, c_char_p, c_char_p, c_int)(_log),
         'flush_cb': None
     }
@@ -210,7 +739,6 @@ def set_runtime_config(config: str):
       }
     """
 
-    logger = logging.getLogger(__name__)
     logger.debug("set_runtime_config: >>> config: %r", config)
 
     c_config = c_char_p(config.encode('utf-8'))
@@ -0,0 +1,168 @@
+"""
+Per-function metrics of libindy calls made through the wrapper.
+
+For every libindy function dispatched by `do_call` the wrapper counts calls and errors,
+tracks the number of calls in flight and observes latency from dispatch to completion
+in a fixed-bucket histogram. Recording only updates preallocated counters, so it stays on.
+
+    from indy import metrics
+
+    metrics.snapshot()['indy_crypto_sign']['calls']
+    print(metrics.to_prometheus())
+"""
+
+from bisect import bisect_left
+
+import threading
+import time
+
+# Upper bounds (in seconds) of latency histogram buckets; the last implicit bucket is +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_lock = threading.Lock()
+_functions = {}
+
+
+class _FunctionMetrics:
+    __slots__ = ('calls', 'errors', 'in_flight', 'latency_sum', 'latency_buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.latency_sum = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+def dispatched(name: str) -> float:
+    """
+    Records dispatch of libindy function.
+
+    :param name: name of libindy function.
+    :return: dispatch time to pass to `completed`.
+    """
+
+    with _lock:
+        function = _functions.get(name)
+        if function is None:
+            function = _functions[name] = _FunctionMetrics()
+        function.calls += 1
+        function.in_flight += 1
+
+    return time.perf_counter()
+
+
+def completed(name: str, started: float, failed: bool):
+    """
+    Records completion of libindy function dispatched at `started`.
+
+    :param name: name of libindy function.
+    :param started: value returned by `dispatched`.
+    :param failed: whether libindy returned an error.
+    """
+
+    latency = time.perf_counter() - started
+
+    with _lock:
+        function = _functions[name]
+        function.in_flight -= 1
+        if failed:
+            function.errors += 1
+        function.latency_sum += latency
+        function.latency_buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+
+def reset():
+    """
+    Drops all collected metrics. Calls in flight are kept so the in-flight gauges stay correct.
+    """
+
+    with _lock:
+        for function in _functions.values():
+            function.calls = function.in_flight
+            function.errors = 0
+            function.latency_sum = 0.0
+            function.latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+def snapshot() -> dict:
+    """
+    Returns consistent copy of collected metrics.
+
+    :return: {
+        "<libindy function name>": {
+            "calls": int - count of dispatched calls,
+            "errors": int - count of calls completed with error,
+            "in_flight": int - count of calls waiting for completion,
+            "latency": {
+                "count": int - count of completed calls,
+                "sum": float - total latency in seconds,
+                "buckets": [[<upper bound in seconds or "+Inf">, <cumulative count>], ...]
+            }
+        }
+      }
+    """
+
+    res = {}
+
+    with _lock:
+        for (name, function) in _functions.items():
+            buckets = []
+            cumulative = 0
+            for (bound, count) in zip(LATENCY_BUCKETS + ('+Inf',), function.latency_buckets):
+                cumulative += count
+                buckets.append([bound, cumulative])
+
+            res[name] = {
+                'calls': function.calls,
+                'errors': function.errors,
+                'in_flight': function.in_flight,
+                'latency': {
+                    'count': cumulative,
+                    'sum': function.latency_sum,
+                    'buckets': buckets,
+                },
+            }
+
+    return res
+
+
+def to_prometheus(prefix: str = 'indy') -> str:
+    """
+    Renders collected metrics in Prometheus text exposition format.
+
+    :param prefix: prefix of metric names.
+    :return: metrics text.
+    """
+
+    functions = sorted(snapshot().items())
+    lines = []
+
+    def _family(name: str, kind: str, help_: str, samples):
+        lines.append("# HELP {}_{} {}".format(prefix, name, help_))
+        lines.append("# TYPE {}_{} {}".format(prefix, name, kind))
+        lines.extend(samples)
+
+    _family('ffi_calls_total', 'counter', 'Number of dispatched native calls.',
+            ['{}_ffi_calls_total{{function="{}"}} {}'.format(prefix, name, metrics['calls'])
+             for (name, metrics) in functions])
+    _family('ffi_errors_total', 'counter', 'Number of native calls completed with error.',
+            ['{}_ffi_errors_total{{function="{}"}} {}'.format(prefix, name, metrics['errors'])
+             for (name, metrics) in functions])
+    _family('ffi_in_flight', 'gauge', 'Number of native calls waiting for completion.',
+            ['{}_ffi_in_flight{{function="{}"}} {}'.format(prefix, name, metrics['in_flight'])
+             for (name, metrics) in functions])
+
+    samples = []
+    for (name, metrics) in functions:
+        latency = metrics['latency']
+        for (bound, count) in latency['buckets']:
+            samples.append('{}_ffi_call_duration_seconds_bucket{{function="{}",le="{}"}} {}'.format(
+                prefix, name, bound, count))
+        samples.append('{}_ffi_call_duration_seconds_sum{{function="{}"}} {!r}'.format(prefix, name, latency['sum']))
+        samples.append('{}_ffi_call_duration_seconds_count{{function="{}"}} {}'.format(
+            prefix, name, latency['count']))
+    _family('ffi_call_duration_seconds', 'histogram', 'Latency of native calls from dispatch to completion.',
+            samples)
+
+    return "\n".join(lines) + "\n"
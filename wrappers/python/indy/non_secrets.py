@@ -1,9 +1,185 @@
-from .libindy import do_call, create_cb
+from .libindy import do_call, create_cb, to_c_char_p, requires_event_loop, run_windowed
 
 from typing import Optional
 from ctypes import *
+from collections import OrderedDict
 
+import asyncio
+import json
 import logging
+import threading
+import time
+
+
+class _RecordCache:
+    """
+    LRU cache of wallet record json bytes keyed by (wallet_handle, type_, id, options_json bytes).
+
+    Entries are bounded by count and by total size of values and optionally expire after `ttl` seconds.
+    Every invalidation bumps `generation`, so a read that raced with a write doesn't store a stale value.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: Optional[float]):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.generation = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._records = {}  # (wallet_handle, type_, id) -> set of keys
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[1] is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: tuple, value: bytes, generation: int):
+        if len(value) > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if generation != self.generation:
+                return
+
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, expires_at)
+            self._records.setdefault(key[:3], set()).add(key)
+            self._bytes += len(value)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self._evictions += 1
+
+    def invalidate(self, wallet_handle: int, type_: str, id_: str):
+        with self._lock:
+            self.generation += 1
+            for key in self._records.get((wallet_handle, type_, id_), ()).copy():
+                self._remove(key)
+
+    def invalidate_wallet(self, wallet_handle: int):
+        with self._lock:
+            self.generation += 1
+            for key in [key for key in self._entries if key[0] == wallet_handle]:
+                self._remove(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+            }
+
+    def _remove(self, key: tuple):
+        (value, _) = self._entries.pop(key)
+        self._bytes -= len(value)
+
+        keys = self._records[key[:3]]
+        keys.discard(key)
+        if not keys:
+            del self._records[key[:3]]
+
+
+_record_cache = None
+
+_COUNT_OPTIONS = '{"retrieveRecords":false,"retrieveTotalCount":true}'
+# Maximum count of cached counts per wallet and record type
+_COUNT_CACHE_QUERIES = 256
+_count_cache = {}  # (wallet_handle, type_) -> {query_json: (count, expires_at)}
+# Bumped by every invalidation, so a count that raced with a write isn't cached
+_count_generation = 0
+
+
+def enable_wallet_record_cache(max_entries: int = 4096,
+                               max_bytes: int = 16 * 1024 * 1024,
+                               ttl: Optional[float] = None) -> None:
+    """
+    Enables in-process cache of get_wallet_record and get_wallet_record_raw results.
+
+    Cached records are invalidated by add_wallet_record, update_wallet_record_value, update_wallet_record_tags,
+    add_wallet_record_tags, delete_wallet_record_tags and delete_wallet_record of this module and by closing
+    the wallet with indy.wallet.close_wallet. Changes made to the wallet by other means
+    (another process, another wrapper) are seen only after `ttl` expires.
+    Enabling the cache again replaces it with an empty one.
+
+    :param max_entries: maximum count of cached records
+    :param max_bytes: maximum total size of cached record json
+    :param ttl: (optional) seconds after which cached record expires, never if None
+    :return: None
+    """
+
+    global _record_cache
+    _record_cache = _RecordCache(max_entries, max_bytes, ttl)
+
+
+def disable_wallet_record_cache() -> None:
+    """
+    Disables cache of wallet records and drops all cached records.
+
+    :return: None
+    """
+
+    global _record_cache
+    _record_cache = None
+
+
+def get_wallet_record_cache_stats() -> Optional[dict]:
+    """
+    Returns counters of wallet record cache.
+
+    :return: None if cache is disabled, otherwise:
+     {
+       entries: int - count of cached records,
+       bytes: int - total size of cached record json,
+       hits: int - count of reads served from cache,
+       misses: int - count of reads passed to libindy,
+       evictions: int - count of records dropped to fit size limits
+     }
+    """
+
+    return _record_cache.stats() if _record_cache is not None else None
+
+
+def _invalidate_wallet_record(wallet_handle: int, type_: str, id_: str):
+    global _count_generation
+    _count_generation += 1
+    _count_cache.pop((wallet_handle, type_), None)
+
+    cache = _record_cache
+    if cache is not None:
+        cache.invalidate(wallet_handle, type_, id_)
+
+
+def _invalidate_wallet_records(wallet_handle: int):
+    global _count_generation
+    _count_generation += 1
+    for key in [key for key in _count_cache if key[0] == wallet_handle]:
+        _count_cache.pop(key, None)
+
+    cache = _record_cache
+    if cache is not None:
+        cache.invalidate_wallet(wallet_handle)
 
 
 async def add_wallet_record(wallet_handle: int,
@@ -46,13 +222,16 @@ async def add_wallet_record(wallet_handle: int,
     c_value = c_char_p(value.encode('utf-8'))
     c_tags_json = c_char_p(tags_json.encode('utf-8')) if tags_json is not None else None
 
-    res = await do_call('indy_add_wallet_record',
-                        c_wallet_handle,
-                        c_type,
-                        c_id,
-                        c_value,
-                        c_tags_json,
-                        add_wallet_record.cb)
+    try:
+        res = await do_call('indy_add_wallet_record',
+                            c_wallet_handle,
+                            c_type,
+                            c_id,
+                            c_value,
+                            c_tags_json,
+                            add_wallet_record.cb)
+    finally:
+        _invalidate_wallet_record(wallet_handle, type_, id_)
 
     logger.debug("add_wallet_record: <<< res: %r", res)
     return res
@@ -88,12 +267,15 @@ async def update_wallet_record_value(wallet_handle: int,
     c_id = c_char_p(id_.encode('utf-8'))
     c_value = c_char_p(value.encode('utf-8'))
 
-    res = await do_call('indy_update_wallet_record_value',
-                        c_wallet_handle,
-                        c_type,
-                        c_id,
-                        c_value,
-                        update_wallet_record_value.cb)
+    try:
+        res = await do_call('indy_update_wallet_record_value',
+                            c_wallet_handle,
+                            c_type,
+                            c_id,
+                            c_value,
+                            update_wallet_record_value.cb)
+    finally:
+        _invalidate_wallet_record(wallet_handle, type_, id_)
 
     logger.debug("update_wallet_record_value: <<< res: %r", res)
     return res
@@ -135,12 +317,15 @@ async def update_wallet_record_tags(wallet_handle: int,
     c_id = c_char_p(id_.encode('utf-8'))
     c_tags_json = c_char_p(tags_json.encode('utf-8'))
 
-    res = await do_call('indy_update_wallet_record_tags',
-                        c_wallet_handle,
-                        c_type,
-                        c_id,
-                        c_tags_json,
-                        update_wallet_record_tags.cb)
+    try:
+        res = await do_call('indy_update_wallet_record_tags',
+                            c_wallet_handle,
+                            c_type,
+                            c_id,
+                            c_tags_json,
+                            update_wallet_record_tags.cb)
+    finally:
+        _invalidate_wallet_record(wallet_handle, type_, id_)
 
     logger.debug("update_wallet_record_tags: <<< res: %r", res)
     return res
@@ -182,12 +367,15 @@ async def add_wallet_record_tags(wallet_handle: int,
     c_id = c_char_p(id_.encode('utf-8'))
     c_tags_json = c_char_p(tags_json.encode('utf-8'))
 
-    res = await do_call('indy_add_wallet_record_tags',
-                        c_wallet_handle,
-                        c_type,
-                        c_id,
-                        c_tags_json,
-                        add_wallet_record_tags.cb)
+    try:
+        res = await do_call('indy_add_wallet_record_tags',
+                            c_wallet_handle,
+                            c_type,
+                            c_id,
+                            c_tags_json,
+                            add_wallet_record_tags.cb)
+    finally:
+        _invalidate_wallet_record(wallet_handle, type_, id_)
 
     logger.debug("add_wallet_record_tags: <<< res: %r", res)
     return res
@@ -223,12 +411,15 @@ async def delete_wallet_record_tags(wallet_handle: int,
     c_id = c_char_p(id_.encode('utf-8'))
     c_tag_names_json = c_char_p(tag_names_json.encode('utf-8'))
 
-    res = await do_call('indy_delete_wallet_record_tags',
-                        c_wallet_handle,
-                        c_type,
-                        c_id,
-                        c_tag_names_json,
-                        delete_wallet_record_tags.cb)
+    try:
+        res = await do_call('indy_delete_wallet_record_tags',
+                            c_wallet_handle,
+                            c_type,
+                            c_id,
+                            c_tag_names_json,
+                            delete_wallet_record_tags.cb)
+    finally:
+        _invalidate_wallet_record(wallet_handle, type_, id_)
 
     logger.debug("delete_wallet_record_tags: <<< res: %r", res)
     return res
@@ -260,11 +451,14 @@ async def delete_wallet_record(wallet_handle: int,
     c_type = c_char_p(type_.encode('utf-8'))
     c_id = c_char_p(id_.encode('utf-8'))
 
-    res = await do_call('indy_delete_wallet_record',
-                        c_wallet_handle,
-                        c_type,
-                        c_id,
-                        delete_wallet_record.cb)
+    try:
+        res = await do_call('indy_delete_wallet_record',
+                            c_wallet_handle,
+                            c_type,
+                            c_id,
+                            delete_wallet_record.cb)
+    finally:
+        _invalidate_wallet_record(wallet_handle, type_, id_)
 
     logger.debug("delete_wallet_record: <<< res: %r", res)
     return res
@@ -306,10 +500,21 @@ async def get_wallet_record(wallet_handle: int,
         logger.debug("get_wallet_record: Creating callback")
         get_wallet_record.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
 
+    c_options_json = to_c_char_p(options_json)
+
+    cache = _record_cache
+    if cache is not None:
+        key = (wallet_handle, type_, id, c_options_json.value if c_options_json is not None else None)
+        wallet_record = cache.get(key)
+        if wallet_record is not None:
+            res = wallet_record.decode()
+            logger.debug("get_wallet_record: <<< res (cached): %r", res)
+            return res
+        generation = cache.generation
+
     c_wallet_handle = c_int32(wallet_handle)
     c_type = c_char_p(type_.encode('utf-8'))
     c_id = c_char_p(id.encode('utf-8'))
-    c_options_json = c_char_p(options_json.encode('utf-8'))
 
     wallet_record = await do_call('indy_get_wallet_record',
                                   c_wallet_handle,
@@ -317,12 +522,70 @@ async def get_wallet_record(wallet_handle: int,
                                   c_id,
                                   c_options_json,
                                   get_wallet_record.cb)
+
+    if cache is not None:
+        cache.put(key, wallet_record, generation)
+
     res = wallet_record.decode()
 
     logger.debug("get_wallet_record: <<< res: %r", res)
     return res
 
 
+async def get_wallet_record_raw(wallet_handle: int,
+                                type_: str,
+                                id: str,
+                                options_json) -> bytes:
+    """
+    Same as get_wallet_record, but returns wallet record json as bytes without decoding.
+
+    :param wallet_handle: wallet handler (created by open_wallet).
+    :param type_: allows to separate different record types collections
+    :param id: the id of record
+    :param options_json: options json as str, bytes, bytearray or memoryview (see get_wallet_record)
+    :return: wallet record json bytes
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("get_wallet_record_raw: >>> wallet_handle: %r, type_: %r, id: %r, options_json: %r",
+                 wallet_handle,
+                 type_,
+                 id,
+                 options_json)
+
+    if not hasattr(get_wallet_record_raw, "cb"):
+        logger.debug("get_wallet_record_raw: Creating callback")
+        get_wallet_record_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_options_json = to_c_char_p(options_json)
+
+    cache = _record_cache
+    if cache is not None:
+        key = (wallet_handle, type_, id, c_options_json.value if c_options_json is not None else None)
+        res = cache.get(key)
+        if res is not None:
+            logger.debug("get_wallet_record_raw: <<< res (cached): %r", res)
+            return res
+        generation = cache.generation
+
+    c_wallet_handle = c_int32(wallet_handle)
+    c_type = c_char_p(type_.encode('utf-8'))
+    c_id = c_char_p(id.encode('utf-8'))
+
+    res = await do_call('indy_get_wallet_record',
+                        c_wallet_handle,
+                        c_type,
+                        c_id,
+                        c_options_json,
+                        get_wallet_record_raw.cb)
+
+    if cache is not None:
+        cache.put(key, res, generation)
+
+    logger.debug("get_wallet_record_raw: <<< res: %r", res)
+    return res
+
+
 async def open_wallet_search(wallet_handle: int,
                              type_: str,
                              query_json: str,
@@ -426,6 +689,42 @@ async def fetch_wallet_search_next_records(wallet_handle: int,
     return res
 
 
+async def fetch_wallet_search_next_records_raw(wallet_handle: int,
+                                               wallet_search_handle: int,
+                                               count: int) -> bytes:
+    """
+    Same as fetch_wallet_search_next_records, but returns wallet records json as bytes without decoding.
+
+    :param wallet_handle: wallet handler (created by open_wallet).
+    :param wallet_search_handle: wallet wallet handle (created by open_wallet_search)
+    :param count: Count of records to fetch
+    :return: wallet records json bytes
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("fetch_wallet_search_next_records_raw: >>> wallet_handle: %r, wallet_search_handle: %r, count: %r",
+                 wallet_handle,
+                 wallet_search_handle,
+                 count)
+
+    if not hasattr(fetch_wallet_search_next_records_raw, "cb"):
+        logger.debug("fetch_wallet_search_next_records_raw: Creating callback")
+        fetch_wallet_search_next_records_raw.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_wallet_handle = c_int32(wallet_handle)
+    c_wallet_search_handle = c_int32(wallet_search_handle)
+    c_count = c_uint(count)
+
+    res = await do_call('indy_fetch_wallet_search_next_records',
+                        c_wallet_handle,
+                        c_wallet_search_handle,
+                        c_count,
+                        fetch_wallet_search_next_records_raw.cb)
+
+    logger.debug("fetch_wallet_search_next_records_raw: <<< res: %r", res)
+    return res
+
+
 async def close_wallet_search(wallet_search_handle: int) -> None:
     """
     Close wallet search (make search handle invalid)
@@ -450,3 +749,188 @@ async def close_wallet_search(wallet_search_handle: int) -> None:
 
     logger.debug("close_wallet_search: <<< res: %r", res)
     return res
+
+
+async def count_wallet_records(wallet_handle: int,
+                               type_: str,
+                               query_json: str,
+                               cache_ttl: Optional[float] = None) -> int:
+    """
+    Count wallet records matching query without fetching them.
+
+    Search is opened with retrieveRecords false and retrieveTotalCount true, so libindy neither loads
+    nor decrypts matching records, and closed right after the count is fetched.
+
+    :param wallet_handle: wallet handler (created by open_wallet).
+    :param type_: allows to separate different record types collections
+    :param query_json: MongoDB style query to wallet record tags (see open_wallet_search)
+    :param cache_ttl: (optional) seconds to reuse the count for the same query.
+        Cached counts of a type are dropped by record writes of this module,
+        records changed by other means are seen only after the count expires.
+    :return: count of matching records
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("count_wallet_records: >>> wallet_handle: %r, type_: %r, query_json: %r, cache_ttl: %r",
+                 wallet_handle,
+                 type_,
+                 query_json,
+                 cache_ttl)
+
+    if cache_ttl is not None:
+        cached = _count_cache.get((wallet_handle, type_), {}).get(query_json)
+        if cached is not None and cached[1] > time.monotonic():
+            logger.debug("count_wallet_records: <<< res (cached): %r", cached[0])
+            return cached[0]
+
+    generation = _count_generation
+    search_handle = await open_wallet_search(wallet_handle, type_, query_json, _COUNT_OPTIONS)
+    try:
+        records = await fetch_wallet_search_next_records_raw(wallet_handle, search_handle, 1)
+    finally:
+        await close_wallet_search(search_handle)
+
+    res = json.loads(records.decode())['totalCount']
+
+    if cache_ttl is not None and generation == _count_generation:
+        queries = _count_cache.setdefault((wallet_handle, type_), {})
+        if len(queries) >= _COUNT_CACHE_QUERIES:
+            queries.clear()
+        queries[query_json] = (res, time.monotonic() + cache_ttl)
+
+    logger.debug("count_wallet_records: <<< res: %r", res)
+    return res
+
+
+async def iter_wallet_records(wallet_handle: int,
+                              type_: str,
+                              query_json: str,
+                              options_json: Optional[str] = None,
+                              page_size: int = 10,
+                              max_page_size: int = 1000,
+                              max_page_bytes: int = 4 * 1024 * 1024,
+                              target_page_latency: float = 0.05):
+    """
+    Iterate over wallet records matching the query:
+
+        async for record in non_secrets.iter_wallet_records(wallet_handle, type_, query_json):
+            ...
+
+    The next page is fetched while the caller processes the current one. Page size starts at
+    `page_size`, grows while pages are fetched faster than `target_page_latency` and shrinks
+    when they are slower, limited by `max_page_size` records and by `max_page_bytes`
+    based on observed record size. The search is closed when iteration ends, fails or is cancelled.
+
+    :param wallet_handle: wallet handler (created by open_wallet).
+    :param type_: allows to separate different record types collections
+    :param query_json: MongoDB style query to wallet record tags (see open_wallet_search)
+    :param options_json: search options json (see open_wallet_search), "{}" if not set
+    :param page_size: count of records to fetch in the first page
+    :param max_page_size: upper limit of count of records fetched at once
+    :param max_page_bytes: upper limit of estimated page json size
+    :param target_page_latency: page fetch duration in seconds the page size is adapted to
+    :return: async iterator of wallet records:
+     {
+       id: "Some id",
+       type: "Some type", // present only if retrieveType set to true
+       value: "Some value", // present only if retrieveValue set to true
+       tags: <tags json>, // present only if retrieveTags set to true
+     }
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("iter_wallet_records: >>> wallet_handle: %r, type_: %r, query_json: %r, options_json: %r",
+                 wallet_handle,
+                 type_,
+                 query_json,
+                 options_json)
+
+    async def _fetch(count: int):
+        started = time.perf_counter()
+        records_json = await fetch_wallet_search_next_records_raw(wallet_handle, search_handle, count)
+        return count, records_json, time.perf_counter() - started
+
+    search_handle = await open_wallet_search(wallet_handle, type_, query_json, options_json or "{}")
+    next_page = asyncio.ensure_future(_fetch(page_size))
+
+    try:
+        while next_page is not None:
+            (count, records_json, latency) = await next_page
+            records = json.loads(records_json.decode()).get('records') or []
+
+            if len(records) < count:
+                next_page = None
+            else:
+                if latency < target_page_latency:
+                    count = min(count * 2, max_page_size)
+                elif latency > 2 * target_page_latency:
+                    count = max(count // 2, 1)
+                record_size = max(len(records_json) // len(records), 1)
+                count = max(min(count, max_page_bytes // record_size), 1)
+
+                next_page = asyncio.ensure_future(_fetch(count))
+
+            for record in records:
+                yield record
+    finally:
+        if next_page is not None and not next_page.cancel():
+            # Already completed, retrieve its exception (if any) so it is not reported as unhandled
+            next_page.exception()
+        await close_wallet_search(search_handle)
+
+    logger.debug("iter_wallet_records: <<<")
+
+
+@requires_event_loop
+async def bulk_wallet_record_ops(wallet_handle: int,
+                                 operations,
+                                 window: int = 32) -> (list, dict):
+    """
+    Apply many wallet record operations keeping up to `window` of them in flight.
+
+    Failure of one operation doesn't abort the batch: its exception is returned in its result slot.
+    Operations for the same record are not ordered against each other inside the window.
+
+    :param wallet_handle: wallet handler (created by open_wallet).
+    :param operations: iterable or async iterable of operation tuples (wallet handle is not included):
+        ("add", type_, id_, value, tags_json)
+        ("update_value", type_, id_, value)
+        ("update_tags", type_, id_, tags_json)
+        ("add_tags", type_, id_, tags_json)
+        ("delete_tags", type_, id_, tag_names_json)
+        ("delete", type_, id_)
+    :param window: maximum count of operations in flight
+    :return: Results and stats:
+        results: list in order of operations: None for applied operation or raised exception
+        stats: {
+            count: int - count of operations,
+            errors: int - count of failed operations,
+            elapsed: float - duration in seconds,
+            ops_per_sec: float - throughput
+        }
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("bulk_wallet_record_ops: >>> wallet_handle: %r, operations: %r, window: %r",
+                 wallet_handle,
+                 operations,
+                 window)
+
+    functions = {
+        'add': add_wallet_record,
+        'update_value': update_wallet_record_value,
+        'update_tags': update_wallet_record_tags,
+        'add_tags': add_wallet_record_tags,
+        'delete_tags': delete_wallet_record_tags,
+        'delete': delete_wallet_record,
+    }
+
+    async def _apply(name: str, *args):
+        if name not in functions:
+            raise ValueError("Unknown wallet record operation: {!r}".format(name))
+        await functions[name](wallet_handle, *args)
+
+    (results, stats) = await run_windowed(_apply, operations, window, 'ops_per_sec')
+
+    logger.debug("bulk_wallet_record_ops: <<< stats: %r", stats)
+    return results, stats
@@ -1,8 +1,10 @@
-from .libindy import do_call, create_cb
+from .libindy import do_call, create_cb, iter_json_array
 
 from ctypes import *
 from typing import Optional
 
+import asyncio
+import json
 import logging
 
 
@@ -103,6 +105,44 @@ async def list_pairwise(wallet_handle: int) -> str:
     return res
 
 
+async def iter_pairwise(wallet_handle: int, page_size: int = 100):
+    """
+    Iterates saved pairwise, decoding them one by one.
+
+    libindy returns all pairwise at once as a list of json strings, but every entry is decoded
+    only when it is reached and control is returned to the event loop after every `page_size` entries.
+
+    :param wallet_handle: wallet handler (created by open_wallet).
+    :param page_size: count of pairwise decoded between yielding control to the event loop
+    :return: Async iterator of dicts:
+     {
+       "my_did": string - DID of mine,
+       "their_did": string - DID of theirs,
+       "metadata": string - optional metadata of the pairwise
+     }
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("iter_pairwise: >>> wallet_handle: %r, page_size: %r", wallet_handle, page_size)
+
+    if not hasattr(iter_pairwise, "cb"):
+        logger.debug("iter_pairwise: Creating callback")
+        iter_pairwise.cb = create_cb(CFUNCTYPE(None, c_int32, c_int32, c_char_p))
+
+    c_wallet_handle = c_int32(wallet_handle)
+
+    pairwise_list = iter_json_array(await do_call('indy_list_pairwise',
+                                                  c_wallet_handle,
+                                                  iter_pairwise.cb))
+
+    for (i, pairwise) in enumerate(pairwise_list, 1):
+        yield json.loads(pairwise)
+        if i % page_size == 0:
+            await asyncio.sleep(0)
+
+    logger.debug("iter_pairwise: <<<")
+
+
 async def get_pairwise(wallet_handle: int,
                        their_did: str) -> None:
     """
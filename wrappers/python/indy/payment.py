@@ -1,4 +1,4 @@
-from .libindy import do_call, create_cb
+from .libindy import do_call, create_cb, buffer_to_bytes
 
 from typing import Optional
 from ctypes import *
@@ -847,7 +847,7 @@ async def sign_with_address(wallet_handle: int,
 
 
     def transform_cb(arr_ptr: POINTER(c_uint8), arr_len: c_uint32):
-        return bytes(arr_ptr[:arr_len]),
+        return buffer_to_bytes(arr_ptr, arr_len),
 
 
     if not hasattr(sign_with_address, "cb"):
@@ -0,0 +1,71 @@
+"""
+Blocking counterparts of the indy wrapper coroutines for thread based applications.
+
+Every coroutine of the indy modules is mirrored here with the same name and parameters, except
+the batch helpers that schedule tasks on an event loop (see libindy.requires_event_loop).
+The calling thread waits for libindy completion directly, without any event loop, so
+a thread pool can use these functions concurrently:
+
+    from indy.sync import anoncreds
+
+    (cred_json, cred_revoc_id, revoc_reg_delta_json) = \
+        anoncreds.issuer_create_credential(wallet_handle, cred_offer_json, cred_req_json, cred_values_json, None, None)
+"""
+
+from indy import anoncreds, blob_storage, cache, crypto, did, ledger, non_secrets, pairwise, payment, pool, wallet
+from indy.libindy import run_blocking
+
+from types import ModuleType
+
+import functools
+import inspect
+import sys
+
+
+def _blocking(coroutine_function):
+    @functools.wraps(coroutine_function)
+    def _call(*args, **kwargs):
+        return run_blocking(coroutine_function(*args, **kwargs))
+
+    return _call
+
+
+def _mirror(module) -> ModuleType:
+    name = "{}.{}".format(__name__, module.__name__.rsplit('.', 1)[-1])
+    mirror = ModuleType(name, module.__doc__)
+
+    for (attr, value) in vars(module).items():
+        if inspect.iscoroutinefunction(value) and value.__module__ == module.__name__ \
+                and not getattr(value, 'requires_event_loop', False):
+            setattr(mirror, attr, _blocking(value))
+
+    # Allows `import indy.sync.<module>` as well as `from indy.sync import <module>`
+    sys.modules[name] = mirror
+    return mirror
+
+
+anoncreds = _mirror(anoncreds)
+blob_storage = _mirror(blob_storage)
+cache = _mirror(cache)
+crypto = _mirror(crypto)
+did = _mirror(did)
+ledger = _mirror(ledger)
+non_secrets = _mirror(non_secrets)
+pairwise = _mirror(pairwise)
+payment = _mirror(payment)
+pool = _mirror(pool)
+wallet = _mirror(wallet)
+
+__all__ = [
+    'anoncreds',
+    'blob_storage',
+    'cache',
+    'crypto',
+    'did',
+    'ledger',
+    'non_secrets',
+    'pairwise',
+    'payment',
+    'pool',
+    'wallet'
+]
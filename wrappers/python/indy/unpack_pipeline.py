@@ -0,0 +1,251 @@
+"""
+Unpacks a stream of inbound messages concurrently with crypto.unpack_message.
+
+`UnpackPipeline.unpack` reads `(sender_id, jwe)` tuples from an async iterable and yields unpacked
+messages. Up to `window` messages are unpacked at once. Messages of one sender are yielded in the
+order they were received, and messages of different senders don't wait for each other.
+The sender verkey of an authcrypted message is only known after unpacking, so `sender_id` comes from
+the transport: a connection id, a session or anything hashable that identifies the sender.
+
+Messages that are received but not yet yielded count against the window. Reading of the stream
+therefore stops when the consumer falls behind:
+
+    pipeline = UnpackPipeline(wallet_handle, window=64)
+
+    async for unpacked in pipeline.unpack(inbound):
+        if unpacked.error is None:
+            await dispatch(unpacked.json['@type'], unpacked)
+
+    pipeline.stats()['latency']
+"""
+
+from . import crypto
+from .error import IndyError
+from .metrics import LATENCY_BUCKETS
+
+from bisect import bisect_left
+from collections import deque
+from typing import Hashable, Optional
+
+import asyncio
+import json
+import logging
+import time
+
+
+class UnpackedMessage:
+    """
+    Result of unpacking a single message. The unpacked envelope and the message json are parsed on first access.
+    Accessing them re-raises the error for messages that failed to unpack.
+    """
+
+    __slots__ = ('sender_id', 'raw', 'error', 'latency', '_envelope', '_json')
+
+    def __init__(self, sender_id: Hashable, raw: Optional[bytes], error: Optional[IndyError], latency: float):
+        self.sender_id = sender_id
+        self.raw = raw  # unpack_message result, None if it failed
+        self.error = error
+        self.latency = latency
+        self._envelope = None
+        self._json = None
+
+    @property
+    def envelope(self) -> dict:
+        """
+        :return: {"message": <decrypted message>, "recipient_verkey": str, "sender_verkey": str (authcrypt only)}
+        """
+
+        if self.error is not None:
+            raise self.error
+        if self._envelope is None:
+            self._envelope = json.loads(self.raw.decode())
+        return self._envelope
+
+    @property
+    def message(self) -> str:
+        return self.envelope['message']
+
+    @property
+    def recipient_verkey(self) -> str:
+        return self.envelope['recipient_verkey']
+
+    @property
+    def sender_verkey(self) -> Optional[str]:
+        return self.envelope.get('sender_verkey')
+
+    @property
+    def json(self):
+        """
+        :return: decrypted message parsed as json
+        """
+
+        if self._json is None:
+            self._json = json.loads(self.message)
+        return self._json
+
+
+class UnpackPipeline:
+    """
+    Unpacks messages of a wallet concurrently, keeping the order of messages of every sender.
+
+    One pipeline can serve several streams at once; `stats` covers all of them.
+    """
+
+    def __init__(self, wallet_handle: int, window: int = 32):
+        """
+        :param wallet_handle: wallet handle (created by open_wallet) with recipient keys
+        :param window: maximum count of messages received but not yet yielded
+        """
+
+        if window < 1:
+            raise ValueError("window must be positive")
+
+        self.wallet_handle = wallet_handle
+        self.window = window
+        self._received = 0
+        self._unpacked = 0
+        self._errors = 0
+        self._unpacking = 0
+        self._waiting = 0
+        self._max_depth = 0
+        self._latency_sum = 0.0
+        self._latency_buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    async def unpack(self, messages):
+        """
+        Unpacks messages of async iterable and yields UnpackedMessage for every one of them.
+
+        A message that fails to unpack is yielded with `error` set, it doesn't stop the stream.
+        Errors of the stream itself are raised after messages in progress are cancelled.
+
+        :param messages: async iterable of (sender_id, jwe) tuples, jwe is output of crypto.pack_message
+        :return: async generator of UnpackedMessage
+        """
+
+        logger = logging.getLogger(__name__)
+        logger.debug("unpack: >>> wallet_handle: %r, window: %r", self.wallet_handle, self.window)
+
+        iterator = messages.__aiter__()
+        reading = None
+        exhausted = False
+        held = 0  # messages received but not yet yielded
+        senders = {}  # sender id -> deque of unpack tasks in order of receiving
+        unpacking = {}  # unpack task -> sender id
+
+        try:
+            while True:
+                if not exhausted and reading is None and held < self.window:
+                    reading = asyncio.ensure_future(iterator.__anext__())
+
+                waiting_for = set(unpacking)
+                if reading is not None:
+                    waiting_for.add(reading)
+                if not waiting_for:
+                    break
+
+                (done, _) = await asyncio.wait(waiting_for, return_when=asyncio.FIRST_COMPLETED)
+
+                if reading in done:
+                    (task, reading) = (reading, None)
+                    try:
+                        (sender_id, jwe) = task.result()
+                    except StopAsyncIteration:
+                        exhausted = True
+                    else:
+                        unpack_task = asyncio.ensure_future(self._unpack(sender_id, jwe))
+                        # Counted by the task, not the coroutine: a task cancelled before it starts never runs it
+                        unpack_task.add_done_callback(self._on_unpacked)
+                        unpacking[unpack_task] = sender_id
+                        senders.setdefault(sender_id, deque()).append(unpack_task)
+                        held += 1
+                        self._received += 1
+                        self._unpacking += 1
+                        self._max_depth = max(self._max_depth, held)
+
+                for sender_id in {unpacking.pop(task) for task in done if task in unpacking}:
+                    queue = senders[sender_id]
+                    while queue and queue[0].done():
+                        # Tasks completed while the consumer held a message are missing from `done`
+                        task = queue.popleft()
+                        unpacking.pop(task, None)
+                        unpacked = task.result()
+                        if not queue:
+                            del senders[sender_id]
+
+                        self._waiting -= 1
+                        held -= 1
+                        yield unpacked
+        finally:
+            if reading is not None:
+                reading.cancel()
+            for task in unpacking:
+                task.cancel()
+            for queue in senders.values():
+                for task in queue:
+                    if task.done() and not task.cancelled() and task.exception() is None:
+                        self._waiting -= 1
+
+        logger.debug("unpack: <<<")
+
+    def stats(self) -> dict:
+        """
+        Returns counters of the pipeline.
+
+        :return: {
+            received: int - count of messages read from streams,
+            unpacked: int - count of unpacked messages,
+            errors: int - count of messages that failed to unpack,
+            unpacking: int - count of messages being unpacked now,
+            waiting: int - count of unpacked messages waiting for earlier messages of the sender or for the consumer,
+            max_depth: int - maximum count of messages received but not yet yielded by a stream,
+            latency: {
+                count: int - count of completed unpacks,
+                sum: float - total unpack latency in seconds,
+                buckets: [[<upper bound in seconds or "+Inf">, <cumulative count>], ...] (see metrics.snapshot)
+            }
+          }
+        """
+
+        buckets = []
+        cumulative = 0
+        for (bound, count) in zip(LATENCY_BUCKETS + ('+Inf',), self._latency_buckets):
+            cumulative += count
+            buckets.append([bound, cumulative])
+
+        return {
+            'received': self._received,
+            'unpacked': self._unpacked,
+            'errors': self._errors,
+            'unpacking': self._unpacking,
+            'waiting': self._waiting,
+            'max_depth': self._max_depth,
+            'latency': {
+                'count': cumulative,
+                'sum': self._latency_sum,
+                'buckets': buckets,
+            },
+        }
+
+    async def _unpack(self, sender_id: Hashable, jwe: bytes) -> UnpackedMessage:
+        started = time.perf_counter()
+        (raw, error) = (None, None)
+
+        try:
+            raw = await crypto.unpack_message(self.wallet_handle, jwe)
+        except IndyError as e:
+            error = e
+
+        latency = time.perf_counter() - started
+        self._latency_sum += latency
+        self._latency_buckets[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        if error is None:
+            self._unpacked += 1
+        else:
+            self._errors += 1
+
+        return UnpackedMessage(sender_id, raw, error, latency)
+
+    def _on_unpacked(self, task: asyncio.Future):
+        self._unpacking -= 1
+        if not task.cancelled() and task.exception() is None:
+            self._waiting += 1
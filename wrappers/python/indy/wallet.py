@@ -1,4 +1,6 @@
+from .did import _invalidate_verkey
 from .libindy import do_call, create_cb
+from .non_secrets import _invalidate_wallet_records
 
 from ctypes import *
 from typing import Optional
@@ -147,9 +149,13 @@ async def close_wallet(handle: int) -> None:
 
     c_handle = c_int32(handle)
 
-    await do_call('indy_close_wallet',
-                  c_handle,
-                  close_wallet.cb)
+    try:
+        await do_call('indy_close_wallet',
+                      c_handle,
+                      close_wallet.cb)
+    finally:
+        _invalidate_wallet_records(handle)
+        _invalidate_verkey(handle, None)
 
     logger.debug("close_wallet: <<<")
 
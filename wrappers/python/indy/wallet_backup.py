@@ -0,0 +1,263 @@
+"""
+Exports and imports fleets of wallets concurrently.
+
+`export_wallets` opens every wallet, exports it to `<directory>/<wallet id>.export` and closes it,
+keeping up to `concurrency` wallets in progress. Completed exports are recorded in a manifest in the
+directory, so running it again after a crash skips wallets already exported. `import_wallets`
+restores the exported files the same way.
+
+    stats = await export_wallets(
+        [(config, credentials, export_key) for (config, credentials, export_key) in tenants],
+        '/backup/2019-12-01',
+        concurrency=8,
+        progress=lambda stats: print("{done}/{total} {bytes_per_sec:.0f} B/s".format(**stats)))
+"""
+
+from . import wallet
+from .error import IndyError, WalletAlreadyExistsError
+from .libindy import run_windowed
+
+from typing import Callable, Iterable, Optional, Tuple
+from urllib.parse import quote
+
+import json
+import logging
+import os
+import time
+
+EXPORT_MANIFEST = 'export_manifest.json'
+IMPORT_MANIFEST = 'import_manifest.json'
+
+
+class _Manifest:
+    """
+    State of wallets persisted as json, rewritten atomically on every change.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+
+        try:
+            with open(path) as f:
+                self.wallets = json.load(f)['wallets']
+        except FileNotFoundError:
+            self.wallets = {}
+
+    def started(self, wallet_id: str) -> bool:
+        return wallet_id in self.wallets
+
+    def completed(self, wallet_id: str) -> bool:
+        return self.wallets.get(wallet_id, {}).get('state') == 'completed'
+
+    def start(self, wallet_id: str):
+        self.wallets[wallet_id] = {'state': 'started'}
+        self._save()
+
+    def forget(self, wallet_id: str):
+        self.wallets.pop(wallet_id, None)
+        self._save()
+
+    def complete(self, wallet_id: str, size: int):
+        self.wallets[wallet_id] = {'state': 'completed', 'bytes': size}
+        self._save()
+
+    def _save(self):
+        with open(self._path + '.tmp', 'w') as f:
+            json.dump({'wallets': self.wallets}, f)
+        os.replace(self._path + '.tmp', self._path)
+
+
+class _Progress:
+    def __init__(self, total: int, progress: Optional[Callable]):
+        self._progress = progress
+        self._started = time.perf_counter()
+        self.stats = {
+            'total': total,
+            'done': 0,
+            'skipped': 0,
+            'failed': 0,
+            'bytes': 0,
+            'elapsed': 0.0,
+            'bytes_per_sec': 0.0,
+            'errors': {},
+        }
+
+    def update(self, wallet_id: str, size: int = 0, skipped: bool = False, error: Exception = None):
+        stats = self.stats
+        stats['done'] += 1
+
+        if skipped:
+            stats['skipped'] += 1
+        elif error is not None:
+            stats['failed'] += 1
+            stats['errors'][wallet_id] = error
+        else:
+            stats['bytes'] += size
+
+        stats['elapsed'] = time.perf_counter() - self._started
+        stats['bytes_per_sec'] = stats['bytes'] / stats['elapsed'] if stats['elapsed'] > 0 else 0.0
+
+        if self._progress is not None:
+            self._progress(stats)
+
+
+def _export_path(directory: str, wallet_id: str) -> str:
+    return os.path.join(directory, quote(wallet_id, safe='') + '.export')
+
+
+async def export_wallets(wallets: Iterable[Tuple[str, str, str]],
+                         directory: str,
+                         concurrency: int = 4,
+                         progress: Optional[Callable] = None) -> dict:
+    """
+    Exports wallets to files in directory, keeping up to `concurrency` exports in progress.
+
+    Wallets recorded in the export manifest of the directory are skipped, so an interrupted run can be resumed
+    by calling it again with the same arguments. Failure of one wallet doesn't stop the others.
+
+    :param wallets: iterable of (config, credentials, export_key_json) tuples where config and credentials
+        are open_wallet arguments and export_key_json is export config without path (see wallet.export_wallet):
+        {
+          "key": string, key or passphrase used for export key derivation,
+          "key_derivation_method": optional<string> (see wallet.export_wallet)
+        }
+    :param directory: directory to write `<wallet id>.export` files and the manifest to
+    :param concurrency: maximum count of wallets exported at once
+    :param progress: (optional) function called with stats after every wallet
+    :return: stats:
+        {
+          total: int - count of wallets,
+          done: int - count of processed wallets,
+          skipped: int - count of wallets exported by previous run,
+          failed: int - count of failed wallets,
+          bytes: int - size of written export files,
+          elapsed: float - duration in seconds,
+          bytes_per_sec: float - throughput,
+          errors: dict - wallet id to raised exception
+        }
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("export_wallets: >>> directory: %r, concurrency: %r", directory, concurrency)
+
+    wallets = list(wallets)
+    os.makedirs(directory, exist_ok=True)
+    manifest = _Manifest(os.path.join(directory, EXPORT_MANIFEST))
+    progress_ = _Progress(len(wallets), progress)
+
+    async def _export(config: str, credentials: str, export_key_json: str):
+        wallet_id = json.loads(config)['id']
+        path = _export_path(directory, wallet_id)
+
+        if manifest.completed(wallet_id) and os.path.exists(path):
+            progress_.update(wallet_id, skipped=True)
+            return
+
+        try:
+            # libindy refuses to overwrite files, so leftovers of an interrupted export are removed first
+            if os.path.exists(path + '.partial'):
+                os.remove(path + '.partial')
+
+            export_config = json.loads(export_key_json)
+            export_config['path'] = path + '.partial'
+
+            handle = await wallet.open_wallet(config, credentials)
+            try:
+                await wallet.export_wallet(handle, json.dumps(export_config))
+            finally:
+                await wallet.close_wallet(handle)
+
+            os.replace(path + '.partial', path)
+            size = os.path.getsize(path)
+            manifest.complete(wallet_id, size)
+        except Exception as e:
+            logger.warning("export_wallets: Failed to export wallet %r: %r", wallet_id, e)
+            progress_.update(wallet_id, error=e)
+        else:
+            progress_.update(wallet_id, size)
+
+    await run_windowed(_export, wallets, concurrency)
+
+    logger.debug("export_wallets: <<< stats: %r", progress_.stats)
+    return progress_.stats
+
+
+async def import_wallets(wallets: Iterable[Tuple[str, str, str]],
+                         directory: str,
+                         concurrency: int = 4,
+                         progress: Optional[Callable] = None) -> dict:
+    """
+    Creates wallets from files written by export_wallets, keeping up to `concurrency` imports in progress.
+
+    Wallets recorded as imported in the import manifest of the directory are skipped. A wallet recorded as
+    started was left incomplete by an interrupted run; it is deleted and imported again. Imports failed by
+    libindy are not recorded, as libindy removes the partially imported wallet itself.
+    Other wallets that already exist fail with WalletAlreadyExistsError.
+    Failure of one wallet doesn't stop the others.
+
+    :param wallets: iterable of (config, credentials, import_key_json) tuples where config and credentials
+        are import_wallet arguments and import_key_json is import config without path (see wallet.import_wallet):
+        {
+          "key": string, key used for export of the wallet
+        }
+    :param directory: directory with `<wallet id>.export` files
+    :param concurrency: maximum count of wallets imported at once
+    :param progress: (optional) function called with stats after every wallet
+    :return: stats (see export_wallets), bytes is size of read export files
+    """
+
+    logger = logging.getLogger(__name__)
+    logger.debug("import_wallets: >>> directory: %r, concurrency: %r", directory, concurrency)
+
+    wallets = list(wallets)
+    manifest = _Manifest(os.path.join(directory, IMPORT_MANIFEST))
+    progress_ = _Progress(len(wallets), progress)
+
+    async def _import_wallet(wallet_id: str, config: str, credentials: str, import_config: dict):
+        try:
+            await wallet.import_wallet(config, credentials, json.dumps(import_config))
+        except IndyError:
+            manifest.forget(wallet_id)
+            raise
+
+    async def _import(config: str, credentials: str, import_key_json: str):
+        wallet_id = json.loads(config)['id']
+
+        if manifest.completed(wallet_id):
+            progress_.update(wallet_id, skipped=True)
+            return
+
+        try:
+            path = _export_path(directory, wallet_id)
+            size = os.path.getsize(path)
+
+            import_config = json.loads(import_key_json)
+            import_config['path'] = path
+
+            interrupted = manifest.started(wallet_id)
+            manifest.start(wallet_id)
+
+            try:
+                await wallet.import_wallet(config, credentials, json.dumps(import_config))
+            except WalletAlreadyExistsError:
+                # Only wallets this import started are replaced, existing wallets are never touched
+                if not interrupted:
+                    manifest.forget(wallet_id)
+                    raise
+                await wallet.delete_wallet(config, credentials)
+                await _import_wallet(wallet_id, config, credentials, import_config)
+            except IndyError:
+                manifest.forget(wallet_id)
+                raise
+
+            manifest.complete(wallet_id, size)
+        except Exception as e:
+            logger.warning("import_wallets: Failed to import wallet %r: %r", wallet_id, e)
+            progress_.update(wallet_id, error=e)
+        else:
+            progress_.update(wallet_id, size)
+
+    await run_windowed(_import, wallets, concurrency)
+
+    logger.debug("import_wallets: <<< stats: %r", progress_.stats)
+    return progress_.stats
@@ -0,0 +1,373 @@
+"""
+Lets returning tenants open ARGON2I protected wallets without paying key derivation on every open.
+
+libindy derives the master key of ARGON2I_MOD and ARGON2I_INT wallets inside `open_wallet` and never
+exposes it, so the derived key itself can't be cached. `WalletKeyCache` instead rotates the wallet
+to a RAW key generated by `wallet.generate_wallet_key` on its first open (paying derivation once) and
+keeps that key, bound to the tenant passphrase, in memory. Later opens with the same passphrase use
+the RAW key directly.
+
+Rotation changes the wallet on disk: from then on the RAW key is the only way into it and opening it
+with the passphrase through `wallet.open_wallet`, from another process or another host, fails until
+`restore_passphrase` rotates it back. So the cache only rotates wallets when the caller passes a
+durable `sealer`: an object with a `durable = True` attribute backed by a persistent secret store
+(OS keyring, HSM, vault, shared directory) that every opener of the wallet can reach, with methods
+
+    seal(wallet_id, blob) -> bool  stores blob unless wallet_id already has one, returns whether it stored it
+    unseal(wallet_id) -> bytes     returns the stored blob or None
+    remove(wallet_id, blob)        removes the stored blob only if it is equal to blob
+
+Every seal produces a different blob, so openers in other processes can't overwrite or remove a key
+they didn't seal. Losing a sealed blob loses the wallet. Sealed blobs hold the RAW key encrypted with
+a key derived from the passphrase by scrypt, the sealer is still expected to protect them at rest.
+`FileKeySealer` is a reference sealer keeping blobs in a directory.
+
+    keys = WalletKeyCache(sealer=FileKeySealer('/var/lib/agent/wallet-keys'), ttl=3600)
+
+    wallet_handle = await keys.open_wallet(config, credentials)
+"""
+from . import wallet
+from .error import ErrorCode, WalletAccessFailed, WalletAlreadyOpenedError, WalletNotFoundError
+
+from typing import Optional
+
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+import uuid
+
+# scrypt parameters of the passphrase verifier and key encryption of sealed blobs
+_SCRYPT_N = 2 ** 14
+_SCRYPT_R = 8
+_SCRYPT_P = 1
+
+
+class _Key:
+    __slots__ = ('key', 'verifier', 'key_derivation_method', 'expires_at', 'blob')
+
+    def __init__(self, key: bytearray, verifier: bytes, key_derivation_method: str, expires_at: Optional[float]):
+        self.key = key
+        self.verifier = verifier
+        self.key_derivation_method = key_derivation_method
+        self.expires_at = expires_at
+        self.blob = None  # sealed blob of the key
+
+    def wipe(self):
+        for i in range(len(self.key)):
+            self.key[i] = 0
+
+
+class WalletKeyCache:
+    """
+    Cache of RAW keys of wallets rotated from passphrase derived keys.
+
+    Cached keys expire `ttl` seconds after they were cached and are wiped by `wipe`;
+    after that the next open checks the passphrase against the sealed blob and caches the key again.
+    """
+
+    def __init__(self, sealer, ttl: Optional[float] = 3600.0):
+        """
+        :param sealer: durable store of sealed wallet keys (see module documentation)
+        :param ttl: (optional) seconds a key stays cached in memory, forever if None
+        """
+
+        if not getattr(sealer, 'durable', False):
+            raise ValueError("sealer must be durable: rotated wallets can't be opened without their sealed keys")
+
+        self.ttl = ttl
+        self._sealer = sealer
+        self._secret = os.urandom(32)
+        self._keys = {}  # wallet id -> _Key
+        self._locks = {}  # wallet id -> asyncio.Lock
+        self._hits = 0
+        self._unseals = 0
+        self._rotations = 0
+
+    async def open_wallet(self, config: str, credentials: str) -> int:
+        """
+        Opens wallet like wallet.open_wallet, using cached RAW key when the wallet was rotated before.
+
+        Wallets opened with RAW key derivation method or with rekey in credentials are opened as is.
+
+        :param config: wallet configuration json (see wallet.open_wallet)
+        :param credentials: wallet credentials json (see wallet.open_wallet)
+        :return: wallet handle
+        """
+
+        logger = logging.getLogger(__name__)
+        logger.debug("open_wallet: >>> config: %r", config)
+
+        wallet_id = json.loads(config)['id']
+        credentials_ = json.loads(credentials)
+        key_derivation_method = credentials_.get('key_derivation_method', 'ARGON2I_MOD')
+
+        if key_derivation_method == 'RAW' or 'rekey' in credentials_:
+            return await wallet.open_wallet(config, credentials)
+
+        passphrase = credentials_['key'].encode('utf-8')
+
+        # Opens of one wallet are serialized: a concurrent first open would replace the key being rotated to
+        async with self._lock(wallet_id):
+            res = await self._open(wallet_id, config, credentials_, passphrase, key_derivation_method)
+
+        logger.debug("open_wallet: <<< res: %r", res)
+        return res
+
+    async def restore_passphrase(self, config: str, credentials: str) -> None:
+        """
+        Rotates closed wallet back to the key derived from its passphrase and forgets its RAW key.
+
+        :param config: wallet configuration json (see wallet.open_wallet)
+        :param credentials: wallet credentials json with passphrase the wallet was opened with
+        :return: None
+        """
+
+        wallet_id = json.loads(config)['id']
+        credentials_ = json.loads(credentials)
+        passphrase = credentials_['key'].encode('utf-8')
+
+        async with self._lock(wallet_id):
+            cached = self._get(wallet_id, passphrase)
+            if cached is None:
+                blob = self._sealer.unseal(wallet_id)
+                if blob is None:
+                    return
+                cached = self._from_blob(wallet_id, blob, passphrase)
+
+            rekey_credentials = json.loads(self._raw_credentials(cached, credentials_))
+            rekey_credentials['rekey'] = credentials_['key']
+            rekey_credentials['rekey_derivation_method'] = cached.key_derivation_method
+
+            handle = await wallet.open_wallet(config, json.dumps(rekey_credentials))
+            await wallet.close_wallet(handle)
+
+            self._sealer.remove(wallet_id, cached.blob)
+            self.wipe(wallet_id)
+
+    def wipe(self, wallet_id: Optional[str] = None) -> None:
+        """
+        Zeroes and drops cached keys. Sealed keys are kept.
+
+        Only the cache's own copies are zeroed: key strings already passed to libindy are not reachable.
+
+        :param wallet_id: (optional) wallet id to wipe key of, all keys if None
+        :return: None
+        """
+
+        wallet_ids = list(self._keys) if wallet_id is None else [wallet_id]
+        for wallet_id in wallet_ids:
+            cached = self._keys.pop(wallet_id, None)
+            if cached is not None:
+                cached.wipe()
+
+    def stats(self) -> dict:
+        """
+        Returns counters of the cache.
+
+        :return: {
+            keys: int - count of cached keys,
+            hits: int - count of opens with cached key,
+            unseals: int - count of keys loaded from sealer,
+            rotations: int - count of wallets rotated to RAW key (each paid key derivation)
+          }
+        """
+
+        return {
+            'keys': len(self._keys),
+            'hits': self._hits,
+            'unseals': self._unseals,
+            'rotations': self._rotations,
+        }
+
+    async def _open(self, wallet_id: str, config: str, credentials_: dict, passphrase: bytes,
+                    key_derivation_method: str) -> int:
+        cached = self._get(wallet_id, passphrase)
+
+        if cached is not None:
+            self._hits += 1
+        else:
+            blob = self._sealer.unseal(wallet_id)
+            if blob is not None:
+                cached = self._from_blob(wallet_id, blob, passphrase)
+                self._unseals += 1
+            else:
+                return await self._rotate_first(wallet_id, config, credentials_, passphrase, key_derivation_method)
+
+        try:
+            return await wallet.open_wallet(config, self._raw_credentials(cached, credentials_))
+        except WalletAccessFailed:
+            # Key was sealed but the rekey to it didn't happen, the wallet still uses its passphrase
+            return await self._rotate(config, credentials_, cached)
+
+    async def _rotate_first(self, wallet_id: str, config: str, credentials_: dict, passphrase: bytes,
+                            key_derivation_method: str) -> int:
+        key = await wallet.generate_wallet_key(None)
+        cached = self._put(wallet_id, bytearray(key.encode('utf-8')), passphrase, key_derivation_method)
+        cached.blob = self._to_blob(cached, passphrase)
+
+        # Key is sealed before the rekey, so a crash during the rekey can't lose it
+        if not self._sealer.seal(wallet_id, cached.blob):
+            # Another opener sealed its key first and is rotating the wallet to it
+            self.wipe(wallet_id)
+            return await self._open(wallet_id, config, credentials_, passphrase, key_derivation_method)
+
+        try:
+            return await self._rotate(config, credentials_, cached)
+        except (WalletAccessFailed, WalletAlreadyOpenedError, WalletNotFoundError):
+            # libindy failed before rekeying, so the key sealed above is not in use and can be dropped.
+            # After any other error the rekey may have been committed and the sealed key is kept.
+            self._sealer.remove(wallet_id, cached.blob)
+            self.wipe(wallet_id)
+            raise
+
+    def _lock(self, wallet_id: str) -> asyncio.Lock:
+        lock = self._locks.get(wallet_id)
+        if lock is None:
+            lock = self._locks[wallet_id] = asyncio.Lock()
+        return lock
+
+    async def _rotate(self, config: str, credentials_: dict, cached: _Key) -> int:
+        rekey_credentials = dict(credentials_)
+        rekey_credentials['rekey'] = cached.key.decode('utf-8')
+        rekey_credentials['rekey_derivation_method'] = 'RAW'
+
+        res = await wallet.open_wallet(config, json.dumps(rekey_credentials))
+        self._rotations += 1
+        return res
+
+    def _get(self, wallet_id: str, passphrase: bytes) -> Optional[_Key]:
+        cached = self._keys.get(wallet_id)
+        if cached is None:
+            return None
+
+        if cached.expires_at is not None and cached.expires_at <= time.monotonic():
+            self.wipe(wallet_id)
+            return None
+
+        if not hmac.compare_digest(cached.verifier, self._verifier(passphrase)):
+            raise WalletAccessFailed(ErrorCode.WalletAccessFailed, {'message': 'Invalid wallet passphrase'})
+
+        return cached
+
+    def _put(self, wallet_id: str, key: bytearray, passphrase: bytes, key_derivation_method: str) -> _Key:
+        self.wipe(wallet_id)
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        cached = self._keys[wallet_id] = _Key(key, self._verifier(passphrase), key_derivation_method, expires_at)
+        return cached
+
+    def _verifier(self, passphrase: bytes) -> bytes:
+        return hmac.new(self._secret, passphrase, hashlib.sha256).digest()
+
+    def _to_blob(self, cached: _Key, passphrase: bytes) -> bytes:
+        salt = os.urandom(16)
+        derived = _scrypt(passphrase, salt, 32 + len(cached.key))
+        return json.dumps({
+            'key': _xor(cached.key, derived[32:]).hex(),
+            'key_derivation_method': cached.key_derivation_method,
+            'salt': salt.hex(),
+            'verifier': derived[:32].hex(),
+        }).encode('utf-8')
+
+    def _from_blob(self, wallet_id: str, blob: bytes, passphrase: bytes) -> _Key:
+        sealed = json.loads(blob.decode('utf-8'))
+        encrypted_key = bytes.fromhex(sealed['key'])
+        derived = _scrypt(passphrase, bytes.fromhex(sealed['salt']), 32 + len(encrypted_key))
+
+        if not hmac.compare_digest(bytes.fromhex(sealed['verifier']), derived[:32]):
+            raise WalletAccessFailed(ErrorCode.WalletAccessFailed, {'message': 'Invalid wallet passphrase'})
+
+        cached = self._put(wallet_id, bytearray(_xor(encrypted_key, derived[32:])), passphrase,
+                           sealed['key_derivation_method'])
+        cached.blob = blob
+        return cached
+
+    @staticmethod
+    def _raw_credentials(cached: _Key, credentials_: dict) -> str:
+        raw_credentials = {key: value for (key, value) in credentials_.items()
+                           if key in ('storage_credentials',)}
+        raw_credentials['key'] = cached.key.decode('utf-8')
+        raw_credentials['key_derivation_method'] = 'RAW'
+        return json.dumps(raw_credentials)
+
+
+class FileKeySealer:
+    """
+    Sealer keeping sealed keys in files of a directory.
+
+    Durable as long as the directory outlives the wallets and is shared by every opener of them.
+    Seals are atomic creates and removals move the blob aside before checking it,
+    so concurrent openers in other processes can't replace or drop each other's keys.
+    """
+
+    durable = True
+
+    def __init__(self, directory: str):
+        """
+        :param directory: directory to keep sealed keys in, created if missing
+        """
+
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.directory = directory
+
+    def seal(self, wallet_id: str, blob: bytes) -> bool:
+        path = self._path(wallet_id)
+        tmp_path = self._tmp_path(path)
+
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(blob)
+                file.flush()
+                os.fsync(file.fileno())
+            os.link(tmp_path, path)
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            os.unlink(tmp_path)
+
+    def unseal(self, wallet_id: str) -> Optional[bytes]:
+        try:
+            with open(self._path(wallet_id), 'rb') as file:
+                return file.read()
+        except FileNotFoundError:
+            return None
+
+    def remove(self, wallet_id: str, blob: bytes) -> None:
+        path = self._path(wallet_id)
+        tmp_path = self._tmp_path(path)
+
+        try:
+            os.rename(path, tmp_path)
+        except FileNotFoundError:
+            return
+
+        try:
+            with open(tmp_path, 'rb') as file:
+                if file.read() != blob:
+                    # Sealed by another opener, put it back unless that opener already sealed another one
+                    os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.unlink(tmp_path)
+
+    def _path(self, wallet_id: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(wallet_id.encode('utf-8')).hexdigest())
+
+    @staticmethod
+    def _tmp_path(path: str) -> str:
+        return '{}.{}.tmp'.format(path, uuid.uuid4().hex)
+
+
+def _scrypt(passphrase: bytes, salt: bytes, length: int) -> bytes:
+    return hashlib.scrypt(passphrase, salt=salt, n=_SCRYPT_N, r=_SCRYPT_R, p=_SCRYPT_P, dklen=length)
+
+
+def _xor(data: bytes, pad: bytes) -> bytes:
+    return bytes(a ^ b for (a, b) in zip(data, pad))
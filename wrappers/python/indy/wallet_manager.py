@@ -0,0 +1,265 @@
+"""
+Shares open wallets of many tenants in one process.
+
+Opening a wallet derives its key, which is expensive, and every open wallet holds memory and
+file descriptors. `WalletManager` keeps at most `max_open` wallets open, hands their handles out
+by tenant id and closes the least recently used wallet that is not in use when it needs a slot:
+
+    async def credentials(tenant_id):
+        return json.dumps({'id': tenant_id}), await load_credentials(tenant_id)
+
+    manager = WalletManager(credentials, max_open=100)
+
+    async with manager.wallet(tenant_id) as wallet_handle:
+        await did.create_and_store_my_did(wallet_handle, "{}")
+"""
+
+from . import wallet
+
+from collections import OrderedDict
+from typing import Callable
+
+import asyncio
+import inspect
+import logging
+
+
+class _Wallet:
+    __slots__ = ('handle', 'refs', 'opened')
+
+    def __init__(self):
+        self.handle = None
+        self.refs = 1
+        self.opened = None  # task of the manager that opens the wallet
+
+
+class _Lease:
+    def __init__(self, manager: 'WalletManager', tenant_id: str):
+        self._manager = manager
+        self._tenant_id = tenant_id
+
+    async def __aenter__(self) -> int:
+        return await self._manager.acquire(self._tenant_id)
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._manager.release(self._tenant_id)
+
+
+class WalletManager:
+    """
+    Opens wallets of tenants on demand and keeps at most `max_open` of them open.
+
+    Every `acquire` must be paired with `release`; a wallet is closed only when no handle is in use.
+    Concurrent acquires of a wallet that is being opened wait for the same open.
+    """
+
+    def __init__(self, resolve: Callable, max_open: int = 100):
+        """
+        :param resolve: function or coroutine function returning (config, credentials) tuple of
+            open_wallet arguments for tenant id
+        :param max_open: maximum count of open wallets
+        """
+
+        if max_open < 1:
+            raise ValueError("max_open must be positive")
+
+        self.max_open = max_open
+        self._resolve = resolve
+        self._wallets = OrderedDict()  # tenant id -> _Wallet, least recently used first
+        self._closing = {}  # tenant id -> future resolved when wallet is closed
+        self._waiters = []
+        self._opens = 0
+        self._hits = 0
+        self._coalesced = 0
+        self._evictions = 0
+        self._waits = 0
+
+    def wallet(self, tenant_id: str) -> _Lease:
+        """
+        Returns async context manager that acquires wallet handle of tenant and releases it on exit.
+
+        :param tenant_id: tenant id passed to resolve function
+        :return: async context manager
+        """
+
+        return _Lease(self, tenant_id)
+
+    async def acquire(self, tenant_id: str) -> int:
+        """
+        Returns handle of open wallet of tenant, opening it if needed.
+        Waits for a wallet to be released if `max_open` wallets are open and all of them are in use.
+
+        :param tenant_id: tenant id passed to resolve function
+        :return: wallet handle
+        """
+
+        logger = logging.getLogger(__name__)
+        logger.debug("acquire: >>> tenant_id: %r", tenant_id)
+
+        while True:
+            closing = self._closing.get(tenant_id)
+            if closing is not None:
+                await asyncio.shield(closing)
+                continue
+
+            entry = self._wallets.get(tenant_id)
+            if entry is not None:
+                self._wallets.move_to_end(tenant_id)
+                entry.refs += 1
+
+                if entry.handle is not None:
+                    self._hits += 1
+                    logger.debug("acquire: <<< res: %r", entry.handle)
+                    return entry.handle
+
+                self._coalesced += 1
+                res = await self._join(entry)
+
+                logger.debug("acquire: <<< res: %r", res)
+                return res
+
+            if len(self._wallets) + len(self._closing) < self.max_open:
+                break
+
+            idle = next((idle_id for (idle_id, idle) in self._wallets.items()
+                         if idle.refs == 0 and idle.handle is not None), None)
+            if idle is not None:
+                await self._evict(idle)
+            else:
+                self._waits += 1
+                await self._wait()
+
+        res = await self._open(tenant_id)
+
+        logger.debug("acquire: <<< res: %r", res)
+        return res
+
+    def release(self, tenant_id: str) -> None:
+        """
+        Returns wallet handle acquired by `acquire`. Wallet is kept open until it has to be evicted.
+
+        :param tenant_id: tenant id passed to acquire
+        :return: None
+        """
+
+        entry = self._wallets[tenant_id]
+        if entry.refs <= 0:
+            raise ValueError("Wallet of tenant {!r} is not acquired".format(tenant_id))
+
+        entry.refs -= 1
+        if entry.refs == 0:
+            self._wake()
+
+    async def close(self) -> None:
+        """
+        Closes all open wallets that are not in use.
+
+        :return: None
+        """
+
+        for tenant_id in list(self._wallets):
+            entry = self._wallets.get(tenant_id)
+            if entry is not None and entry.refs == 0 and entry.handle is not None:
+                await self._evict(tenant_id)
+
+    def stats(self) -> dict:
+        """
+        Returns counters of the manager.
+
+        :return: {
+            open: int - count of open wallets (including wallets being opened),
+            in_use: int - count of open wallets with acquired handles,
+            opens: int - count of opened wallets,
+            hits: int - count of acquires served by already open wallet,
+            coalesced: int - count of acquires that waited for open started by another acquire,
+            evictions: int - count of closed wallets,
+            waits: int - count of times acquire waited for a wallet to be released
+          }
+        """
+
+        return {
+            'open': len(self._wallets) + len(self._closing),
+            'in_use': sum(1 for entry in self._wallets.values() if entry.refs > 0),
+            'opens': self._opens,
+            'hits': self._hits,
+            'coalesced': self._coalesced,
+            'evictions': self._evictions,
+            'waits': self._waits,
+        }
+
+    async def _open(self, tenant_id: str) -> int:
+        # The open runs in a task of the manager rather than of the first acquire: libindy completes the open
+        # even if that acquire is cancelled, and the handle must not be lost then
+        entry = self._wallets[tenant_id] = _Wallet()
+        entry.opened = asyncio.ensure_future(self._open_wallet(tenant_id, entry))
+        entry.opened.add_done_callback(_retrieve_exception)
+
+        return await self._join(entry)
+
+    async def _open_wallet(self, tenant_id: str, entry: _Wallet) -> int:
+        try:
+            args = self._resolve(tenant_id)
+            if inspect.isawaitable(args):
+                args = await args
+
+            (config, credentials) = args
+            handle = await wallet.open_wallet(config, credentials)
+        except BaseException:
+            del self._wallets[tenant_id]
+            self._wake()
+            raise
+
+        self._opens += 1
+        entry.handle = handle
+        if entry.refs == 0:
+            # Every acquire waiting for the open was cancelled, the wallet is kept open as idle
+            self._wake()
+        return handle
+
+    async def _join(self, entry: _Wallet) -> int:
+        # Shielded, so a cancelled acquire only stops waiting and others waiting for the open are not affected
+        try:
+            return await asyncio.shield(entry.opened)
+        except BaseException:
+            entry.refs -= 1
+            if entry.refs == 0:
+                self._wake()
+            raise
+
+    async def _evict(self, tenant_id: str):
+        logger = logging.getLogger(__name__)
+
+        entry = self._wallets.pop(tenant_id)
+        closing = self._closing[tenant_id] = asyncio.get_event_loop().create_future()
+        self._evictions += 1
+
+        try:
+            await wallet.close_wallet(entry.handle)
+        except Exception:
+            logger.warning("Failed to close wallet of tenant %r", tenant_id, exc_info=True)
+        finally:
+            del self._closing[tenant_id]
+            closing.set_result(None)
+            self._wake()
+
+    async def _wait(self):
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+
+        try:
+            await waiter
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def _wake(self):
+        (waiters, self._waiters) = (self._waiters, [])
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+def _retrieve_exception(task: asyncio.Future):
+    # Retrieved here, so the task doesn't log an error if every acquire waiting for it was cancelled
+    if not task.cancelled():
+        task.exception()
@@ -0,0 +1,259 @@
+"""
+Builder of WQL (wallet query language) queries used by non_secrets.open_wallet_search,
+anoncreds.prover_search_credentials and anoncreds.prover_get_credentials.
+
+Queries are validated when built and serialized to canonical json (sorted keys, compact separators,
+sorted operands of $and and $or) once per query object, so queries kept in module constants
+cost nothing to pass again:
+
+    from indy.wql import Tag
+
+    ACTIVE_CONNECTIONS = (Tag('~state').eq('active') & Tag('~their_did').in_(dids)) | ~Tag('label').eq('test')
+
+    await non_secrets.open_wallet_search(wallet_handle, 'connection', ACTIVE_CONNECTIONS.to_json(), options_json)
+
+Hand-written queries can be checked and canonicalized with `canonicalize`, which memoizes results.
+Language reference: docs/design/011-wallet-query-language/README.md.
+libindy supports $gt, $gte, $lt, $lte and $like for unencrypted ("~" prefixed) wallet tags only,
+so these conditions are rejected for other tags.
+"""
+
+from .error import ErrorCode, WalletQueryError
+
+from functools import lru_cache
+from typing import Iterable, Union
+
+import json
+
+COMPARISON_OPERATORS = ('$neq', '$gt', '$gte', '$lt', '$lte', '$like')
+
+
+def _error(message: str) -> WalletQueryError:
+    return WalletQueryError(ErrorCode.WalletQueryError, {'message': message})
+
+
+def _check_value(value) -> str:
+    if not isinstance(value, str):
+        raise _error("Tag value must be a string, got {!r}".format(value))
+    return value
+
+
+class Query:
+    """
+    Immutable WQL query. Combine queries with `&` ($and), `|` ($or) and `~` ($not).
+
+    Queries are compared and hashed by their canonical form, so they can be used as cache keys.
+    """
+
+    __slots__ = ('_node', '_json')
+
+    def __init__(self, node: tuple):
+        self._node = node
+        self._json = None
+
+    def __and__(self, other: 'Query') -> 'Query':
+        return and_(self, other)
+
+    def __or__(self, other: 'Query') -> 'Query':
+        return or_(self, other)
+
+    def __invert__(self) -> 'Query':
+        return not_(self)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Query) and self._node == other._node
+
+    def __hash__(self) -> int:
+        return hash(self._node)
+
+    def __repr__(self) -> str:
+        return "Query({})".format(self.to_json())
+
+    def __str__(self) -> str:
+        return self.to_json()
+
+    def to_dict(self) -> dict:
+        """
+        :return: query as json compatible dict
+        """
+
+        return _to_dict(self._node)
+
+    def to_json(self) -> str:
+        """
+        :return: canonical query json, serialized once per query object
+        """
+
+        if self._json is None:
+            self._json = json.dumps(self.to_dict(), sort_keys=True, separators=(',', ':'))
+        return self._json
+
+
+class Tag:
+    """
+    Tag of wallet record or credential used in query conditions.
+    """
+
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        if not isinstance(name, str) or not name or name.startswith('$'):
+            raise _error("Invalid tag name: {!r}".format(name))
+        self.name = name
+
+    def eq(self, value: str) -> Query:
+        return Query(('$eq', self.name, _check_value(value)))
+
+    def neq(self, value: str) -> Query:
+        return Query(('$neq', self.name, _check_value(value)))
+
+    def gt(self, value: str) -> Query:
+        return Query(('$gt', self._unencrypted('$gt'), _check_value(value)))
+
+    def gte(self, value: str) -> Query:
+        return Query(('$gte', self._unencrypted('$gte'), _check_value(value)))
+
+    def lt(self, value: str) -> Query:
+        return Query(('$lt', self._unencrypted('$lt'), _check_value(value)))
+
+    def lte(self, value: str) -> Query:
+        return Query(('$lte', self._unencrypted('$lte'), _check_value(value)))
+
+    def like(self, value: str) -> Query:
+        return Query(('$like', self._unencrypted('$like'), _check_value(value)))
+
+    def in_(self, values: Iterable[str]) -> Query:
+        values = tuple(sorted(set(_check_value(value) for value in values)))
+        return Query(('$in', self.name, values))
+
+    def _unencrypted(self, operator: str) -> str:
+        if not self.name.startswith('~'):
+            raise _error("{} is supported for unencrypted (\"~\" prefixed) tags only, got {!r}"
+                         .format(operator, self.name))
+        return self.name
+
+
+def _combine(operator: str, queries: tuple) -> Query:
+    operands = set()
+
+    for query in queries:
+        if not isinstance(query, Query):
+            raise _error("{} operand must be a Query, got {!r}".format(operator, query))
+
+        # Nested operators of the same kind are flattened: a & (b & c) == (a & b) & c
+        if query._node[0] == operator:
+            operands.update(query._node[1])
+        else:
+            operands.add(query._node)
+
+    if len(operands) == 1:
+        return Query(operands.pop())
+
+    return Query((operator, tuple(sorted(operands, key=repr))))
+
+
+def and_(*queries: Query) -> Query:
+    """
+    :return: query matching records matched by all queries, all records if no queries given
+    """
+
+    return _combine('$and', queries)
+
+
+def or_(*queries: Query) -> Query:
+    """
+    :return: query matching records matched by any of queries, no records if no queries given
+    """
+
+    return _combine('$or', queries)
+
+
+def not_(query: Query) -> Query:
+    """
+    :return: query matching records not matched by query
+    """
+
+    if not isinstance(query, Query):
+        raise _error("$not operand must be a Query, got {!r}".format(query))
+
+    if query._node[0] == '$not':
+        return Query(query._node[1])
+
+    return Query(('$not', query._node))
+
+
+def _to_dict(node: tuple) -> dict:
+    operator = node[0]
+
+    if operator == '$and':
+        return {'$and': [_to_dict(operand) for operand in node[1]]} if node[1] else {}
+    if operator == '$or':
+        return {'$or': [_to_dict(operand) for operand in node[1]]}
+    if operator == '$not':
+        return {'$not': _to_dict(node[1])}
+    if operator == '$eq':
+        return {node[1]: node[2]}
+    if operator == '$in':
+        return {node[1]: {'$in': list(node[2])}}
+    return {node[1]: {operator: node[2]}}
+
+
+def parse(query: Union[str, dict]) -> Query:
+    """
+    Validates WQL query and converts it to Query.
+
+    :param query: WQL query as json string or dict
+    :return: Query
+    """
+
+    if isinstance(query, str):
+        try:
+            query = json.loads(query)
+        except ValueError as e:
+            raise _error("Query is not valid json: {}".format(e))
+
+    return _parse(query)
+
+
+def _parse(query) -> Query:
+    if not isinstance(query, dict):
+        raise _error("Subquery must be an object, got {!r}".format(query))
+
+    operands = []
+
+    for (key, value) in query.items():
+        if key in ('$and', '$or'):
+            if not isinstance(value, list):
+                raise _error("{} operand must be an array, got {!r}".format(key, value))
+            operands.append(_combine(key, tuple(_parse(operand) for operand in value)))
+        elif key == '$not':
+            operands.append(not_(_parse(value)))
+        elif isinstance(value, str):
+            operands.append(Tag(key).eq(value))
+        elif isinstance(value, dict) and len(value) == 1:
+            ((operator, operand),) = value.items()
+            tag = Tag(key)
+            if operator == '$in':
+                if not isinstance(operand, list):
+                    raise _error("$in operand must be an array, got {!r}".format(operand))
+                operands.append(tag.in_(operand))
+            elif operator in COMPARISON_OPERATORS:
+                operands.append(getattr(tag, operator[1:])(operand))
+            else:
+                raise _error("Unknown operator {!r} for tag {!r}".format(operator, key))
+        else:
+            raise _error("Invalid condition for tag {!r}: {!r}".format(key, value))
+
+    return _combine('$and', tuple(operands))
+
+
+@lru_cache(maxsize=1024)
+def canonicalize(query_json: str) -> str:
+    """
+    Validates WQL query json and returns its canonical form. Results are memoized.
+
+    :param query_json: WQL query json
+    :return: canonical query json
+    """
+
+    return parse(query_json).to_json()
@@ -1,5 +1,32 @@
+import json
+
 import pytest
-from indy.anoncreds import to_unqualified
+from indy.anoncreds import to_unqualified, to_unqualified_ids
+from indy.error import CommonInvalidStructure, IndyError
+
+ENTITIES = [
+    "did:sov:NcYxiDXkpYi6ov5FcYDi1e",
+    "NcYxiDXkpYi6ov5FcYDi1e",
+    "did:peer:NcYxiDXkpYi6ov5FcYDi1e",
+    "did:Sov:NcYxiDXkpYi6ov5FcYDi1e",
+    "schema:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0",
+    "NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0",
+    "schema:sov:NcYxiDXkpYi6ov5FcYDi1e:2:1.0",
+    "creddef:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:3:CL:schema:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0:tag",
+    "creddef:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:3:CL:1:tag",
+    "creddef:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:3:CL:1:",
+    "NcYxiDXkpYi6ov5FcYDi1e:3:CL:NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0:tag",
+    "NcYxiDXkpYi6ov5FcYDi1e:3:CL:1",
+    "revreg:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:4:creddef:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:3:CL:"
+    "schema:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0:tag:CL_ACCUM:TAG_1",
+    "revreg:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:4:creddef:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:3:CL:1:tag:CL_ACCUM:TAG_1",
+    "NcYxiDXkpYi6ov5FcYDi1e:4:NcYxiDXkpYi6ov5FcYDi1e:3:CL:NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0:tag:CL_ACCUM:TAG_1",
+    "revreg:sov:NcYxiDXkpYi6ov5FcYDi1e",
+    "1",
+    "schema",
+    "creddef:",
+    "[]",
+]
 
 
 @pytest.mark.asyncio
@@ -8,3 +35,23 @@ async def test_to_unqualified_works():
     unqualified = "NcYxiDXkpYi6ov5FcYDi1e"
     assert unqualified == await to_unqualified(qualified)
     assert unqualified == await to_unqualified(unqualified)
+
+
+@pytest.mark.asyncio
+async def test_to_unqualified_ids_works_like_to_unqualified():
+    expected = [await to_unqualified(entity) for entity in ENTITIES]
+    assert expected == to_unqualified_ids(ENTITIES)
+
+
+@pytest.mark.asyncio
+async def test_to_unqualified_ids_works_for_empty_entity():
+    with pytest.raises(IndyError) as e:
+        await to_unqualified("")
+
+    with pytest.raises(e.type):
+        to_unqualified_ids([""])
+
+
+def test_to_unqualified_ids_rejects_objects():
+    with pytest.raises(CommonInvalidStructure):
+        to_unqualified_ids([json.dumps({'id': "schema:sov:did:sov:NcYxiDXkpYi6ov5FcYDi1e:2:gvt:1.0"})])
@@ -25,3 +25,36 @@ async def test_crypto_verify_works_for_verkey_with_incorrect_crypto_type(verkey_
     verkey = verkey_my1 + ':unknown_crypto'
     with pytest.raises(error.UnknownCryptoTypeError):
         await crypto.crypto_verify(verkey, message, signature)
+
+
+@pytest.mark.asyncio
+async def test_verify_many_works(verkey_my1, verkey_my2, message):
+    items = [(verkey_my1, message, signature),
+             (verkey_my2, message, signature),
+             (verkey_my1, message + b'1', signature),
+             (verkey_my1, message, signature)]
+
+    assert [True, False, False, True] == await crypto.verify_many(items, chunk_size=2, concurrency=2)
+
+
+@pytest.mark.asyncio
+async def test_verify_many_works_for_malformed_items(verkey_my1, message):
+    items = [(verkey_my1 + '0OIl', message, signature),
+             (verkey_my1, message, signature[:10]),
+             (verkey_my1, message, signature)]
+
+    assert [False, False, True] == await crypto.verify_many(items)
+
+
+@pytest.mark.asyncio
+async def test_verify_many_works_for_verkey_with_incorrect_crypto_type(verkey_my1, message):
+    items = [(verkey_my1, message, signature),
+             (verkey_my1 + ':unknown_crypto', message, signature)]
+
+    with pytest.raises(error.UnknownCryptoTypeError):
+        await crypto.verify_many(items)
+
+
+@pytest.mark.asyncio
+async def test_verify_many_works_for_empty_items():
+    assert [] == await crypto.verify_many([])
@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+import pytest
+
+from indy import crypto, error
+from indy.unpack_pipeline import UnpackPipeline
+
+
+async def _stream(items):
+    for item in items:
+        yield item
+
+
+async def _packed(wallet_handle, sender_vk, recipient_vk, senders, count):
+    items = []
+    for i in range(count):
+        sender_id = senders[i % len(senders)]
+        message = json.dumps({'@type': 'test', 'sender': sender_id, 'n': i})
+        items.append((sender_id, await crypto.pack_message(wallet_handle, message, [recipient_vk], sender_vk)))
+    return items
+
+
+@pytest.mark.asyncio
+async def test_unpack_pipeline_works(wallet_handle, identity_my1, identity_steward1):
+    (_, sender_vk) = identity_my1
+    (_, recipient_vk) = identity_steward1
+    items = await _packed(wallet_handle, sender_vk, recipient_vk, ['alice', 'bob', 'carol'], 30)
+
+    pipeline = UnpackPipeline(wallet_handle, window=4)
+    unpacked = [message async for message in pipeline.unpack(_stream(items))]
+
+    assert 30 == len(unpacked)
+    for sender_id in ('alice', 'bob', 'carol'):
+        numbers = [message.json['n'] for message in unpacked if message.sender_id == sender_id]
+        assert sorted(numbers) == numbers
+        assert 10 == len(numbers)
+
+    assert sender_vk == unpacked[0].sender_verkey
+    assert recipient_vk == unpacked[0].recipient_verkey
+
+    stats = pipeline.stats()
+    assert 30 == stats['received']
+    assert 30 == stats['unpacked']
+    assert 0 == stats['unpacking']
+    assert 0 == stats['waiting']
+    assert 4 >= stats['max_depth']
+    assert 30 == stats['latency']['count']
+
+
+@pytest.mark.asyncio
+async def test_unpack_pipeline_works_for_invalid_message(wallet_handle, identity_my1, identity_steward1):
+    (_, sender_vk) = identity_my1
+    (_, recipient_vk) = identity_steward1
+    items = await _packed(wallet_handle, sender_vk, recipient_vk, ['alice'], 2)
+    items.insert(1, ('alice', b'{"protected": "invalid"}'))
+
+    pipeline = UnpackPipeline(wallet_handle)
+    unpacked = [message async for message in pipeline.unpack(_stream(items))]
+
+    assert [0, 1] == [message.json['n'] for message in (unpacked[0], unpacked[2])]
+    assert unpacked[1].error is not None
+    with pytest.raises(error.IndyError):
+        unpacked[1].json
+
+    assert 1 == pipeline.stats()['errors']
+
+
+@pytest.mark.asyncio
+async def test_unpack_pipeline_works_for_early_close(monkeypatch):
+    async def unpack_message(wallet_handle, jwe):
+        return json.dumps({'message': jwe.decode(), 'recipient_verkey': 'vk'}).encode()
+
+    monkeypatch.setattr(crypto, 'unpack_message', unpack_message)
+    items = [('alice', json.dumps({'n': i}).encode()) for i in range(20)]
+
+    pipeline = UnpackPipeline(1, window=8)
+    messages = pipeline.unpack(_stream(items))
+    assert 0 == (await messages.__anext__()).json['n']
+
+    # The next message was read with the first one, so its unpack is cancelled before it starts
+    await messages.aclose()
+    await asyncio.sleep(0.01)
+
+    stats = pipeline.stats()
+    assert 2 == stats['received']
+    assert 0 == stats['unpacking']
+    assert 0 == stats['waiting']
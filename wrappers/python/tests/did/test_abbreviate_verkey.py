@@ -1,7 +1,9 @@
 import json
 
 from indy import did
+from indy.error import IndyError
 
+import base58
 import pytest
 
 
@@ -17,3 +19,50 @@ async def test_abbreviate_verkey_for_abbbr_key(wallet_handle, did_my1):
     (_did, full_verkey) = await did.create_and_store_my_did(wallet_handle, json.dumps({'did': did_my1}))
     verkey = await did.abbreviate_verkey(_did, full_verkey)
     assert full_verkey == verkey
+
+
+def _cases(did_my1, verkey_my1):
+    verkey = base58.b58encode(bytes(range(32))).decode()
+    did_ = base58.b58encode(bytes(range(16))).decode()
+    did_32 = base58.b58encode(bytes(range(32))).decode()
+
+    return [
+        (did_my1, verkey_my1),
+        (did_, verkey),
+        (did_32, verkey),
+        ('did:sov:' + did_, verkey),
+        ('did:sovrin:' + did_, verkey),
+        ('did:peer:' + did_, verkey),
+        ('did:sov:' + did_, verkey + ':ed25519'),
+        (did_, verkey + ':ed25519'),
+        (did_, verkey + ':unknown'),
+        (did_, verkey + ':'),
+        (did_, '~' + verkey[:22]),
+        (did_, verkey[:20]),
+        (did_, verkey + '0'),
+        (did_, ' ' + verkey),
+        (did_, ''),
+        ('', verkey),
+        ('did:sov:', verkey),
+        ('0' + did_, verkey),
+        (did_ + '1', verkey),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_abbreviate_verkeys_works_like_abbreviate_verkey(did_my1, verkey_my1):
+    for (did_, verkey) in _cases(did_my1, verkey_my1):
+        try:
+            expected = await did.abbreviate_verkey(did_, verkey)
+        except IndyError as e:
+            with pytest.raises(type(e)):
+                did.abbreviate_verkeys([(did_, verkey)])
+        else:
+            assert [expected] == did.abbreviate_verkeys([(did_, verkey)]), (did_, verkey)
+
+
+@pytest.mark.asyncio
+async def test_abbreviate_verkeys_works_for_list(did_my1, verkey_my1):
+    cases = _cases(did_my1, verkey_my1)[:5]
+    expected = [await did.abbreviate_verkey(did_, verkey) for (did_, verkey) in cases]
+    assert expected == did.abbreviate_verkeys(cases)
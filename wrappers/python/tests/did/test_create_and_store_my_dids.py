@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from indy import did, error
+
+
+@pytest.mark.asyncio
+async def test_create_and_store_my_dids_works(wallet_handle, seed_my1, did_my1, verkey_my1, metadata):
+    (results, stats) = await did.create_and_store_my_dids(
+        wallet_handle,
+        [json.dumps({'seed': seed_my1}), "{}", ("{}", metadata)],
+        window=2)
+
+    assert (did_my1, verkey_my1, None) == (results[0].did, results[0].verkey, results[0].error)
+    assert 3 == stats['count']
+    assert 0 == stats['errors']
+    assert metadata == await did.get_did_metadata(wallet_handle, results[2].did)
+
+
+@pytest.mark.asyncio
+async def test_create_and_store_my_dids_works_for_duplicate(wallet_handle, seed_my1, did_my1):
+    await did.create_and_store_my_did(wallet_handle, json.dumps({'seed': seed_my1}))
+
+    (results, stats) = await did.create_and_store_my_dids(wallet_handle, [json.dumps({'seed': seed_my1}), "{}"])
+
+    assert isinstance(results[0].error, error.DidAlreadyExistsError)
+    assert results[0].did is None
+    assert results[1].error is None
+    assert results[1].did is not None
+    assert 1 == stats['errors']
+
+
+@pytest.mark.asyncio
+async def test_create_and_store_my_dids_works_for_failed_metadata(wallet_handle, seed_my1, did_my1, verkey_my1,
+                                                                   metadata, monkeypatch):
+    async def set_did_metadata(*_):
+        raise error.WalletStorageError(error.ErrorCode.WalletStorageError)
+
+    monkeypatch.setattr(did, 'set_did_metadata', set_did_metadata)
+
+    (results, stats) = await did.create_and_store_my_dids(wallet_handle, [(json.dumps({'seed': seed_my1}), metadata)])
+
+    assert isinstance(results[0].error, error.WalletStorageError)
+    assert (did_my1, verkey_my1) == (results[0].did, results[0].verkey)
+    assert did_my1 == json.loads(await did.get_my_did_with_meta(wallet_handle, did_my1))['did']
+    assert 1 == stats['errors']
@@ -22,3 +22,17 @@ async def test_list_my_dids_works(wallet_handle, seed_my1, did_my1, verkey_my1,
 async def test_list_my_dids_works_for_invalid_handle(wallet_handle):
     with pytest.raises(error.WalletInvalidHandle):
         await did.list_my_dids_with_meta(wallet_handle + 1)
+
+
+@pytest.mark.asyncio
+async def test_iter_my_dids_with_meta_works(wallet_handle, seed_my1, did_my1, verkey_my1, metadata):
+    await did.create_and_store_my_did(wallet_handle, json.dumps({'seed': seed_my1}))
+    await did.set_did_metadata(wallet_handle, did_my1, metadata)
+    await did.create_and_store_my_did(wallet_handle, "{}")
+
+    res = [did_with_meta async for did_with_meta in did.iter_my_dids_with_meta(wallet_handle, page_size=1)]
+
+    assert len(res) == 2
+    assert {"did": did_my1, "verkey": verkey_my1, "metadata": metadata} == \
+        {key: value for (key, value) in next(r for r in res if r["did"] == did_my1).items()
+         if key in ("did", "verkey", "metadata")}
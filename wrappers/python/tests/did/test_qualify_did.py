@@ -1,4 +1,5 @@
 from indy import did
+from indy.error import IndyError
 
 import pytest
 
@@ -9,4 +10,25 @@ async def test_qualify_did(wallet_handle):
     (did_, verkey_) = await did.create_and_store_my_did(wallet_handle, "{}")
     full_qualified_did = await did.qualify_did(wallet_handle, did_, method)
     expected_did = 'did:' + method + ':' + did_
-    assert expected_did  == full_qualified_did
\ No newline at end of file
+    assert expected_did  == full_qualified_did
+
+
+@pytest.mark.asyncio
+async def test_to_qualified_dids_works_like_qualify_did(wallet_handle):
+    dids = [(await did.create_and_store_my_did(wallet_handle, "{}"))[0] for _ in range(3)]
+    dids.append(await did.qualify_did(wallet_handle, dids.pop(), 'sov'))
+
+    expected = [await did.qualify_did(wallet_handle, did_, 'peer') for did_ in dids]
+    assert expected == did.to_qualified_dids(dids, 'peer')
+
+
+@pytest.mark.asyncio
+async def test_to_qualified_dids_works_for_invalid_method(wallet_handle):
+    (did_, _) = await did.create_and_store_my_did(wallet_handle, "{}")
+
+    for method in ('', 'Peer', 'peer:1'):
+        with pytest.raises(IndyError) as e:
+            await did.qualify_did(wallet_handle, did_, method)
+
+        with pytest.raises(e.type):
+            did.to_qualified_dids([did_], method)
@@ -0,0 +1,119 @@
+import asyncio
+import json
+
+import pytest
+
+from indy import did, error, wallet
+
+
+@pytest.mark.asyncio
+async def test_verkey_resolver_works(wallet_handle, identity_trustee1):
+    (_did, verkey) = identity_trustee1
+    resolver = did.VerkeyResolver(None, wallet_handle)
+
+    assert [verkey, verkey, verkey] == await asyncio.gather(*(resolver.key_for_did(_did) for _ in range(3)))
+    assert verkey == await resolver.key_for_local_did(_did)
+
+    stats = resolver.stats()
+    assert 1 == stats['misses']
+    assert 2 == stats['coalesced']
+    assert 1 == stats['hits']
+
+
+@pytest.mark.asyncio
+async def test_verkey_resolver_works_for_unknown_did(wallet_handle, did_my2):
+    resolver = did.VerkeyResolver(None, wallet_handle)
+
+    for _ in range(2):
+        with pytest.raises(error.WalletItemNotFound):
+            await resolver.key_for_local_did(did_my2)
+
+    assert 1 == resolver.stats()['negative_hits']
+
+
+@pytest.mark.asyncio
+async def test_verkey_resolver_works_for_store_their_did(wallet_handle, did_my2, verkey_my2):
+    resolver = did.VerkeyResolver(None, wallet_handle)
+
+    with pytest.raises(error.WalletItemNotFound):
+        await resolver.key_for_local_did(did_my2)
+
+    await did.store_their_did(wallet_handle, json.dumps({"did": did_my2, "verkey": verkey_my2}))
+
+    assert verkey_my2 == await resolver.key_for_local_did(did_my2)
+
+
+@pytest.mark.asyncio
+async def test_verkey_resolver_works_for_create_and_store_my_did(wallet_handle, seed_my1, did_my1, verkey_my1):
+    resolver = did.VerkeyResolver(None, wallet_handle)
+
+    with pytest.raises(error.WalletItemNotFound):
+        await resolver.key_for_local_did(did_my1)
+
+    await did.create_and_store_my_did(wallet_handle, json.dumps({'seed': seed_my1}))
+
+    assert verkey_my1 == await resolver.key_for_local_did(did_my1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("wallet_handle_cleanup", [False])
+async def test_verkey_resolver_works_for_close_wallet(wallet_handle, identity_trustee1):
+    (_did, verkey) = identity_trustee1
+    resolver = did.VerkeyResolver(None, wallet_handle)
+    assert verkey == await resolver.key_for_local_did(_did)
+
+    await wallet.close_wallet(wallet_handle)
+
+    assert 0 == resolver.stats()['entries']
+
+
+@pytest.mark.asyncio
+async def test_verkey_resolver_works_for_pool(pool_handle, wallet_handle, identity_trustee1, seed_my1, did_my1,
+                                              verkey_my1):
+    (trustee_did, trustee_verkey) = identity_trustee1
+    resolver = did.VerkeyResolver(pool_handle, wallet_handle)
+
+    assert trustee_verkey == await resolver.key_for_did(trustee_did)
+    assert trustee_verkey == await resolver.key_for_did(trustee_did)
+
+    # My1 is neither in the wallet nor on the ledger yet, so "not found" is cached
+    for _ in range(2):
+        with pytest.raises(error.WalletItemNotFound):
+            await resolver.key_for_did(did_my1)
+
+    await did.create_and_store_my_did(wallet_handle, json.dumps({'seed': seed_my1}))
+
+    assert verkey_my1 == await resolver.key_for_did(did_my1)
+
+    stats = resolver.stats()
+    assert 1 == stats['hits']
+    assert 1 == stats['negative_hits']
+    assert 3 == stats['misses']
+
+
+@pytest.mark.asyncio
+async def test_verkey_resolver_works_for_cancelled_first_lookup(monkeypatch):
+    found = asyncio.Event()
+
+    async def key_for_local_did(wallet_handle, did_):
+        await found.wait()
+        return 'verkey'
+
+    monkeypatch.setattr(did, 'key_for_local_did', key_for_local_did)
+    resolver = did.VerkeyResolver(None, 1)
+
+    first = asyncio.ensure_future(resolver.key_for_local_did('did'))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(resolver.key_for_local_did('did'))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    found.set()
+
+    assert 'verkey' == await second
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    assert 'verkey' == await resolver.key_for_local_did('did')
+    assert 1 == resolver.stats()['hits']
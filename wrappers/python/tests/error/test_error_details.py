@@ -0,0 +1,30 @@
+import json
+
+from indy import error
+from indy.error import ErrorCode, IndyError
+
+
+def test_errorcode_to_exception_works():
+    assert error.errorcode_to_exception(ErrorCode.WalletItemNotFound) is error.WalletItemNotFound
+    assert error.errorcode_to_exception(ErrorCode.DidAlreadyExistsError) is error.DidAlreadyExistsError
+    assert error.errorcode_to_exception(int(ErrorCode.WalletItemNotFound)) is error.WalletItemNotFound
+    assert error.errorcode_to_exception(ErrorCode.Success) is None
+
+
+def test_error_details_are_parsed_from_raw_json():
+    details = {'message': 'Wallet item not found', 'backtrace': 'backtrace'}
+    e = error.WalletItemNotFound(ErrorCode.WalletItemNotFound, json.dumps(details).encode())
+
+    assert e.message == details['message']
+    assert e.indy_backtrace == details['backtrace']
+    assert e.error_details == details
+
+
+def test_error_details_works_for_dict_and_missing_details():
+    e = IndyError(ErrorCode.CommonInvalidState, {'message': 'message'})
+    assert e.message == 'message'
+    assert e.indy_backtrace is None
+
+    e = IndyError(ErrorCode.CommonInvalidState)
+    assert e.message is None
+    assert e.error_details is None
@@ -27,3 +27,10 @@ async def test_build_get_schema_requests_works_for_correct_data_json(did_trustee
 @pytest.mark.asyncio
 async def test_build_get_schema_requests_works_for_default_submitter():
     json.loads(await ledger.build_get_schema_request(None, id_))
+
+
+@pytest.mark.asyncio
+async def test_build_get_schema_request_raw_works(did_trustee):
+    response = await ledger.build_get_schema_request_raw(did_trustee, id_)
+    assert isinstance(response, bytes)
+    assert json.loads(response)["operation"]["type"] == "107"
@@ -172,3 +172,24 @@ async def ensure_previous_request_applied(pool_handle, checker_request, checker)
             logger.warning(e)
             logger.warning(response)
         time.sleep(5)
+
+
+@pytest.mark.asyncio
+async def test_schema_requests_works_for_raw_bytes(pool_handle, wallet_handle, identity_my):
+    (my_did, my_ver_key) = identity_my
+
+    (schema_id, schema_json) = \
+        await anoncreds.issuer_create_schema(my_did, "gvt", "2.0", json.dumps(["name", "age", "sex", "height"]))
+    schema_request = await ledger.build_schema_request(my_did, schema_json)
+    await ledger.sign_and_submit_request_raw(pool_handle, wallet_handle, my_did, memoryview(schema_request.encode()))
+
+    get_schema_request = await ledger.build_get_schema_request_raw(my_did, schema_id)
+    await ensure_previous_request_applied(pool_handle, get_schema_request.decode(),
+                                          lambda response: response['result']['seqNo'] is not None)
+
+    get_schema_response = await ledger.submit_request_raw(pool_handle, get_schema_request)
+    assert isinstance(get_schema_response, bytes)
+
+    (parsed_schema_id, parsed_schema_json) = await ledger.parse_get_schema_response_raw(get_schema_response)
+    assert parsed_schema_id == schema_id
+    assert json.loads(parsed_schema_json)['name'] == "gvt"
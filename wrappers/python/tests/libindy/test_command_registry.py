@@ -0,0 +1,172 @@
+import asyncio
+import ctypes
+import gc
+import threading
+
+import pytest
+
+from indy import libindy
+from indy.error import ErrorCode
+
+
+@pytest.fixture
+def native_calls(monkeypatch):
+    """
+    Replaces libindy functions with a fake that only records command handles.
+    Completions are delivered by calling `complete` like libindy does from its own thread.
+    """
+
+    handles = []
+
+    def _function(command_handle, *_):
+        handles.append(command_handle)
+        return ErrorCode.Success
+
+    monkeypatch.setattr(libindy, '_get_function', lambda _: _function)
+    return handles
+
+
+def complete(command_handle: int, *args):
+    thread = threading.Thread(target=libindy._indy_callback, args=(command_handle, None) + args)
+    thread.start()
+    thread.join()
+
+
+@pytest.mark.asyncio
+async def test_do_call_works_for_native_completion(native_calls):
+    future = libindy.do_call('indy_test_completion')
+
+    assert 1 == libindy.get_command_stats()['in_flight']
+
+    complete(native_calls[0], 42)
+
+    assert 42 == await future
+    assert 0 == libindy.get_command_stats()['in_flight']
+
+
+@pytest.mark.asyncio
+async def test_get_command_stats_works(native_calls):
+    futures = [libindy.do_call('indy_test_stats') for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    stats = libindy.get_command_stats()
+
+    assert 3 == stats['in_flight']
+    assert 0 == stats['stale']
+    assert stats['oldest_in_flight'] >= 0.01
+
+    for command_handle in native_calls:
+        complete(command_handle)
+    await asyncio.gather(*futures)
+
+    assert {'in_flight': 0, 'stale': 0, 'oldest_in_flight': 0.0} == libindy.get_command_stats()
+
+
+@pytest.mark.asyncio
+async def test_command_timeout_works(native_calls):
+    with libindy.command_timeout(0.01):
+        future = libindy.do_call('indy_test_timeout')
+
+    with pytest.raises(asyncio.TimeoutError):
+        await future
+
+    assert 1 == libindy.get_command_stats()['stale']
+
+    # Late completion is absorbed without touching the timed out future
+    complete(native_calls[0], 42)
+    await asyncio.sleep(0.01)
+
+    assert 0 == libindy.get_command_stats()['stale']
+    assert native_calls[0] not in libindy._futures
+
+
+@pytest.mark.asyncio
+async def test_command_timeout_works_for_nested_blocks(native_calls):
+    libindy.set_command_timeout(0.01)
+    try:
+        with libindy.command_timeout(None):
+            future = libindy.do_call('indy_test_no_timeout')
+        timed_out = libindy.do_call('indy_test_default_timeout')
+
+        with pytest.raises(asyncio.TimeoutError):
+            await timed_out
+        assert not future.done()
+    finally:
+        libindy.set_command_timeout(None)
+
+    complete(native_calls[0], 1)
+    complete(native_calls[1], 2)
+
+    assert 1 == await future
+
+
+@pytest.mark.asyncio
+async def test_stale_command_expires(native_calls, monkeypatch):
+    monkeypatch.setattr(libindy, 'STALE_COMMAND_TTL', 0.01)
+
+    future = libindy.do_call('indy_test_stale')
+    future.cancel()
+    await asyncio.sleep(0)
+
+    assert {'in_flight': 0, 'stale': 1} == {key: value for (key, value) in libindy.get_command_stats().items()
+                                            if key != 'oldest_in_flight'}
+
+    await asyncio.sleep(0.05)
+
+    assert 0 == libindy.get_command_stats()['stale']
+    assert native_calls[0] not in libindy._futures
+
+    # Completion after expiry is dropped
+    complete(native_calls[0], 42)
+    await asyncio.sleep(0.01)
+
+
+def test_registry_put_works_for_collected_loop():
+    event_loop = asyncio.new_event_loop()
+    registry = libindy._CommandRegistry(event_loop)
+    event_loop.close()
+    del event_loop
+    gc.collect()
+
+    registry.put(1, None, ())
+    registry.put(2, None, ())
+
+
+def test_registry_put_works_for_closed_loop():
+    event_loop = asyncio.new_event_loop()
+    registry = libindy._CommandRegistry(event_loop)
+    event_loop.close()
+
+    registry.put(1, None, ())
+
+
+@pytest.mark.asyncio
+async def test_do_call_works_for_failed_native_call(monkeypatch):
+    def _function(command_handle, *_):
+        raise ctypes.ArgumentError("argument 2: wrong type")
+
+    monkeypatch.setattr(libindy, '_get_function', lambda _: _function)
+    futures = dict(libindy._futures)
+
+    with libindy.command_timeout(0.01):
+        with pytest.raises(ctypes.ArgumentError):
+            libindy.do_call('indy_test_failed', 'argument')
+
+    assert {'in_flight': 0, 'stale': 0, 'oldest_in_flight': 0.0} == libindy.get_command_stats()
+    assert futures == libindy._futures
+
+
+def test_blocking_call_works_for_failed_native_call(monkeypatch):
+    def _function(command_handle, *_):
+        raise ctypes.ArgumentError("argument 2: wrong type")
+
+    monkeypatch.setattr(libindy, '_get_function', lambda _: _function)
+    futures = dict(libindy._futures)
+
+    async def call():
+        return await libindy.do_call('indy_test_failed', 'argument')
+
+    with pytest.raises(ctypes.ArgumentError):
+        libindy.run_blocking(call())
+
+    assert futures == libindy._futures
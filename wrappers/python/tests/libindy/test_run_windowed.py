@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from indy import libindy
+
+
+@pytest.mark.asyncio
+async def test_run_windowed_works():
+    in_flight = []
+    peak = []
+
+    async def job(value: int):
+        in_flight.append(value)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01 * (value % 3))
+        in_flight.remove(value)
+        if value == 4:
+            raise ValueError(value)
+        return value * 2
+
+    (results, stats) = await libindy.run_windowed(job, [(i,) for i in range(10)], 3, 'jobs_per_sec')
+
+    assert [0, 2, 4, 6] == results[:4]
+    assert isinstance(results[4], ValueError)
+    assert [10, 12, 14, 16, 18] == results[5:]
+    assert 3 == max(peak)
+    assert 10 == stats['count']
+    assert 1 == stats['errors']
+    assert stats['jobs_per_sec'] > 0
+
+
+@pytest.mark.asyncio
+async def test_run_windowed_works_for_async_iterable():
+    async def jobs_args():
+        for i in range(5):
+            yield (i,)
+
+    async def job(value: int):
+        return value
+
+    (results, stats) = await libindy.run_windowed(job, jobs_args(), 2)
+
+    assert [0, 1, 2, 3, 4] == results
+    assert 0 == stats['errors']
+    assert 'ops_per_sec' in stats
+
+
+@pytest.mark.asyncio
+async def test_run_windowed_works_for_empty_jobs():
+    async def job():
+        pass
+
+    assert ([], {'count': 0, 'errors': 0, 'elapsed': pytest.approx(0, abs=1), 'ops_per_sec': 0.0}) == \
+        await libindy.run_windowed(job, [], 4)
@@ -0,0 +1,27 @@
+from indy import metrics
+
+
+def test_metrics_snapshot_works():
+    started = metrics.dispatched('indy_test_snapshot')
+    metrics.dispatched('indy_test_snapshot')
+    metrics.completed('indy_test_snapshot', started, True)
+
+    snapshot = metrics.snapshot()['indy_test_snapshot']
+
+    assert snapshot['calls'] == 2
+    assert snapshot['errors'] == 1
+    assert snapshot['in_flight'] == 1
+    assert snapshot['latency']['count'] == 1
+    assert snapshot['latency']['buckets'][-1] == ['+Inf', 1]
+
+
+def test_metrics_to_prometheus_works():
+    metrics.completed('indy_test_prometheus', metrics.dispatched('indy_test_prometheus'), False)
+
+    text = metrics.to_prometheus()
+
+    assert '# TYPE indy_ffi_call_duration_seconds histogram' in text
+    assert 'indy_ffi_calls_total{function="indy_test_prometheus"} 1' in text
+    assert 'indy_ffi_errors_total{function="indy_test_prometheus"} 0' in text
+    assert 'indy_ffi_call_duration_seconds_bucket{function="indy_test_prometheus",le="+Inf"} 1' in text
+    assert 'indy_ffi_call_duration_seconds_count{function="indy_test_prometheus"} 1' in text
@@ -0,0 +1,54 @@
+import pytest
+
+from indy import error
+from tests.non_secrets.common import *
+
+
+@pytest.mark.asyncio
+async def test_bulk_wallet_record_ops_works(wallet_handle):
+    operations = [
+        ("add", type_, id1, value1, tags_empty),
+        ("add", type_, id2, value2, tags1),
+        ("update_value", type_, id1, value2),
+        ("add_tags", type_, id1, tags1),
+    ]
+
+    (results, stats) = await non_secrets.bulk_wallet_record_ops(wallet_handle, operations, window=2)
+
+    assert [None, None, None, None] == results
+    assert 4 == stats['count']
+    assert 0 == stats['errors']
+    await check_record_field(wallet_handle, 'value', value2)
+    await check_record_field(wallet_handle, 'tags', tags1)
+
+
+@pytest.mark.asyncio
+async def test_bulk_wallet_record_ops_works_for_async_iterable(wallet_handle):
+    async def operations():
+        for id_ in (id1, id2, id3):
+            yield ("add", type_, id_, value1, tags_empty)
+
+    (results, stats) = await non_secrets.bulk_wallet_record_ops(wallet_handle, operations())
+
+    assert [None, None, None] == results
+    assert 3 == stats['count']
+
+
+@pytest.mark.asyncio
+async def test_bulk_wallet_record_ops_reports_item_errors(wallet_handle):
+    await non_secrets.add_wallet_record(wallet_handle, type_, id1, value1, tags_empty)
+
+    operations = [
+        ("add", type_, id1, value1, tags_empty),
+        ("delete", type_, id2),
+        ("unknown", type_, id1),
+        ("add", type_, id3, value3, tags_empty),
+    ]
+
+    (results, stats) = await non_secrets.bulk_wallet_record_ops(wallet_handle, operations)
+
+    assert isinstance(results[0], error.WalletItemAlreadyExists)
+    assert isinstance(results[1], error.WalletItemNotFound)
+    assert isinstance(results[2], ValueError)
+    assert results[3] is None
+    assert 3 == stats['errors']
@@ -39,3 +39,13 @@ async def test_get_wallet_record_works_for_full_data(wallet_handle):
 async def test_get_wallet_record_works_for_not_found_record(wallet_handle):
     with pytest.raises(error.WalletItemNotFound):
         await non_secrets.get_wallet_record(wallet_handle, type_, id1, options_empty)
+
+
+@pytest.mark.asyncio
+async def test_get_wallet_record_raw_works(wallet_handle):
+    await non_secrets.add_wallet_record(wallet_handle, type_, id1, value1, tags1)
+
+    record = await non_secrets.get_wallet_record_raw(wallet_handle, type_, id1, options_empty.encode())
+
+    assert isinstance(record, bytes)
+    assert json.loads(record) == {'id': id1, 'value': value1, 'tags': None, 'type': None}
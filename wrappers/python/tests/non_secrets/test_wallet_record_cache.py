@@ -0,0 +1,69 @@
+import pytest
+
+from indy import error
+from tests.non_secrets.common import *
+
+
+@pytest.fixture
+def record_cache():
+    non_secrets.enable_wallet_record_cache(max_entries=2)
+    yield
+    non_secrets.disable_wallet_record_cache()
+
+
+@pytest.mark.asyncio
+async def test_wallet_record_cache_works(wallet_handle, record_cache):
+    await non_secrets.add_wallet_record(wallet_handle, type_, id1, value1, tags1)
+
+    record = await non_secrets.get_wallet_record(wallet_handle, type_, id1, options_full)
+    assert record == await non_secrets.get_wallet_record(wallet_handle, type_, id1, options_full)
+
+    stats = non_secrets.get_wallet_record_cache_stats()
+    assert 1 == stats['hits']
+    assert 1 == stats['misses']
+    assert 1 == stats['entries']
+
+
+@pytest.mark.asyncio
+async def test_wallet_record_cache_works_for_update(wallet_handle, record_cache):
+    await non_secrets.add_wallet_record(wallet_handle, type_, id1, value1, tags1)
+    await check_record_field(wallet_handle, 'value', value1)
+
+    await non_secrets.update_wallet_record_value(wallet_handle, type_, id1, value2)
+    await check_record_field(wallet_handle, 'value', value2)
+
+    await non_secrets.update_wallet_record_tags(wallet_handle, type_, id1, tags2)
+    await check_record_field(wallet_handle, 'tags', tags2)
+
+
+@pytest.mark.asyncio
+async def test_wallet_record_cache_works_for_delete(wallet_handle, record_cache):
+    await non_secrets.add_wallet_record(wallet_handle, type_, id1, value1, tags1)
+    await non_secrets.get_wallet_record(wallet_handle, type_, id1, options_empty)
+
+    await non_secrets.delete_wallet_record(wallet_handle, type_, id1)
+
+    with pytest.raises(error.WalletItemNotFound):
+        await non_secrets.get_wallet_record(wallet_handle, type_, id1, options_empty)
+
+
+@pytest.mark.asyncio
+async def test_wallet_record_cache_works_for_null_options(wallet_handle, record_cache):
+    await non_secrets.add_wallet_record(wallet_handle, type_, id1, value1, tags1)
+
+    with pytest.raises(error.CommonInvalidParam5):
+        await non_secrets.get_wallet_record_raw(wallet_handle, type_, id1, None)
+
+    with pytest.raises(error.CommonInvalidParam5):
+        await non_secrets.get_wallet_record(wallet_handle, type_, id1, None)
+
+
+@pytest.mark.asyncio
+async def test_wallet_record_cache_evicts_least_recently_used(wallet_handle, record_cache):
+    for (id_, value) in ((id1, value1), (id2, value2), (id3, value3)):
+        await non_secrets.add_wallet_record(wallet_handle, type_, id_, value, tags_empty)
+        await non_secrets.get_wallet_record(wallet_handle, type_, id_, options_empty)
+
+    stats = non_secrets.get_wallet_record_cache_stats()
+    assert 2 == stats['entries']
+    assert 1 == stats['evictions']
@@ -58,3 +58,45 @@ async def test_wallet_search_works_for_query(wallet_handle):
     assert {'id': id2, 'value': value2, 'tags': None, 'type': None} in search_records['records']
 
     await non_secrets.close_wallet_search(search_handle)
+
+
+@pytest.mark.asyncio
+async def test_iter_wallet_records_works(wallet_handle):
+    for i in range(25):
+        await non_secrets.add_wallet_record(wallet_handle, type_, "{}_{}".format(id1, i), value1, tags1)
+
+    records = [record async for record in non_secrets.iter_wallet_records(wallet_handle, type_, query_empty,
+                                                                            options_empty, page_size=2)]
+
+    assert len(records) == 25
+    assert {'id': "{}_0".format(id1), 'value': value1, 'tags': None, 'type': None} in records
+
+
+@pytest.mark.asyncio
+async def test_iter_wallet_records_works_for_early_exit(wallet_handle):
+    await non_secrets.add_wallet_record(wallet_handle, type_, id1, value1, tags1)
+    await non_secrets.add_wallet_record(wallet_handle, type_, id2, value2, tags2)
+
+    records = non_secrets.iter_wallet_records(wallet_handle, type_, query_empty, page_size=1)
+    async for record in records:
+        assert record['id'] in (id1, id2)
+        break
+    await records.aclose()
+
+
+@pytest.mark.asyncio
+async def test_count_wallet_records_works(wallet_handle):
+    await non_secrets.add_wallet_record(wallet_handle, type_, id1, value1, tags1)
+    await non_secrets.add_wallet_record(wallet_handle, type_, id2, value2, tags2)
+
+    assert 2 == await non_secrets.count_wallet_records(wallet_handle, type_, query_empty)
+    assert 1 == await non_secrets.count_wallet_records(wallet_handle, type_, '{"tagName1": "str2"}')
+
+
+@pytest.mark.asyncio
+async def test_count_wallet_records_works_for_cache(wallet_handle):
+    await non_secrets.add_wallet_record(wallet_handle, type_, id1, value1, tags1)
+    assert 1 == await non_secrets.count_wallet_records(wallet_handle, type_, query_empty, cache_ttl=60)
+
+    await non_secrets.add_wallet_record(wallet_handle, type_, id2, value2, tags2)
+    assert 2 == await non_secrets.count_wallet_records(wallet_handle, type_, query_empty, cache_ttl=60)
@@ -19,3 +19,18 @@ async def test_list_pairwise_works(wallet_handle, identity_my2, identity_trustee
 async def test_list_pairwise_works_for_empty_result(wallet_handle):
     list_pairwise = json.loads(await pairwise.list_pairwise(wallet_handle))
     assert 0 == len(list_pairwise)
+
+
+@pytest.mark.asyncio
+async def test_iter_pairwise_works(wallet_handle, identity_my2, identity_trustee1):
+    (my_did, _) = identity_my2
+    (their_did, _) = identity_trustee1
+    await pairwise.create_pairwise(wallet_handle, their_did, my_did, None)
+
+    res = [pairwise_info async for pairwise_info in pairwise.iter_pairwise(wallet_handle)]
+    assert [{"my_did": my_did, "their_did": their_did}] == res
+
+
+@pytest.mark.asyncio
+async def test_iter_pairwise_works_for_empty_result(wallet_handle):
+    assert [] == [pairwise_info async for pairwise_info in pairwise.iter_pairwise(wallet_handle)]
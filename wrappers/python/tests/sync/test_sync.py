@@ -0,0 +1,58 @@
+import importlib
+import inspect
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from indy import error, sync
+from indy.sync import crypto, did
+
+# Calls that schedule work on an event loop, which run_blocking can't drive
+LOOP_NAMES = {'ensure_future', 'create_task', 'gather', 'wait', 'wait_for', 'sleep', 'shield', 'get_event_loop',
+              'create_future', 'run_in_executor', 'run_windowed'}
+
+
+def _names(code) -> set:
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _names(const)
+    return names
+
+
+def test_sync_create_and_store_my_did_works(wallet_handle, seed_my1, did_my1, verkey_my1):
+    (_did, ver_key) = did.create_and_store_my_did(wallet_handle, json.dumps({'seed': seed_my1}))
+    assert did_my1 == _did
+    assert verkey_my1 == ver_key
+
+
+def test_sync_create_and_store_my_did_works_for_invalid_crypto_type(wallet_handle):
+    with pytest.raises(error.UnknownCryptoTypeError):
+        did.create_and_store_my_did(wallet_handle, json.dumps({'crypto_type': 'crypto_type'}))
+
+
+def test_sync_crypto_sign_works_from_many_threads(wallet_handle, seed_my1, message):
+    my_vk = crypto.create_key(wallet_handle, json.dumps({'seed': seed_my1}))
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        signatures = list(executor.map(lambda _: crypto.crypto_sign(wallet_handle, my_vk, message), range(32)))
+
+    assert len(set(signatures)) == 1
+    assert crypto.crypto_verify(my_vk, message, signatures[0])
+
+
+def test_sync_mirrors_only_loop_free_coroutines():
+    for module_name in sync.__all__:
+        module = importlib.import_module('indy.' + module_name)
+        mirror = getattr(sync, module_name)
+        coroutines = {name: value for (name, value) in vars(module).items()
+                      if inspect.iscoroutinefunction(value) and value.__module__ == module.__name__}
+        loop_only = {name for (name, value) in coroutines.items() if getattr(value, 'requires_event_loop', False)}
+
+        for (name, value) in coroutines.items():
+            if name in loop_only:
+                assert not hasattr(mirror, name), "{}.{}".format(module_name, name)
+            else:
+                assert hasattr(mirror, name), "{}.{}".format(module_name, name)
+                assert not _names(value.__code__) & (LOOP_NAMES | loop_only), "{}.{}".format(module_name, name)
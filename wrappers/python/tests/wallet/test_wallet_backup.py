@@ -0,0 +1,119 @@
+import json
+import os
+
+import pytest
+
+from indy import did, error, wallet
+from indy.wallet_backup import export_wallets, import_wallets
+
+export_key = json.dumps({"key": "export_key", "key_derivation_method": "RAW"})
+
+
+@pytest.fixture
+def tenant_wallets(event_loop, path_home, credentials):
+    configs = [json.dumps({"id": "tenant{}".format(i)}) for i in range(3)]
+    for config in configs:
+        event_loop.run_until_complete(wallet.create_wallet(config, credentials))
+
+    yield configs
+
+    for config in configs:
+        try:
+            event_loop.run_until_complete(wallet.delete_wallet(config, credentials))
+        except error.WalletNotFoundError:
+            pass
+
+
+@pytest.mark.asyncio
+async def test_export_import_wallets_works(tenant_wallets, credentials, path_temp):
+    wallet_handle = await wallet.open_wallet(tenant_wallets[0], credentials)
+    (_did, _) = await did.create_and_store_my_did(wallet_handle, "{}")
+    await wallet.close_wallet(wallet_handle)
+
+    progress = []
+    stats = await export_wallets([(config, credentials, export_key) for config in tenant_wallets],
+                                 str(path_temp), concurrency=2, progress=lambda stats: progress.append(stats['done']))
+
+    assert 3 == stats['total']
+    assert 0 == stats['failed']
+    assert 0 < stats['bytes']
+    assert [1, 2, 3] == progress
+    assert os.path.exists(os.path.join(str(path_temp), "tenant0.export"))
+
+    for config in tenant_wallets:
+        await wallet.delete_wallet(config, credentials)
+
+    stats = await import_wallets([(config, credentials, export_key) for config in tenant_wallets],
+                                 str(path_temp), concurrency=2)
+    assert 0 == stats['failed']
+
+    wallet_handle = await wallet.open_wallet(tenant_wallets[0], credentials)
+    await did.get_my_did_with_meta(wallet_handle, _did)
+    await wallet.close_wallet(wallet_handle)
+
+
+@pytest.mark.asyncio
+async def test_export_wallets_resumes(tenant_wallets, credentials, path_temp):
+    wallets = [(config, credentials, export_key) for config in tenant_wallets]
+
+    await export_wallets(wallets[:2], str(path_temp))
+    stats = await export_wallets(wallets, str(path_temp))
+
+    assert 2 == stats['skipped']
+    assert 0 == stats['failed']
+
+
+@pytest.mark.asyncio
+async def test_export_wallets_works_for_unknown_wallet(path_home, credentials, path_temp):
+    stats = await export_wallets([(json.dumps({"id": "unknown"}), credentials, export_key)], str(path_temp))
+
+    assert 1 == stats['failed']
+    assert "unknown" in stats['errors']
+
+
+@pytest.mark.asyncio
+async def test_import_wallets_keeps_existing_wallets(tenant_wallets, credentials, path_temp):
+    wallets = [(config, credentials, export_key) for config in tenant_wallets[:1]]
+    await export_wallets(wallets, str(path_temp))
+
+    wallet_handle = await wallet.open_wallet(tenant_wallets[0], credentials)
+    (_did, _) = await did.create_and_store_my_did(wallet_handle, "{}")
+    await wallet.close_wallet(wallet_handle)
+
+    # Second run must not take the wallet for one left incomplete by the first run
+    for _ in range(2):
+        stats = await import_wallets(wallets, str(path_temp))
+        assert isinstance(stats['errors']["tenant0"], error.WalletAlreadyExistsError)
+
+    wallet_handle = await wallet.open_wallet(tenant_wallets[0], credentials)
+    await did.get_my_did_with_meta(wallet_handle, _did)
+    await wallet.close_wallet(wallet_handle)
+
+
+@pytest.mark.asyncio
+async def test_import_wallets_keeps_wallet_created_after_failed_import(monkeypatch, tmp_path):
+    (tmp_path / 'tenant0.export').write_bytes(b'export')
+    wallets = [(json.dumps({"id": "tenant0"}), json.dumps({"key": "key"}), export_key)]
+    deleted = []
+
+    async def import_wallet(config, credentials, import_config):
+        raise error.WalletAccessFailed(error.ErrorCode.WalletAccessFailed)
+
+    async def delete_wallet(config, credentials):
+        deleted.append(config)
+
+    monkeypatch.setattr(wallet, 'import_wallet', import_wallet)
+    monkeypatch.setattr(wallet, 'delete_wallet', delete_wallet)
+
+    stats = await import_wallets(wallets, str(tmp_path))
+    assert isinstance(stats['errors']["tenant0"], error.WalletAccessFailed)
+
+    # Wallet with the same id created after the failed import is not taken for one left by it
+    async def import_wallet(config, credentials, import_config):
+        raise error.WalletAlreadyExistsError(error.ErrorCode.WalletAlreadyExistsError)
+
+    monkeypatch.setattr(wallet, 'import_wallet', import_wallet)
+
+    stats = await import_wallets(wallets, str(tmp_path))
+    assert isinstance(stats['errors']["tenant0"], error.WalletAlreadyExistsError)
+    assert [] == deleted
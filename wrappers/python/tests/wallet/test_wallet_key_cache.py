@@ -0,0 +1,202 @@
+import asyncio
+import json
+
+import pytest
+
+from indy import error, wallet
+from indy.wallet_keys import FileKeySealer, WalletKeyCache
+
+passphrase_credentials = json.dumps({"key": "tenant passphrase", "key_derivation_method": "ARGON2I_INT"})
+
+
+class DictSealer:
+    """
+    Keeps sealed keys in a dict, stands in for a persistent secret store that outlives the test.
+    """
+
+    durable = True
+
+    def __init__(self):
+        self.blobs = {}
+
+    def seal(self, wallet_id, blob):
+        return self.blobs.setdefault(wallet_id, bytes(blob)) == blob
+
+    def unseal(self, wallet_id):
+        return self.blobs.get(wallet_id)
+
+    def remove(self, wallet_id, blob):
+        if self.blobs.get(wallet_id) == blob:
+            del self.blobs[wallet_id]
+
+
+@pytest.fixture
+def fake_wallet(monkeypatch):
+    """
+    Replaces libindy wallet functions with fakes keeping the current key of a single wallet,
+    stands in for openers of the wallet in other processes.
+    """
+
+    state = {'key': 'tenant passphrase', 'keys': 0}
+
+    async def generate_wallet_key(config):
+        state['keys'] += 1
+        key = 'raw key {}'.format(state['keys'])
+        await asyncio.sleep(0)
+        return key
+
+    async def open_wallet(config, credentials):
+        credentials_ = json.loads(credentials)
+        if credentials_['key'] != state['key']:
+            raise error.WalletAccessFailed(error.ErrorCode.WalletAccessFailed)
+        if 'rekey' in credentials_:
+            state['key'] = credentials_['rekey']
+        return 1
+
+    monkeypatch.setattr(wallet, 'generate_wallet_key', generate_wallet_key)
+    monkeypatch.setattr(wallet, 'open_wallet', open_wallet)
+    return state
+
+
+@pytest.fixture
+def argon_wallet(event_loop, path_home, wallet_config):
+    event_loop.run_until_complete(wallet.create_wallet(wallet_config, passphrase_credentials))
+    yield wallet_config
+    event_loop.run_until_complete(wallet.delete_wallet(wallet_config, passphrase_credentials))
+
+
+@pytest.mark.asyncio
+async def test_wallet_key_cache_works(argon_wallet):
+    keys = WalletKeyCache(DictSealer())
+
+    for _ in range(3):
+        wallet_handle = await keys.open_wallet(argon_wallet, passphrase_credentials)
+        await wallet.close_wallet(wallet_handle)
+
+    stats = keys.stats()
+    assert 1 == stats['rotations']
+    assert 2 == stats['hits']
+
+    await keys.restore_passphrase(argon_wallet, passphrase_credentials)
+    assert 0 == keys.stats()['keys']
+
+    wallet_handle = await wallet.open_wallet(argon_wallet, passphrase_credentials)
+    await wallet.close_wallet(wallet_handle)
+
+
+@pytest.mark.asyncio
+async def test_wallet_key_cache_works_after_wipe(argon_wallet):
+    sealer = DictSealer()
+    keys = WalletKeyCache(sealer)
+
+    await wallet.close_wallet(await keys.open_wallet(argon_wallet, passphrase_credentials))
+    keys.wipe()
+    await wallet.close_wallet(await keys.open_wallet(argon_wallet, passphrase_credentials))
+
+    assert 1 == keys.stats()['unseals']
+
+    await keys.restore_passphrase(argon_wallet, passphrase_credentials)
+
+
+@pytest.mark.asyncio
+async def test_wallet_key_cache_works_for_invalid_passphrase(argon_wallet):
+    keys = WalletKeyCache(DictSealer())
+    await wallet.close_wallet(await keys.open_wallet(argon_wallet, passphrase_credentials))
+
+    with pytest.raises(error.WalletAccessFailed):
+        await keys.open_wallet(argon_wallet, json.dumps({"key": "other passphrase", "key_derivation_method": "ARGON2I_INT"}))
+
+    await keys.restore_passphrase(argon_wallet, passphrase_credentials)
+
+
+@pytest.mark.asyncio
+async def test_wallet_key_cache_works_for_concurrent_first_opens(argon_wallet):
+    keys = WalletKeyCache(DictSealer())
+
+    results = await asyncio.gather(keys.open_wallet(argon_wallet, passphrase_credentials),
+                                   keys.open_wallet(argon_wallet, passphrase_credentials),
+                                   return_exceptions=True)
+
+    handles = [res for res in results if not isinstance(res, Exception)]
+    assert 1 == len(handles)
+    assert all(isinstance(res, error.WalletAlreadyOpenedError) for res in results if isinstance(res, Exception))
+    assert 1 == keys.stats()['rotations']
+
+    await wallet.close_wallet(handles[0])
+    keys.wipe()
+    await wallet.close_wallet(await keys.open_wallet(argon_wallet, passphrase_credentials))
+
+    await keys.restore_passphrase(argon_wallet, passphrase_credentials)
+
+
+def test_wallet_key_cache_requires_durable_sealer():
+    sealer = DictSealer()
+    sealer.durable = False
+
+    with pytest.raises(ValueError):
+        WalletKeyCache(sealer)
+
+
+@pytest.mark.asyncio
+async def test_wallet_key_cache_seals_encrypted_key(argon_wallet):
+    sealer = DictSealer()
+    keys = WalletKeyCache(sealer)
+    await wallet.close_wallet(await keys.open_wallet(argon_wallet, passphrase_credentials))
+
+    (blob,) = sealer.blobs.values()
+    raw_key = keys._keys[json.loads(argon_wallet)['id']].key.decode()
+    assert raw_key.encode() not in blob
+
+    await keys.restore_passphrase(argon_wallet, passphrase_credentials)
+
+
+@pytest.mark.asyncio
+async def test_wallet_key_cache_works_for_concurrent_first_opens_of_other_caches(fake_wallet):
+    sealer = DictSealer()
+    caches = [WalletKeyCache(sealer), WalletKeyCache(sealer)]
+
+    await asyncio.gather(*[keys.open_wallet('{"id": "wallet1"}', passphrase_credentials) for keys in caches])
+
+    # The second cache lost the seal and opened the wallet with the key sealed by the first one
+    assert [1, 0] == [keys.stats()['rotations'] for keys in caches]
+    assert [0, 1] == [keys.stats()['unseals'] for keys in caches]
+    assert 'raw key 1' == fake_wallet['key']
+    assert 'wallet1' in sealer.blobs
+
+
+@pytest.mark.asyncio
+async def test_wallet_key_cache_keeps_key_sealed_by_other_cache_for_invalid_passphrase(fake_wallet):
+    sealer = DictSealer()
+    await WalletKeyCache(sealer).open_wallet('{"id": "wallet1"}', passphrase_credentials)
+    blob = sealer.blobs['wallet1']
+
+    with pytest.raises(error.WalletAccessFailed):
+        await WalletKeyCache(sealer).open_wallet('{"id": "wallet1"}', json.dumps({"key": "other passphrase"}))
+
+    assert blob == sealer.blobs['wallet1']
+
+
+@pytest.mark.asyncio
+async def test_wallet_key_cache_removes_own_key_for_failed_first_rotation(fake_wallet):
+    sealer = DictSealer()
+
+    with pytest.raises(error.WalletAccessFailed):
+        await WalletKeyCache(sealer).open_wallet('{"id": "wallet1"}', json.dumps({"key": "other passphrase"}))
+
+    assert {} == sealer.blobs
+
+
+def test_file_key_sealer_works(tmp_path):
+    sealer = FileKeySealer(str(tmp_path / 'keys'))
+
+    assert sealer.unseal('wallet1') is None
+    assert sealer.seal('wallet1', b'blob1')
+    assert not sealer.seal('wallet1', b'blob2')
+    assert b'blob1' == FileKeySealer(str(tmp_path / 'keys')).unseal('wallet1')
+
+    sealer.remove('wallet1', b'blob2')
+    assert b'blob1' == sealer.unseal('wallet1')
+
+    sealer.remove('wallet1', b'blob1')
+    assert sealer.unseal('wallet1') is None
+    assert [] == list((tmp_path / 'keys').iterdir())
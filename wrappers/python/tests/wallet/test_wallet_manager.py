@@ -0,0 +1,142 @@
+import asyncio
+import json
+
+import pytest
+
+from indy import error, wallet
+from indy.wallet_manager import WalletManager
+
+
+@pytest.fixture
+def tenant_wallets(event_loop, path_home, credentials):
+    tenants = ['tenant1', 'tenant2', 'tenant3']
+    for tenant_id in tenants:
+        event_loop.run_until_complete(wallet.create_wallet(json.dumps({'id': tenant_id}), credentials))
+
+    yield tenants
+
+    for tenant_id in tenants:
+        event_loop.run_until_complete(wallet.delete_wallet(json.dumps({'id': tenant_id}), credentials))
+
+
+@pytest.fixture
+def wallet_manager(credentials):
+    return WalletManager(lambda tenant_id: (json.dumps({'id': tenant_id}), credentials), max_open=2)
+
+
+@pytest.mark.asyncio
+async def test_wallet_manager_works(tenant_wallets, wallet_manager):
+    async with wallet_manager.wallet('tenant1') as wallet_handle:
+        async with wallet_manager.wallet('tenant1') as same_wallet_handle:
+            assert wallet_handle == same_wallet_handle
+
+    stats = wallet_manager.stats()
+    assert 1 == stats['open']
+    assert 1 == stats['opens']
+    assert 1 == stats['hits']
+
+    await wallet_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_wallet_manager_coalesces_concurrent_opens(tenant_wallets, wallet_manager):
+    handles = await asyncio.gather(*(wallet_manager.acquire('tenant1') for _ in range(3)))
+
+    assert 1 == len(set(handles))
+    assert 1 == wallet_manager.stats()['opens']
+    assert 2 == wallet_manager.stats()['coalesced']
+
+    for _ in range(3):
+        wallet_manager.release('tenant1')
+    await wallet_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_wallet_manager_evicts_least_recently_used(tenant_wallets, wallet_manager, credentials):
+    for tenant_id in tenant_wallets:
+        async with wallet_manager.wallet(tenant_id):
+            pass
+
+    stats = wallet_manager.stats()
+    assert 2 == stats['open']
+    assert 1 == stats['evictions']
+
+    # tenant1 was closed, so its wallet can be opened directly again
+    wallet_handle = await wallet.open_wallet(json.dumps({'id': 'tenant1'}), credentials)
+    await wallet.close_wallet(wallet_handle)
+
+    await wallet_manager.close()
+    assert 0 == wallet_manager.stats()['open']
+
+
+@pytest.mark.asyncio
+async def test_wallet_manager_works_for_unknown_wallet(path_home, wallet_manager):
+    with pytest.raises(error.WalletNotFoundError):
+        await wallet_manager.acquire('unknown')
+
+    assert 0 == wallet_manager.stats()['open']
+
+
+@pytest.fixture
+def slow_open(monkeypatch):
+    """
+    Replaces wallet.open_wallet with a fake that returns handle 7 once `opened` is set.
+    """
+
+    opened = asyncio.Event()
+    closed = []
+
+    async def open_wallet(config, credentials):
+        await opened.wait()
+        return 7
+
+    async def close_wallet(handle):
+        closed.append(handle)
+
+    monkeypatch.setattr(wallet, 'open_wallet', open_wallet)
+    monkeypatch.setattr(wallet, 'close_wallet', close_wallet)
+    return opened, closed
+
+
+@pytest.mark.asyncio
+async def test_wallet_manager_works_for_cancelled_first_acquire(slow_open, wallet_manager):
+    (opened, _) = slow_open
+
+    first = asyncio.ensure_future(wallet_manager.acquire('tenant1'))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(wallet_manager.acquire('tenant1'))
+    await asyncio.sleep(0)
+
+    first.cancel()
+    await asyncio.sleep(0)
+    opened.set()
+
+    assert 7 == await second
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+    stats = wallet_manager.stats()
+    assert 1 == stats['opens']
+    assert 1 == stats['in_use']
+
+
+@pytest.mark.asyncio
+async def test_wallet_manager_keeps_wallet_opened_after_all_acquires_are_cancelled(slow_open, wallet_manager):
+    (opened, closed) = slow_open
+
+    acquire = asyncio.ensure_future(wallet_manager.acquire('tenant1'))
+    await asyncio.sleep(0)
+    acquire.cancel()
+    await asyncio.sleep(0)
+    opened.set()
+    await asyncio.sleep(0)
+
+    assert {'open': 1, 'in_use': 0, 'opens': 1} == \
+        {key: value for (key, value) in wallet_manager.stats().items() if key in ('open', 'in_use', 'opens')}
+
+    assert 7 == await wallet_manager.acquire('tenant1')
+    assert 1 == wallet_manager.stats()['hits']
+
+    wallet_manager.release('tenant1')
+    await wallet_manager.close()
+    assert [7] == closed
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from indy import error, wql
+from indy.wql import Tag
+
+
+def test_wql_builds_conditions():
+    assert {"name": "value"} == Tag("name").eq("value").to_dict()
+    assert {"~age": {"$gte": "18"}} == Tag("~age").gte("18").to_dict()
+    assert {"~name": {"$like": "Al%"}} == Tag("~name").like("Al%").to_dict()
+    assert {"name": {"$in": ["a", "b"]}} == Tag("name").in_(["b", "a", "b"]).to_dict()
+
+
+def test_wql_combines_queries():
+    a = Tag("a").eq("1")
+    b = Tag("b").eq("2")
+    c = Tag("c").neq("3")
+
+    assert {"$and": [{"a": "1"}, {"b": "2"}, {"c": {"$neq": "3"}}]} == (c & (b & a)).to_dict()
+    assert {"$or": [{"a": "1"}, {"$not": {"b": "2"}}]} == (a | ~b).to_dict()
+    assert a == ~~a
+    assert {} == wql.and_().to_dict()
+
+
+def test_wql_serialization_is_canonical():
+    a = Tag("a").eq("1")
+    b = Tag("b").eq("2")
+
+    assert (a & b).to_json() == (b & a).to_json() == '{"$and":[{"a":"1"},{"b":"2"}]}'
+    assert hash(a & b) == hash(b & a)
+
+
+def test_wql_parse_works():
+    query = '{"~age": {"$gt": "18"}, "$or": [{"name": "Alex"}, {"$not": {"name": {"$in": ["Bob"]}}}]}'
+
+    assert wql.parse(query) == Tag("~age").gt("18") & (Tag("name").eq("Alex") | ~Tag("name").in_(["Bob"]))
+    assert wql.parse(json.loads(query)) == wql.parse(query)
+    assert wql.canonicalize(query) == wql.canonicalize(wql.parse(query).to_json())
+
+
+@pytest.mark.parametrize("query", [
+    'not json',
+    '[]',
+    '{"name": 1}',
+    '{"name": {"$regex": "a"}}',
+    '{"name": {"$in": "a"}}',
+    '{"$or": {"name": "a"}}',
+    '{"$bad": "a"}',
+    '{"age": {"$gt": "18"}}',
+    '{"name": {"$like": "Al%"}}',
+])
+def test_wql_parse_works_for_invalid_query(query):
+    with pytest.raises(error.WalletQueryError):
+        wql.parse(query)
+
+
+def test_wql_tag_works_for_invalid_value():
+    with pytest.raises(error.WalletQueryError):
+        Tag("name").eq(5)
+
+
+@pytest.mark.parametrize("operator", ["gt", "gte", "lt", "lte", "like"])
+def test_wql_tag_works_for_comparison_of_encrypted_tag(operator):
+    with pytest.raises(error.WalletQueryError):
+        getattr(Tag("age"), operator)("18")